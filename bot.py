@@ -1,7 +1,8 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 
-from database import db_core, guild_manager, ensure_database_connection, get_guild_settings
+from database import db_core, storage, guild_manager, ensure_database_connection, get_guild_settings
+from logger.log_control import log_control
 
 error_notifier = None
 
@@ -52,8 +53,8 @@ async def on_ready():
     print('------')
 
     try:
-        if not db_core.is_healthy():
-            success = await db_core.initialize()
+        if not storage.is_healthy():
+            success = await storage.initialize()
             if success:
                 print('✅ Database connection established')
                 await initialize_existing_guilds()
@@ -62,6 +63,9 @@ async def on_ready():
         else:
             print('✅ Database connection already healthy')
 
+        if not orphan_sweeper.is_running():
+            orphan_sweeper.start()
+
     except Exception as e:
         print(f'❌ Database connection error: {e}')
 
@@ -70,13 +74,19 @@ async def initialize_existing_guilds():
     """Initialize database settings for all guilds the bot is currently in."""
     print('🏰 Initializing settings for existing guilds...')
 
+    # Guilds are set up concurrently, capped by the bulk executor so startup can't drain the pool
+    guilds = list(bot.guilds)
+    results = await db_core.run_bulk(
+        [lambda guild=guild: guild_manager.setup_new_guild(guild.id, guild.name) for guild in guilds],
+        "bootstrap_guilds", retry=False
+    )
+
     initialized_count = 0
-    for guild in bot.guilds:
-        try:
-            await guild_manager.setup_new_guild(str(guild.id), guild.name)
+    for guild, result in zip(guilds, results):
+        if result.ok:
             initialized_count += 1
-        except Exception as e:
-            print(f'❌ Failed to initialize guild {guild.name}: {e}')
+        else:
+            print(f'❌ Failed to initialize guild {guild.name}: {result.error}')
 
     print(f'✅ Initialized settings for {initialized_count}/{len(bot.guilds)} guilds')
 
@@ -87,7 +97,7 @@ async def on_guild_join(guild):
     print(f'🤖 Bot joined guild: {guild.name} (ID: {guild.id})')
 
     try:
-        settings = await guild_manager.setup_new_guild(str(guild.id), guild.name)
+        settings = await guild_manager.setup_new_guild(guild.id, guild.name)
         print(f'✅ Auto-configured guild: {guild.name}')
 
         await send_welcome_message(guild, settings)
@@ -102,21 +112,38 @@ async def on_guild_remove(guild):
     print(f'👋 Bot left guild: {guild.name} (ID: {guild.id})')
 
     try:
-        success = await guild_manager.remove_guild_data(str(guild.id), guild.name)
-        if success:
-            print(f'✅ Removed data for guild: {guild.name}')
-        else:
-            print(f'⚠️ Partial cleanup for guild: {guild.name}')
+        # The purge can take a while for busy guilds, so it runs as a background job
+        guild_manager.start_guild_purge(guild.id, guild.name)
+        print(f'🗑️ Started data purge for guild: {guild.name}')
 
     except Exception as e:
         print(f'❌ Error removing guild data for {guild.name}: {e}')
 
 
+@tasks.loop(hours=6)
+async def orphan_sweeper():
+    """Periodically purge data for guilds the bot was removed from while offline."""
+    # An empty or partial guild list (e.g. shards still connecting) would look like mass orphaning
+    if not bot.is_ready() or not bot.guilds or not storage.is_healthy():
+        return
+
+    try:
+        purged = await guild_manager.sweep_orphaned_guilds({guild.id for guild in bot.guilds})
+        if purged:
+            print(f'🧹 Started purges for {len(purged)} orphaned guild(s)')
+    except Exception as e:
+        print(f'❌ Orphan sweep failed: {e}')
+
+
+@orphan_sweeper.before_loop
+async def before_orphan_sweeper():
+    await bot.wait_until_ready()
+
+
 async def send_welcome_message(guild, settings):
     """Sends a welcome message to a new guild if enabled."""
     try:
-        bot_settings_collection = db_core.get_collection("discord_forwarding_bot", "bot_settings")
-        bot_settings = await bot_settings_collection.find_one({"_id": "global_config"})
+        bot_settings = await guild_manager.get_bot_settings()
 
         if not bot_settings or not bot_settings.get("welcome_message_enabled", True):
             return
@@ -162,9 +189,11 @@ async def close():
     """Called when the bot is shutting down."""
     print('🔄 Bot is shutting down. Cleaning up...')
 
+    orphan_sweeper.cancel()
+
     try:
-        if db_core.is_healthy():
-            await db_core.close()
+        if storage.is_healthy():
+            await storage.close()
             print('✅ Database connection closed')
     except Exception as e:
         print(f'❌ Error closing database connection: {e}')
@@ -211,7 +240,7 @@ async def on_command_error(ctx, error):
 async def ping_command(ctx):
     """Checks bot latency and database connection status."""
     latency = round(bot.latency * 1000)
-    db_healthy = db_core.is_healthy()
+    db_healthy = storage.is_healthy()
     db_status = "✅ Connected" if db_healthy else "❌ Disconnected"
 
     try:
@@ -254,5 +283,18 @@ async def sync_commands(ctx):
         print(f"Failed to sync commands: {e}")
 
 
+@bot.command(name="loglevel")
+@commands.is_owner()
+async def loglevel_command(ctx, *args):
+    """
+    Changes log levels at runtime. Owner only.
+    Usage: loglevel set <logger|prefix> <level> [minutes] [sample N] | loglevel reset [logger] | loglevel status
+    """
+    reply = log_control.execute(list(args))
+    if len(reply) > 1900:
+        reply = reply[:1900] + "\n…"
+    await ctx.send(f"```\n{reply}\n```")
+
+
 def get_bot():
     return bot
\ No newline at end of file
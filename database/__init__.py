@@ -1,13 +1,42 @@
+import os
 from typing import Dict, Any
 
 from .core import DatabaseCore
+from .bulk import BulkWrite, BulkItemResult
 from .guild_manager import GuildManager
-from .exceptions import DatabaseConnectionError, DatabaseOperationError
+from .rule_index import GuildRuleIndex
+from .storage import StorageBackend, MongoStorage, SQLiteStorage, create_storage
+from .exceptions import (
+    DatabaseConnectionError,
+    DatabaseOperationError,
+    DatabaseUnavailableError,
+    RuleLimitExceededError,
+    ConcurrentModificationError
+)
 from .constants import DATABASE_MAPPINGS, COLLECTION_REGISTRY
 
-# Global database manager instance
-db_core = DatabaseCore(auto_discover=True)
-guild_manager = GuildManager(db_core)
+# Global database manager instance.
+# Auto-discovery of every database on the cluster is opt-in; the bot only needs its own
+# collections, which are resolved lazily on first use.
+# Pool sizes are configurable; the pool advisor's recommendations are only reported unless
+# DATABASE_POOL_AUTO_TUNE applies them on the next reconnect.
+db_core = DatabaseCore(
+    auto_discover=os.getenv("DATABASE_AUTO_DISCOVER", "false").lower() in ("1", "true", "yes"),
+    max_pool_size=int(os.getenv("DATABASE_MAX_POOL_SIZE", "50")),
+    min_pool_size=int(os.getenv("DATABASE_MIN_POOL_SIZE", "10")),
+    max_connecting=int(os.getenv("DATABASE_MAX_CONNECTING", "5")),
+    wait_queue_timeout=int(os.getenv("DATABASE_WAIT_QUEUE_TIMEOUT_MS", "10000")),
+    auto_tune_pool=os.getenv("DATABASE_POOL_AUTO_TUNE", "false").lower() in ("1", "true", "yes")
+)
+# Settings, rules and logs live in the backend selected by STORAGE_BACKEND (MongoDB by default)
+storage = create_storage(db_core)
+# WARM_START builds every guild's rule index from one cursor at startup instead of on first message
+guild_manager = GuildManager(
+    db_core,
+    storage=storage,
+    warm_start=os.getenv("WARM_START", "false").lower() in ("1", "true", "yes"),
+    warm_start_batch_size=int(os.getenv("WARM_START_BATCH_SIZE", "1000"))
+)
 
 # Convenience functions
 async def ensure_database_connection() -> bool:
@@ -15,11 +44,17 @@ async def ensure_database_connection() -> bool:
     Ensure database connection is established and healthy.
     This function should be called before any database operation.
     """
+    if storage.name != "mongo":
+        return storage.is_healthy() or await storage.initialize()
+
     if not db_core.is_healthy():
         from logger.logger_setup import get_logger
         logger = get_logger("Database", level=20, json_format=False, colored_console=True)
         logger.info("Database not healthy, attempting to initialize/reconnect...")
-        return await db_core.initialize()
+        if db_core.connection_state == "disconnected":
+            return await db_core.initialize()
+        # initialize() is a no-op once the core has been initialized, so recover via reconnect()
+        return await db_core.reconnect()
     return True
 
 async def setup_new_guild(guild_id: str, guild_name: str) -> Dict[str, Any]:
@@ -46,10 +81,21 @@ async def get_guild_settings(guild_id: str) -> Dict[str, Any]:
 # Export main components
 __all__ = [
     'DatabaseCore',
+    'BulkWrite',
+    'BulkItemResult',
     'GuildManager',
+    'GuildRuleIndex',
+    'StorageBackend',
+    'MongoStorage',
+    'SQLiteStorage',
+    'create_storage',
     'DatabaseConnectionError',
     'DatabaseOperationError',
+    'DatabaseUnavailableError',
+    'RuleLimitExceededError',
+    'ConcurrentModificationError',
     'db_core',
+    'storage',
     'guild_manager',
     'ensure_database_connection',
     'setup_new_guild',
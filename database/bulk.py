@@ -0,0 +1,34 @@
+"""
+Work items and results for DatabaseCore.run_bulk().
+
+A batch mixes BulkWrite items, which are grouped per collection into unordered bulk_write
+calls, with zero-argument coroutine functions for anything else (reads, storage calls).
+Results come back as one BulkItemResult per item, in input order.
+"""
+from dataclasses import dataclass
+from typing import Any, Optional
+
+DATABASE_NAME = "discord_forwarding_bot"
+
+
+@dataclass
+class BulkWrite:
+    """A single write request (pymongo InsertOne, UpdateOne, DeleteMany, ...) on a collection."""
+    collection: str
+    request: Any
+    database: str = DATABASE_NAME
+
+
+@dataclass
+class BulkItemResult:
+    """
+    Outcome of one item.
+    For a callable, `result` is its return value. For a BulkWrite, `result` is the pymongo
+    BulkWriteResult of the bulk_write call the item was grouped into and `upserted_id` is set
+    if the item upserted a document.
+    """
+    ok: bool
+    result: Any = None
+    upserted_id: Any = None
+    error: Optional[str] = None
+    code: Optional[int] = None
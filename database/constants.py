@@ -17,6 +17,42 @@ REQUIRED_COLLECTIONS = {
     'premium_subscriptions'
 }
 
+# Collections holding per-guild data and the field that references the guild.
+# Used by the cascading purge when the bot leaves a guild.
+GUILD_SCOPED_COLLECTIONS = {
+    'guild_settings': '_id',
+    'user_permissions': 'guild_id',
+    'setup_sessions': 'guild_id',
+    'rate_limits': 'guild_id',
+    'premium_subscriptions': 'guild_id',
+    'message_logs': 'guild_id',
+}
+
+# Secondary indexes per collection in the bot database, created in the background after startup.
+# Each entry is (keys, options) as passed to create_index.
+REQUIRED_INDEXES = {
+    # Daily limit counts and forwarding statistics match on a guild and a forwarded_at range,
+    # for legacy and compact (see log_schema) documents respectively. Both indexes exist on the
+    # same collection, so each is partial and only holds entries for documents of its shape.
+    'message_logs': [
+        ([("guild_id", 1), ("forwarded_at", 1)],
+         {"name": "guild_forwarded_at", "partialFilterExpression": {"guild_id": {"$exists": True}}}),
+        ([("g", 1), ("t", 1)],
+         {"name": "compact_guild_time", "partialFilterExpression": {"g": {"$exists": True}}}),
+    ],
+}
+
+# Read preference profile per operation name.
+# Hot-path reads (guild settings used while forwarding) stay on the primary; list and
+# statistics queries are served by secondaries when available. Operations not listed
+# here use the "primary" profile.
+OPERATION_READ_PROFILES = {
+    "get_all_guilds": "analytics",
+    "get_guild_count": "analytics",
+    "list_rules": "analytics",
+    "forwarding_stats": "analytics",
+}
+
 # Default bot settings
 # These settings are used to configure the bot's global behavior.
 DEFAULT_BOT_SETTINGS = {
@@ -1,15 +1,26 @@
 import os
+import time
+import random
 import asyncio
 import signal
-from typing import Optional, Dict, Any, List
-from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, Callable, Sequence, Tuple, Union
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
 from datetime import datetime, timezone
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference, InsertOne
+from pymongo.errors import BulkWriteError
+from pymongo.results import BulkWriteResult
 from dotenv import load_dotenv
 
 from logger.logger_setup import get_logger, PerformanceLogger, log_performance, log_context
-from .exceptions import DatabaseConnectionError, DatabaseOperationError
-from .constants import REQUIRED_COLLECTIONS
+from logger.tracing import record_span
+from .exceptions import DatabaseConnectionError, DatabaseOperationError, DatabaseUnavailableError
+from .constants import REQUIRED_COLLECTIONS, REQUIRED_INDEXES, OPERATION_READ_PROFILES
+from .monitoring import OperationMetrics, CommandLatencyListener, PoolWaitListener
+from .retry import RetryPolicy, CircuitBreaker, ErrorClass, classify_error, should_retry
+from .pool_advisor import PoolAdvisor, PoolSettings
+from .bulk import BulkWrite, BulkItemResult
 
 # Load environment variables
 load_dotenv()
@@ -17,6 +28,12 @@ MONGODB_URI = os.getenv("MONGODB_URI")
 
 logger = get_logger("DatabaseManager", level=20, json_format=False, colored_console=True)
 
+# Read preference used by each read profile in OPERATION_READ_PROFILES
+READ_PREFERENCE_PROFILES = {
+    "primary": ReadPreference.PRIMARY,
+    "analytics": ReadPreference.SECONDARY_PREFERRED,
+}
+
 
 class DatabaseCore:
     """
@@ -29,12 +46,20 @@ class DatabaseCore:
             server_selection_timeout: int = 5000,
             max_pool_size: int = 50,
             min_pool_size: int = 10,
+            max_connecting: int = 5,
+            wait_queue_timeout: int = 10000,
+            auto_tune_pool: bool = False,
             max_idle_time: int = 30000,
             retry_writes: bool = True,
             retry_reads: bool = True,
             heartbeat_frequency: int = 10000,
             health_check_interval: int = 30,
-            auto_discover: bool = True
+            auto_discover: bool = False,
+            read_your_writes_window: float = 60.0,
+            retry_policy: Optional[RetryPolicy] = None,
+            reconnect_after_failures: int = 2,
+            degraded_check_interval: float = 5.0,
+            max_reconnect_delay: float = 60.0
     ):
         """
         Initialize DatabaseCore with connection settings.
@@ -44,23 +69,59 @@ class DatabaseCore:
         self.server_selection_timeout = server_selection_timeout  # Max time in ms to find a suitable server
         self.max_pool_size = max_pool_size  # Max number of concurrent connections
         self.min_pool_size = min_pool_size  # Min number of concurrent connections
+        self.max_connecting = max_connecting  # Max connections a pool establishes concurrently
+        self.wait_queue_timeout = wait_queue_timeout  # Max time in ms to wait for a pooled connection
+        self.auto_tune_pool = auto_tune_pool  # Apply the pool advisor's recommendation on reconnect
         self.max_idle_time = max_idle_time  # Max time in ms a connection can be idle
         self.retry_writes = retry_writes  # Retry write operations on network errors
         self.retry_reads = retry_reads  # Retry read operations on network errors
         self.heartbeat_frequency = heartbeat_frequency  # Frequency of server heartbeats in ms
         self.health_check_interval = health_check_interval  # Interval for health checks in seconds
-        self.auto_discover = auto_discover  # Auto-discover and map all databases
+        self.auto_discover = auto_discover  # Auto-discover and map all databases (in the background)
+        self.read_your_writes_window = read_your_writes_window  # Seconds a scope's last write is tracked for causal reads
+        self.reconnect_after_failures = reconnect_after_failures  # Failed health checks before reconnecting
+        self.degraded_check_interval = degraded_check_interval  # Health check interval in seconds while not healthy
+        self.max_reconnect_delay = max_reconnect_delay  # Cap on the backoff between reconnect attempts in seconds
 
         # Connection state
         self.db_client: Optional[AsyncIOMotorClient] = None
         self._initialized = False
         self._connection_healthy = False
         self._health_check_task: Optional[asyncio.Task] = None
+        self._verification_task: Optional[asyncio.Task] = None
         self._shutdown_event = asyncio.Event()
+        self._reconnect_lock = asyncio.Lock()
+
+        # Connection state machine: disconnected -> healthy <-> degraded -> reconnecting -> healthy
+        self.connection_state = "disconnected"
+        self._connection_state_listeners: List[Callable] = []
+        self._consecutive_health_failures = 0
+        self._outage_started: Optional[float] = None  # monotonic time the current outage was detected
+        self._last_healthy_at: Optional[float] = None  # monotonic time of the last successful check
+        self._last_healthy_before_outage: Optional[float] = None
+
+        # Time-to-recovery tracking, in seconds
+        self.recovery_metrics = {
+            "outages": 0,
+            "recoveries": 0,
+            "last_time_to_recovery": None,  # Detection of the outage until healthy again
+            "last_unavailable_window": None,  # Last successful check before the outage until healthy again
+            "max_time_to_recovery": 0.0,
+            "total_downtime": 0.0,
+            "reconnect_attempts_last_outage": 0,
+        }
 
         # Database registry
         self.databases: Dict[str, Any] = {}
         self.collections: Dict[str, Any] = {}
+        self._read_views: Dict[tuple, Any] = {}  # (collection key, profile) -> collection with read preference
+
+        # Retry policy and circuit breaker used by execute_with_retry
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = CircuitBreaker()
+
+        # Causal consistency tokens per scope (e.g. guild id): (cluster_time, operation_time, recorded_at)
+        self._causal_tokens: Dict[str, tuple] = {}
 
         # Metrics tracking
         self.metrics = {
@@ -73,10 +134,24 @@ class DatabaseCore:
             "last_health_check": None,
             "total_operations": 0,
             "failed_operations": 0,
+            "secondary_eligible_reads": 0,
+            "causal_reads": 0,
+            "retried_operations": 0,
+            "circuit_rejections": 0,
+            "bulk_items": 0,
+            "bulk_item_failures": 0,
             "databases_discovered": 0,
             "collections_discovered": 0
         }
 
+        # Per-operation latency histograms, in-flight gauges and driver-level pool/command metrics
+        self.operation_metrics = OperationMetrics()
+        # Turns pool occupancy and checkout waits into saturation events and pool recommendations
+        self.pool_advisor = PoolAdvisor(self.operation_metrics)
+
+        # Startup phase timings in seconds (connect, ensure_structure, auto_discovery, verification, ...)
+        self.startup_timings: Dict[str, float] = {}
+
         logger.info("DatabaseCore initialized")
         self._log_configuration()
 
@@ -87,6 +162,9 @@ class DatabaseCore:
             "server_selection_timeout": f"{self.server_selection_timeout}ms",
             "max_pool_size": self.max_pool_size,
             "min_pool_size": self.min_pool_size,
+            "max_connecting": self.max_connecting,
+            "wait_queue_timeout": f"{self.wait_queue_timeout}ms",
+            "auto_tune_pool": self.auto_tune_pool,
             "max_idle_time": f"{self.max_idle_time}ms",
             "retry_writes": self.retry_writes,
             "retry_reads": self.retry_reads,
@@ -94,7 +172,7 @@ class DatabaseCore:
             "health_check_interval": f"{self.health_check_interval}s",
             "auto_discover": self.auto_discover
         }
-        logger.info(f"Database configuration: {config_info}")
+        logger.info("Database configuration: %s", config_info)
 
     @log_performance("database_initialization")
     async def initialize(self, max_retries: int = 3, retry_delay: float = 2.0) -> bool:
@@ -110,26 +188,32 @@ class DatabaseCore:
         with log_context(logger, "DatabaseCore initialization", level=20):
             for attempt in range(1, max_retries + 1):
                 try:
-                    logger.info(f"Connection attempt {attempt}/{max_retries}")
+                    logger.info("Connection attempt %s/%s", attempt, max_retries)
 
-                    success = await self._attempt_connection()
-                    if success:
-                        # Ensure required database structure first
-                        await self.ensure_database_structure()
+                    with self._timed_phase("connect"):
+                        success = await self._attempt_connection()
 
-                        # Then auto-discover other databases if enabled
-                        if self.auto_discover:
-                            await self._auto_discover_databases()
+                    if success:
+                        # Only the bot's own database is required before we can serve requests.
+                        # Every other collection is resolved lazily by get_collection().
+                        with self._timed_phase("ensure_structure"):
+                            await self.ensure_database_structure()
 
-                        await self._verify_databases()
                         self._start_health_monitoring()
 
+                        # Discovery and verification are informational, so they never block startup.
+                        self._start_background_verification()
+
                         self._initialized = True
                         self._connection_healthy = True
+                        self._consecutive_health_failures = 0
+                        self._last_healthy_at = time.monotonic()
                         self.metrics["successful_connections"] += 1
                         self.metrics["last_connection_time"] = datetime.now(timezone.utc)
+                        await self._set_connection_state("healthy")
 
                         logger.info("✅ DatabaseCore initialization completed successfully")
+                        self._log_startup_timings()
                         self._log_connection_metrics()
                         return True
 
@@ -138,7 +222,7 @@ class DatabaseCore:
                     logger.error(f"❌ Connection attempt {attempt} failed: {e}")
 
                     if attempt < max_retries:
-                        logger.info(f"⏳ Retrying in {retry_delay} seconds...")
+                        logger.info("⏳ Retrying in %s seconds...", retry_delay)
                         await asyncio.sleep(retry_delay)
                         retry_delay *= 1.5
                     else:
@@ -150,7 +234,7 @@ class DatabaseCore:
                     logger.error(f"💥 Unexpected error during initialization attempt {attempt}: {e}", exc_info=True)
 
                     if attempt < max_retries:
-                        logger.info(f"⏳ Retrying in {retry_delay} seconds...")
+                        logger.info("⏳ Retrying in %s seconds...", retry_delay)
                         await asyncio.sleep(retry_delay)
                         retry_delay *= 1.5
                     else:
@@ -158,6 +242,54 @@ class DatabaseCore:
                         raise DatabaseConnectionError(f"Failed to initialize after {max_retries} attempts") from e
 
         return False
+
+    @contextmanager
+    def _timed_phase(self, phase: str):
+        """Record how long a startup phase takes in `startup_timings`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[phase] = round(time.perf_counter() - start, 4)
+
+    def _log_startup_timings(self):
+        """Log the startup timing breakdown collected so far."""
+        if not self.startup_timings:
+            return
+
+        breakdown = ", ".join(f"{phase}={duration:.4f}s" for phase, duration in self.startup_timings.items())
+        total = sum(self.startup_timings.values())
+        logger.info("⏱️ Database startup timings: %s (total %.4fs)", breakdown, total)
+
+    def _start_background_verification(self):
+        """Start auto-discovery (if enabled) and verification in a background task."""
+        if self._verification_task and not self._verification_task.done():
+            logger.debug("Background verification already running")
+            return
+
+        self._verification_task = asyncio.create_task(self._background_verification())
+
+    async def _background_verification(self):
+        """Run auto-discovery and verification without holding up startup."""
+        try:
+            if self.auto_discover:
+                with self._timed_phase("auto_discovery"):
+                    await self._auto_discover_databases()
+
+            with self._timed_phase("indexes"):
+                await self.ensure_indexes()
+
+            with self._timed_phase("verification"):
+                await self._verify_databases()
+
+            self._log_startup_timings()
+
+        except asyncio.CancelledError:
+            logger.debug("Background verification cancelled")
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Background database verification failed: {e}")
+
     async def _attempt_connection(self) -> bool:
         """
         Attempt to establish database connection with comprehensive error handling.
@@ -185,10 +317,14 @@ class DatabaseCore:
                     retryWrites=self.retry_writes,
                     retryReads=self.retry_reads,
                     heartbeatFrequencyMS=self.heartbeat_frequency,
-                    maxConnecting=5,
-                    waitQueueTimeoutMS=10000,
+                    maxConnecting=self.max_connecting,
+                    waitQueueTimeoutMS=self.wait_queue_timeout,
                     socketTimeoutMS=20000,
-                    appname="Discord-Forwarding-Bot"
+                    appname="Discord-Forwarding-Bot",
+                    event_listeners=[
+                        CommandLatencyListener(self.operation_metrics),
+                        PoolWaitListener(self.operation_metrics)
+                    ]
                 )
 
             logger.info("Testing database connection...")
@@ -216,10 +352,10 @@ class DatabaseCore:
         # First, create collections if they don't exist
         for collection_name in REQUIRED_COLLECTIONS:
             if collection_name not in await db.list_collection_names():
-                logger.info(f"Creating collection: {collection_name}")
+                logger.info("Creating collection: %s", collection_name)
                 await db.create_collection(collection_name)
             else:
-                logger.debug(f"Collection exists: {collection_name}")
+                logger.debug("Collection exists: %s", collection_name)
 
         # After ensuring collections exist, map them to the registry
         await self._map_database_collections("discord_forwarding_bot")
@@ -242,7 +378,7 @@ class DatabaseCore:
                 self.metrics["databases_discovered"] = len(user_databases) + (
                     1 if "discord_forwarding_bot" in self.databases else 0)
 
-                logger.info(f"📁 Found {len(user_databases)} additional databases to discover: {user_databases}")
+                logger.info("📁 Found %s additional databases to discover: %s", len(user_databases), user_databases)
 
                 for db_name in user_databases:
                     await self._map_database_collections(db_name)
@@ -252,7 +388,7 @@ class DatabaseCore:
                 COLLECTION_REGISTRY.update(self._build_collection_registry())
 
                 logger.info(
-                    f"✅ Auto-discovery completed: {self.metrics['collections_discovered']} total collections mapped")
+                    "✅ Auto-discovery completed: %s total collections mapped", self.metrics['collections_discovered'])
 
         except Exception as e:
             logger.error(f"❌ Auto-discovery failed: {e}", exc_info=True)
@@ -260,11 +396,11 @@ class DatabaseCore:
 
     async def _map_database_collections(self, db_name: str):
         """Map all collections for a specific database."""
-        logger.debug(f"Mapping collections for database: {db_name}")
+        logger.debug("Mapping collections for database: %s", db_name)
 
         # Check if database is already mapped to avoid duplicates
         if db_name in self.databases:
-            logger.debug(f"Database {db_name} already mapped, updating collections...")
+            logger.debug("Database %s already mapped, updating collections...", db_name)
 
         database = self.db_client[db_name]
         self.databases[db_name] = database
@@ -277,27 +413,40 @@ class DatabaseCore:
                 collection_name = collection_info['name']
 
                 if collection_name.startswith('system.'):
-                    logger.debug(f"  ⏭️  Skipping system collection: {collection_name}")
+                    logger.debug("  ⏭️  Skipping system collection: %s", collection_name)
                     continue
 
                 collections.append(collection_name)
-                attr_name = f"{db_name.lower()}_{collection_name.lower()}"
-
-                # Only increment counter if this is a new collection mapping
-                if attr_name not in self.collections:
-                    self.metrics["collections_discovered"] += 1
-
-                collection_ref = database[collection_name]
-                self.collections[attr_name] = collection_ref
-                setattr(self, attr_name, collection_ref)
+                attr_name = self._register_collection(db_name, collection_name)
 
-                logger.debug(f"  📄 Mapped: {db_name}.{collection_name} -> {attr_name}")
+                logger.debug("  📄 Mapped: %s.%s -> %s", db_name, collection_name, attr_name)
 
-            logger.info(f"✅ Database '{db_name}': {len(collections)} collections mapped")
+            logger.info("✅ Database '%s': %s collections mapped", db_name, len(collections))
 
         except Exception as e:
             logger.error(f"❌ Failed to map collections for database '{db_name}': {e}")
 
+    def _register_collection(self, db_name: str, collection_name: str) -> str:
+        """
+        Register a collection reference without any server round trip.
+        Returns the registry key for the collection.
+        """
+        database = self.databases.get(db_name)
+        if database is None:
+            database = self.db_client[db_name]
+            self.databases[db_name] = database
+
+        attr_name = f"{db_name.lower()}_{collection_name.lower()}"
+
+        # Only increment counter if this is a new collection mapping
+        if attr_name not in self.collections:
+            self.metrics["collections_discovered"] += 1
+
+        collection_ref = database[collection_name]
+        self.collections[attr_name] = collection_ref
+        setattr(self, attr_name, collection_ref)
+        return attr_name
+
     def _build_collection_registry(self) -> Dict[str, Dict[str, Any]]:
         """Build a registry of all collections organized by database."""
         registry = {}
@@ -325,7 +474,8 @@ class DatabaseCore:
         }
 
         try:
-            for db_name, database in self.databases.items():
+            # Copy the registry: get_collection() may register new databases while we await.
+            for db_name, database in list(self.databases.items()):
                 with PerformanceLogger(logger, f"verify_{db_name}"):
                     collections = await database.list_collection_names()
                     verification_stats["databases"] += 1
@@ -336,16 +486,16 @@ class DatabaseCore:
                         count = await sample_collection.estimated_document_count()
                         verification_stats["total_documents"] += count
 
-                    logger.info(f"✅ Database '{db_name}': {len(collections)} collections verified")
+                    logger.info("✅ Database '%s': %s collections verified", db_name, len(collections))
 
         except Exception as e:
             logger.error(f"Database verification failed: {e}", exc_info=True)
             raise DatabaseConnectionError(f"Database verification failed: {e}") from e
 
         logger.info("📊 Verification Summary:")
-        logger.info(f"  • Databases: {verification_stats['databases']}")
-        logger.info(f"  • Collections: {verification_stats['collections']}")
-        logger.info(f"  • Total documents: {verification_stats['total_documents']:,}")
+        logger.info("  • Databases: %s", verification_stats['databases'])
+        logger.info("  • Collections: %s", verification_stats['collections'])
+        logger.info("  • Total documents: %s", format(verification_stats['total_documents'], ","))
 
     def _start_health_monitoring(self):
         """Start background health monitoring task"""
@@ -353,7 +503,7 @@ class DatabaseCore:
             logger.debug("Health monitoring already running")
             return
 
-        logger.info(f"🔄 Starting database health monitoring (interval: {self.health_check_interval}s)")
+        logger.info("🔄 Starting database health monitoring (interval: %ss)", self.health_check_interval)
         self._health_check_task = asyncio.create_task(self._health_monitor())
 
     async def _health_monitor(self):
@@ -363,13 +513,22 @@ class DatabaseCore:
         try:
             while not self._shutdown_event.is_set():
                 try:
-                    await asyncio.sleep(self.health_check_interval)
+                    interval = (self.health_check_interval if self.connection_state == "healthy"
+                                else self.degraded_check_interval)
+                    await asyncio.sleep(interval)
 
                     if self._shutdown_event.is_set():
                         break
 
                     await self._perform_health_check()
 
+                    if self._connection_healthy:
+                        self.pool_advisor.evaluate(self.pool_settings())
+
+                    if (not self._connection_healthy
+                            and self._consecutive_health_failures >= self.reconnect_after_failures):
+                        await self._reconnect_until_healthy()
+
                 except asyncio.CancelledError:
                     logger.info("Health monitoring task cancelled")
                     break
@@ -386,6 +545,9 @@ class DatabaseCore:
         """Perform database health check"""
         logger.debug("Performing database health check...")
 
+        # Fold driver-thread observations in regularly so the hand-off queue never overflows
+        self.operation_metrics.drain()
+
         try:
             with PerformanceLogger(logger, "health_check"):
                 await asyncio.wait_for(
@@ -395,117 +557,388 @@ class DatabaseCore:
 
                 if not self._connection_healthy:
                     logger.info("✅ Database connection recovered")
+                    self.circuit_breaker.reset()
 
                 self._connection_healthy = True
+                self._consecutive_health_failures = 0
+                self._last_healthy_at = time.monotonic()
                 self.metrics["last_health_check"] = datetime.now(timezone.utc)
                 logger.debug("✅ Database health check passed")
 
+            await self._set_connection_state("healthy")
+
         except asyncio.TimeoutError:
             logger.warning("⚠️ Database health check timed out")
-            self._connection_healthy = False
-            self.metrics["health_check_failures"] += 1
+            await self._record_health_failure()
 
         except Exception as e:
             logger.warning(f"⚠️ Database health check failed: {e}")
-            self._connection_healthy = False
-            self.metrics["health_check_failures"] += 1
+            await self._record_health_failure()
+
+    async def _record_health_failure(self):
+        """Mark the connection unhealthy after a failed health check."""
+        self._connection_healthy = False
+        self._consecutive_health_failures += 1
+        self.metrics["health_check_failures"] += 1
+
+        if self.connection_state == "healthy":
+            await self._set_connection_state("degraded")
+
+    async def _reconnect_until_healthy(self):
+        """Reconnect with capped, jittered exponential backoff until healthy or shutting down."""
+        attempt = 0
+        while not self._shutdown_event.is_set():
+            attempt += 1
+            self.recovery_metrics["reconnect_attempts_last_outage"] = attempt
+
+            if await self.reconnect(max_retries=1):
+                return
+
+            delay = min(self.max_reconnect_delay, 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            logger.warning(f"⏳ Reconnect attempt {attempt} failed, next attempt in {delay:.1f}s")
+            try:
+                await asyncio.wait_for(self._shutdown_event.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def add_connection_state_listener(self, callback: Callable):
+        """
+        Add a listener for connection state changes.
+        The callback will be called with the previous and the new state as arguments.
+        """
+        self._connection_state_listeners.append(callback)
+        logger.debug("Added connection state listener: %s", callback.__name__)
+
+    async def _set_connection_state(self, state: str):
+        """Transition the connection state machine, tracking outages and notifying listeners."""
+        previous = self.connection_state
+        if state == previous:
+            return
+
+        self.connection_state = state
+        now = time.monotonic()
+
+        if state == "disconnected":
+            # Deliberate shutdown, not an outage
+            self._outage_started = None
+        elif previous == "healthy":
+            self._outage_started = now
+            self._last_healthy_before_outage = self._last_healthy_at
+            self.recovery_metrics["outages"] += 1
+            self.recovery_metrics["reconnect_attempts_last_outage"] = 0
+        elif state == "healthy" and self._outage_started is not None:
+            time_to_recovery = now - self._outage_started
+            self.recovery_metrics["recoveries"] += 1
+            self.recovery_metrics["last_time_to_recovery"] = round(time_to_recovery, 3)
+            self.recovery_metrics["max_time_to_recovery"] = round(
+                max(self.recovery_metrics["max_time_to_recovery"], time_to_recovery), 3)
+            self.recovery_metrics["total_downtime"] = round(
+                self.recovery_metrics["total_downtime"] + time_to_recovery, 3)
+            if self._last_healthy_before_outage is not None:
+                self.recovery_metrics["last_unavailable_window"] = round(now - self._last_healthy_before_outage, 3)
+            self._outage_started = None
+            logger.info("⏱️ Database recovered in %.2fs after %s reconnect attempt(s)",
+                        time_to_recovery, self.recovery_metrics['reconnect_attempts_last_outage'])
+
+        logger.info("🔀 Database connection state: %s → %s", previous, state)
+
+        for listener in self._connection_state_listeners:
+            try:
+                if asyncio.iscoroutinefunction(listener):
+                    await listener(previous, state)
+                else:
+                    listener(previous, state)
+            except Exception as e:
+                logger.error(f"Error in connection state listener {listener.__name__}: {e}")
 
     @asynccontextmanager
-    async def operation_context(self, operation_name: str):
-        """Context manager for database operations with error tracking"""
-        logger.debug(f"Starting database operation: {operation_name}")
+    async def operation_context(self, operation_name: str, log_errors: bool = True):
+        """
+        Context manager for database operations with error tracking.
+        Latency is recorded in `operation_metrics` instead of being logged per operation.
+        """
+        logger.debug("Starting database operation: %s", operation_name)
         self.metrics["total_operations"] += 1
+        self.operation_metrics.operation_started(operation_name)
+        start = time.perf_counter()
+        failed = False
 
         try:
-            with PerformanceLogger(logger, f"db_operation_{operation_name}"):
-                yield
-                logger.debug(f"✅ Database operation completed: {operation_name}")
+            yield
+            logger.debug("✅ Database operation completed: %s", operation_name)
         except Exception as e:
+            failed = True
             self.metrics["failed_operations"] += 1
-            logger.error(f"❌ Database operation failed: {operation_name} - {e}", exc_info=True)
+            if log_errors:
+                logger.error(f"❌ Database operation failed: {operation_name} - {e}", exc_info=True)
             raise DatabaseOperationError(f"Operation '{operation_name}' failed: {e}") from e
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000.0
+            self.operation_metrics.operation_finished(operation_name, duration_ms, failed)
+            # Part of the current message's trace, if one is being recorded
+            record_span(f"db.{operation_name}", int(duration_ms * 1_000_000), failed)
 
-    async def execute_with_retry(self, operation, operation_name: str, max_retries: int = 3):
+    def _check_circuit(self, operation_name: str):
         """
-        Execute database operation with automatic retry logic
+        Fail fast instead of queueing operations against a database known to be down.
+        While degraded (failed health checks) operations still go through, and the circuit
+        breaker decides from their outcomes; only a reconnect in progress rejects everything.
         """
-        logger.debug(f"Executing operation with retry: {operation_name}")
+        if self.connection_state == "reconnecting":
+            reason = f"connection is {self.connection_state}"
+        elif not self.circuit_breaker.allow():
+            reason = f"circuit breaker is {self.circuit_breaker.state}"
+        else:
+            return
+
+        self.metrics["circuit_rejections"] += 1
+        logger.debug("⛔ Rejecting %s: %s", operation_name, reason)
+        raise DatabaseUnavailableError(f"Operation '{operation_name}' rejected: {reason}")
 
-        for attempt in range(1, max_retries + 1):
+    async def execute_with_retry(
+            self,
+            operation,
+            operation_name: str,
+            max_retries: Optional[int] = None,
+            idempotent: bool = True,
+            deadline: Optional[float] = None
+    ):
+        """
+        Execute a database operation under the retry policy.
+        `operation` is a zero-argument coroutine function so every attempt issues a fresh call.
+        Transient and not-primary errors are retried; network errors (outcome unknown) are only
+        retried when `idempotent` is True; everything else is raised immediately.
+        `max_retries` caps the retries after the first attempt (0: never retry); by default the
+        policy's max_attempts applies.
+        """
+        self._check_circuit(operation_name)
+
+        policy = self.retry_policy
+        max_attempts = policy.max_attempts if max_retries is None else max_retries + 1
+        give_up_at = time.monotonic() + (deadline if deadline is not None else policy.deadline)
+
+        for attempt in range(1, max_attempts + 1):
+            remaining = give_up_at - time.monotonic()
             try:
-                async with self.operation_context(f"{operation_name}_attempt_{attempt}"):
-                    result = await operation()
+                async with self.operation_context(operation_name, log_errors=False):
+                    result = await asyncio.wait_for(operation(), timeout=max(remaining, 0.001))
+            except DatabaseOperationError as e:
+                error_class = classify_error(e.__cause__ or e)
+                if error_class is ErrorClass.NON_RETRYABLE:
+                    # The server answered, so the database itself is reachable
+                    self.circuit_breaker.record_success()
+                else:
+                    self.circuit_breaker.record_failure()
+
+                delay = policy.backoff(attempt)
+                if (not should_retry(error_class, idempotent)
+                        or attempt >= max_attempts
+                        or time.monotonic() + delay >= give_up_at):
+                    logger.error(f"❌ Operation failed after {attempt} attempt(s) "
+                                 f"({error_class.value}): {operation_name} - {e.__cause__ or e}")
+                    raise
 
+                self.metrics["retried_operations"] += 1
+                logger.warning(f"⚠️ Operation attempt {attempt} failed ({error_class.value}), "
+                               f"retrying in {delay:.2f}s: {operation_name}")
+                await asyncio.sleep(delay)
+            else:
+                self.circuit_breaker.record_success()
                 if attempt > 1:
-                    logger.info(f"✅ Operation succeeded after {attempt} attempts: {operation_name}")
-
+                    logger.info("✅ Operation succeeded after %s attempts: %s", attempt, operation_name)
                 return result
 
-            except Exception:
-                if attempt < max_retries:
-                    logger.warning(f"⚠️ Operation attempt {attempt} failed, retrying: {operation_name}")
-                    await asyncio.sleep(0.5 * attempt)
+        raise DatabaseOperationError(f"Operation '{operation_name}' failed after {max_attempts} attempts")
+
+    async def run_bulk(
+            self,
+            items: Sequence[Union[BulkWrite, Callable]],
+            operation_name: str,
+            concurrency: Optional[int] = None,
+            batch_size: int = 500,
+            retry: bool = True,
+            idempotent: bool = False
+    ) -> List[BulkItemResult]:
+        """
+        Run a batch of independent operations on at most `concurrency` workers.
+        The default cap is half the connection pool so foreground traffic keeps its connections.
+        BulkWrite items are grouped per collection into unordered bulk_write calls of up to
+        `batch_size` requests; callables (zero-argument coroutine functions) run one by one.
+        Returns one BulkItemResult per item in input order; a failing item never stops the rest.
+        Callables are retried as non-idempotent writes unless `idempotent=True` (e.g. reads);
+        pass `retry=False` for callables that already retry on their own (storage methods).
+        """
+        results: List[Optional[BulkItemResult]] = [None] * len(items)
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        calls: List[int] = []
+        for index, item in enumerate(items):
+            if isinstance(item, BulkWrite):
+                groups.setdefault((item.database, item.collection), []).append(index)
+            else:
+                calls.append(index)
+
+        limit = max(1, min(concurrency or self.max_pool_size // 2, self.max_pool_size))
+
+        async def run(operation, can_replay: bool):
+            if retry:
+                return await self.execute_with_retry(operation, operation_name, idempotent=can_replay)
+            return await operation()
+
+        async def run_call(index: int):
+            try:
+                results[index] = BulkItemResult(ok=True, result=await run(items[index], idempotent))
+            except Exception as e:
+                cause = e.__cause__ or e
+                results[index] = BulkItemResult(ok=False, error=str(cause), code=getattr(cause, "code", None))
+
+        async def run_chunk(database: str, collection_name: str, indexes: List[int]):
+            requests = [items[index].request for index in indexes]
+            # An unordered insert that may have partly applied must not be replayed blindly
+            can_replay = not any(isinstance(request, InsertOne) for request in requests)
+            write_errors: Dict[int, Dict[str, Any]] = {}
+            try:
+                collection = self.get_collection(database, collection_name)
+                result = await run(lambda: collection.bulk_write(requests, ordered=False), can_replay)
+            except Exception as e:
+                cause = e.__cause__ or e
+                if not isinstance(cause, BulkWriteError):
+                    for index in indexes:
+                        results[index] = BulkItemResult(ok=False, error=str(cause), code=getattr(cause, "code", None))
+                    return
+                # Everything without a write error was applied
+                result = BulkWriteResult(cause.details, acknowledged=True)
+                write_errors = {error["index"]: error for error in cause.details.get("writeErrors", [])}
+
+            upserted_ids = result.upserted_ids or {}
+            for position, index in enumerate(indexes):
+                error = write_errors.get(position)
+                if error:
+                    results[index] = BulkItemResult(ok=False, result=result,
+                                                    error=error.get("errmsg"), code=error.get("code"))
                 else:
-                    logger.error(f"❌ Operation failed after {max_retries} attempts: {operation_name}")
-                    raise
+                    results[index] = BulkItemResult(ok=True, result=result, upserted_id=upserted_ids.get(position))
+
+        # Coroutines are only created as workers pick jobs up, so a large batch costs no more
+        # than `limit` pending coroutines at a time
+        jobs: List[Callable] = [partial(run_call, index) for index in calls]
+        for (database, collection_name), indexes in groups.items():
+            for start in range(0, len(indexes), batch_size):
+                jobs.append(partial(run_chunk, database, collection_name, indexes[start:start + batch_size]))
+        chunk_count = len(jobs) - len(calls)
 
-        raise DatabaseOperationError(f"Operation '{operation_name}' failed after {max_retries} attempts")
+        pending = iter(jobs)
+
+        async def worker():
+            for job in pending:
+                await job()
+
+        await asyncio.gather(*(worker() for _ in range(min(limit, len(jobs)))))
+
+        failures = sum(1 for result in results if not result.ok)
+        self.metrics["bulk_items"] += len(items)
+        self.metrics["bulk_item_failures"] += failures
+        log = logger.warning if failures else logger.debug
+        log(f"📦 Bulk {operation_name}: {len(items) - failures}/{len(items)} item(s) succeeded "
+            f"({len(calls)} call(s), {chunk_count} bulk_write(s), concurrency {limit})")
+        return results
 
     def _log_connection_metrics(self):
         """Log current connection and performance metrics"""
         logger.info("📊 Database Connection Metrics:")
-        logger.info(f"  • Connection attempts: {self.metrics['connection_attempts']}")
-        logger.info(f"  • Successful connections: {self.metrics['successful_connections']}")
-        logger.info(f"  • Failed connections: {self.metrics['failed_connections']}")
-        logger.info(f"  • Reconnection attempts: {self.metrics['reconnection_attempts']}")
-        logger.info(f"  • Health check failures: {self.metrics['health_check_failures']}")
-        logger.info(f"  • Total operations: {self.metrics['total_operations']}")
-        logger.info(f"  • Failed operations: {self.metrics['failed_operations']}")
-        logger.info(f"  • Databases discovered: {self.metrics['databases_discovered']}")
-        logger.info(f"  • Collections discovered: {self.metrics['collections_discovered']}")
+        logger.info("  • Connection attempts: %s", self.metrics['connection_attempts'])
+        logger.info("  • Successful connections: %s", self.metrics['successful_connections'])
+        logger.info("  • Failed connections: %s", self.metrics['failed_connections'])
+        logger.info("  • Reconnection attempts: %s", self.metrics['reconnection_attempts'])
+        logger.info("  • Health check failures: %s", self.metrics['health_check_failures'])
+        logger.info("  • Total operations: %s", self.metrics['total_operations'])
+        logger.info("  • Failed operations: %s", self.metrics['failed_operations'])
+        logger.info("  • Databases discovered: %s", self.metrics['databases_discovered'])
+        logger.info("  • Collections discovered: %s", self.metrics['collections_discovered'])
 
         success_rate = (
             (self.metrics['successful_connections'] / self.metrics['connection_attempts'] * 100)
             if self.metrics['connection_attempts'] > 0 else 0
         )
-        logger.info(f"  • Connection success rate: {success_rate:.1f}%")
+        logger.info("  • Connection success rate: %.1f%%", success_rate)
 
         if self.metrics['total_operations'] > 0:
             operation_success_rate = (
                 ((self.metrics['total_operations'] - self.metrics['failed_operations']) /
                  self.metrics['total_operations'] * 100)
             )
-            logger.info(f"  • Operation success rate: {operation_success_rate:.1f}%")
+            logger.info("  • Operation success rate: %.1f%%", operation_success_rate)
 
     @log_performance("database_reconnection")
-    async def reconnect(self) -> bool:
+    async def reconnect(self, max_retries: int = 3) -> bool:
         """
-        Attempt to reconnect to the database
+        Attempt to reconnect to the database.
+        Concurrent callers wait for the reconnect already in progress instead of starting another.
         """
-        logger.info("🔄 Attempting database reconnection...")
-        self.metrics["reconnection_attempts"] += 1
+        if self._reconnect_lock.locked():
+            logger.debug("Reconnect already in progress, waiting for it to finish...")
+            async with self._reconnect_lock:
+                return self.is_healthy()
 
-        try:
-            if self.db_client:
-                logger.debug("Closing existing database connection...")
-                self.db_client.close()
+        async with self._reconnect_lock:
+            logger.info("🔄 Attempting database reconnection...")
+            self.metrics["reconnection_attempts"] += 1
+            await self._set_connection_state("reconnecting")
+
+            try:
+                if self.db_client:
+                    logger.debug("Closing existing database connection...")
+                    self.db_client.close()
 
-            self._initialized = False
-            self._connection_healthy = False
+                # Collection handles and read views are bound to the old client
+                self.databases.clear()
+                self.collections.clear()
+                self._read_views.clear()
 
-            success = await self.initialize(max_retries=3, retry_delay=1.0)
+                if self.auto_tune_pool:
+                    self.apply_pool_recommendation()
 
-            if success:
-                logger.info("✅ Database reconnection successful")
-            else:
-                logger.error("❌ Database reconnection failed")
+                self._initialized = False
+                self._connection_healthy = False
 
-            return success
+                success = await self.initialize(max_retries=max_retries, retry_delay=1.0)
 
-        except Exception as e:
-            logger.error(f"❌ Database reconnection error: {e}", exc_info=True)
+                if success:
+                    self.circuit_breaker.reset()
+                    logger.info("✅ Database reconnection successful")
+                else:
+                    logger.error("❌ Database reconnection failed")
+
+                return success
+
+            except Exception as e:
+                logger.error(f"❌ Database reconnection error: {e}", exc_info=True)
+                return False
+
+    def pool_settings(self) -> PoolSettings:
+        """The pool settings the next client will be created with."""
+        return PoolSettings(
+            max_pool_size=self.max_pool_size,
+            min_pool_size=self.min_pool_size,
+            max_connecting=self.max_connecting,
+            wait_queue_timeout=self.wait_queue_timeout
+        )
+
+    def apply_pool_recommendation(self) -> bool:
+        """
+        Adopt the pool advisor's pending recommendation.
+        The settings take effect when the client is next created, i.e. on reconnect.
+        """
+        settings = self.pool_advisor.take_recommendation()
+        if settings is None:
             return False
 
+        logger.info("🏊 Applying pool settings: %s -> %s", self.pool_settings(), settings)
+        self.max_pool_size = settings.max_pool_size
+        self.min_pool_size = settings.min_pool_size
+        self.max_connecting = settings.max_connecting
+        self.wait_queue_timeout = settings.wait_queue_timeout
+        return True
+
     def is_healthy(self) -> bool:
         """
         Check if database connection is healthy
@@ -519,17 +952,54 @@ class DatabaseCore:
         return {
             "initialized": self._initialized,
             "healthy": self._connection_healthy,
+            "state": self.connection_state,
+            "recovery": self.recovery_metrics.copy(),
             "metrics": self.metrics.copy(),
             "config": {
                 "max_pool_size": self.max_pool_size,
                 "min_pool_size": self.min_pool_size,
+                "max_connecting": self.max_connecting,
+                "wait_queue_timeout": self.wait_queue_timeout,
+                "auto_tune_pool": self.auto_tune_pool,
                 "connection_timeout": self.connection_timeout,
                 "server_selection_timeout": self.server_selection_timeout,
+                "auto_discover": self.auto_discover,
+            },
+            "startup_timings": self.startup_timings.copy(),
+            "circuit_breaker": {
+                "state": self.circuit_breaker.state,
+                "consecutive_failures": self.circuit_breaker.consecutive_failures,
             },
+            "operations": self.operation_metrics.snapshot(),
+            "pool_advisor": self.pool_advisor.snapshot(),
             "databases_count": len(self.databases),
             "collections_count": len(self.collections)
         }
 
+    def export_prometheus_metrics(self) -> str:
+        """
+        Export operation latency histograms, gauges and pool metrics in Prometheus text format.
+        """
+        prefix = "stygian_db"
+        lines = [self.operation_metrics.export_prometheus(prefix).rstrip("\n")]
+
+        lines.append(f"# TYPE {prefix}_connection_healthy gauge")
+        lines.append(f"{prefix}_connection_healthy {int(self.connection_state == 'healthy')}")
+        for name in ("outages", "recoveries"):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {self.recovery_metrics[name]}")
+        for name in ("last_time_to_recovery", "max_time_to_recovery", "total_downtime"):
+            lines.append(f"# TYPE {prefix}_{name}_seconds gauge")
+            lines.append(f"{prefix}_{name}_seconds {self.recovery_metrics[name] or 0}")
+
+        lines.append(f"# TYPE {prefix}_pool_saturation_events_total counter")
+        lines.append(f"{prefix}_pool_saturation_events_total {self.pool_advisor.counters['saturation_events']}")
+        recommendation = self.pool_advisor.recommendation or {}
+        lines.append(f"# TYPE {prefix}_pool_recommended_max_size gauge")
+        lines.append(f"{prefix}_pool_recommended_max_size {recommendation.get('max_pool_size', self.max_pool_size)}")
+
+        return "\n".join(lines) + "\n"
+
     @log_performance("database_status_check")
     async def get_database_status(self) -> Dict[str, Any]:
         """
@@ -582,6 +1052,15 @@ class DatabaseCore:
             with log_context(logger, "database_cleanup", level=20):
                 self._shutdown_event.set()
 
+                if self._verification_task and not self._verification_task.done():
+                    logger.debug("Cancelling background verification task...")
+                    self._verification_task.cancel()
+
+                    try:
+                        await asyncio.wait_for(self._verification_task, timeout=5.0)
+                    except (asyncio.CancelledError, asyncio.TimeoutError):
+                        logger.debug("Background verification task cancelled/timed out")
+
                 if self._health_check_task and not self._health_check_task.done():
                     logger.debug("Cancelling health monitoring task...")
                     self._health_check_task.cancel()
@@ -600,8 +1079,11 @@ class DatabaseCore:
                 self.db_client = None
                 self.databases.clear()
                 self.collections.clear()
+                self._read_views.clear()
+                self._causal_tokens.clear()
                 self._initialized = False
                 self._connection_healthy = False
+                await self._set_connection_state("disconnected")
 
                 from .constants import DATABASE_MAPPINGS, COLLECTION_REGISTRY
                 DATABASE_MAPPINGS.clear()
@@ -619,7 +1101,7 @@ class DatabaseCore:
         """Setup signal handlers for graceful shutdown"""
 
         def signal_handler(signum, frame):
-            logger.info(f"📡 Received signal {signum}, initiating graceful shutdown...")
+            logger.info("📡 Received signal %s, initiating graceful shutdown...", signum)
             asyncio.create_task(self.close())
 
         try:
@@ -641,14 +1123,97 @@ class DatabaseCore:
     def get_collection(self, database_name: str, collection_name: str) -> Any:
         """
         Get a collection reference by database and collection names.
+        Collections that have not been mapped yet are resolved lazily on first use;
+        MongoDB creates the collection on its first write.
         """
         attr_name = f"{database_name.lower()}_{collection_name.lower()}"
 
-        if attr_name in self.collections:
-            return self.collections[attr_name]
-        else:
+        collection = self.collections.get(attr_name)
+        if collection is not None:
+            return collection
+
+        if not self.db_client:
             raise DatabaseOperationError(
-                f"Collection '{database_name}.{collection_name}' not found. Available collections: {list(self.collections.keys())}")
+                f"Collection '{database_name}.{collection_name}' requested before the database client was initialized")
+
+        logger.debug("Lazily resolving collection: %s.%s", database_name, collection_name)
+        return self.collections[self._register_collection(database_name, collection_name)]
+
+    def get_read_collection(self, database_name: str, collection_name: str, operation: str) -> Any:
+        """
+        Get a collection reference configured with the read preference for an operation.
+        The profile is looked up in OPERATION_READ_PROFILES; unknown operations read from the primary.
+        """
+        profile = OPERATION_READ_PROFILES.get(operation, "primary")
+        collection = self.get_collection(database_name, collection_name)
+
+        if profile == "primary":
+            return collection
+
+        key = (f"{database_name.lower()}_{collection_name.lower()}", profile)
+        view = self._read_views.get(key)
+        if view is None:
+            view = collection.with_options(read_preference=READ_PREFERENCE_PROFILES[profile])
+            self._read_views[key] = view
+
+        self.metrics["secondary_eligible_reads"] += 1
+        return view
+
+    def _get_causal_token(self, scope: Optional[str]) -> Optional[tuple]:
+        """Return the scope's last write token if it is still inside the read-your-writes window."""
+        if scope is None:
+            return None
+
+        token = self._causal_tokens.get(scope)
+        if token and time.monotonic() - token[2] > self.read_your_writes_window:
+            del self._causal_tokens[scope]
+            return None
+        return token
+
+    def record_causal_write(self, scope: str, session) -> None:
+        """
+        Remember the cluster/operation time of a write made in `session` so later reads
+        for the same scope observe it, even when they are served by a secondary.
+        """
+        if session is None or session.operation_time is None:
+            # Standalone servers don't report operation times; reads there always see our writes.
+            return
+
+        now = time.monotonic()
+        self._causal_tokens[scope] = (session.cluster_time, session.operation_time, now)
+
+        if len(self._causal_tokens) > 10000:
+            cutoff = now - self.read_your_writes_window
+            self._causal_tokens = {k: v for k, v in self._causal_tokens.items() if v[2] >= cutoff}
+
+    @asynccontextmanager
+    async def causal_session(self, scope: Optional[str] = None, write: bool = False):
+        """
+        Context manager yielding a causally consistent session for a scope (usually a guild id).
+
+        For writes, the session's operation time is recorded for the scope on exit.
+        For reads, the session is advanced past the scope's last recorded write; if the scope
+        has no recent write there is nothing to wait for and None is yielded (no session).
+        """
+        token = self._get_causal_token(scope)
+        if not write and token is None:
+            yield None
+            return
+
+        if not self.db_client:
+            raise DatabaseConnectionError("Database client not initialized")
+
+        async with await self.db_client.start_session(causal_consistency=True) as session:
+            if token is not None:
+                if token[0] is not None:
+                    session.advance_cluster_time(token[0])
+                session.advance_operation_time(token[1])
+                self.metrics["causal_reads"] += 1
+
+            yield session
+
+            if write and scope is not None:
+                self.record_causal_write(scope, session)
 
     def list_databases(self) -> List[str]:
         """Get list of all discovered databases."""
@@ -670,6 +1235,31 @@ class DatabaseCore:
                                    attr.startswith(f"{db_key}_")]
             return result
 
+    async def ensure_indexes(self):
+        """
+        Create the secondary indexes in REQUIRED_INDEXES.
+        An existing index whose keys or options differ from its definition is dropped and
+        rebuilt; create_index is a no-op for indexes that already match.
+        """
+        for collection_name, indexes in REQUIRED_INDEXES.items():
+            collection = self.get_collection("discord_forwarding_bot", collection_name)
+            try:
+                existing = await collection.index_information()
+            except Exception as e:
+                logger.warning(f"⚠️ Could not list indexes on {collection_name}: {e}")
+                existing = {}
+
+            for keys, options in indexes:
+                try:
+                    current = existing.get(options["name"])
+                    if current is not None and not _index_matches(current, keys, options):
+                        logger.info("🔁 Rebuilding index %s on %s: definition changed", options["name"], collection_name)
+                        await collection.drop_index(options["name"])
+                    await collection.create_index(keys, **options)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not create index {options.get('name', keys)} "
+                                   f"on {collection_name}: {e}")
+
     async def ensure_database_structure(self):
         """
         Ensure the complete database structure exists for the bot.
@@ -690,20 +1280,34 @@ class DatabaseCore:
 
             for collection_name in REQUIRED_COLLECTIONS:
                 if collection_name not in existing_collections:
-                    logger.info(f"Creating collection: discord_forwarding_bot.{collection_name}")
+                    logger.info("Creating collection: discord_forwarding_bot.%s", collection_name)
                     await db.create_collection(collection_name)
                     created_collections.append(collection_name)
                 else:
-                    logger.debug(f"Collection exists: discord_forwarding_bot.{collection_name}")
+                    logger.debug("Collection exists: discord_forwarding_bot.%s", collection_name)
 
-            # Map the database and all its collections
-            await self._map_database_collections("discord_forwarding_bot")
+            # Map the required and existing collections from the listing we already have
+            for collection_name in REQUIRED_COLLECTIONS.union(existing_collections):
+                if not collection_name.startswith('system.'):
+                    self._register_collection("discord_forwarding_bot", collection_name)
 
             if created_collections:
-                logger.info(f"✅ Created {len(created_collections)} new collections: {created_collections}")
+                logger.info("✅ Created %s new collections: %s", len(created_collections), created_collections)
 
             logger.info("✅ Database structure verification completed")
 
         except Exception as e:
             logger.error(f"❌ Failed to ensure database structure: {e}", exc_info=True)
-            raise DatabaseConnectionError(f"Failed to ensure database structure: {e}") from e
\ No newline at end of file
+            raise DatabaseConnectionError(f"Failed to ensure database structure: {e}") from e
+
+
+# Index options compared against an existing index; the server reports the rest (v, ns, ...) itself
+_COMPARED_INDEX_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+def _index_matches(current: Dict[str, Any], keys: List[Tuple[str, Any]], options: Dict[str, Any]) -> bool:
+    """Whether an index_information() entry has the given keys and options."""
+    if [(field, int(direction) if isinstance(direction, float) else direction)
+            for field, direction in current.get("key", [])] != list(keys):
+        return False
+    return all(current.get(option) == options.get(option) for option in _COMPARED_INDEX_OPTIONS)
@@ -11,4 +11,31 @@ class DatabaseOperationError(Exception):
     Raised when a database operation fails.
     This could be due to a query error, constraint violation, or other operation-related issues.
     """
-    pass
\ No newline at end of file
+    pass
+
+
+class DatabaseUnavailableError(DatabaseConnectionError):
+    """
+    Raised when an operation is rejected without being attempted.
+    This happens while the connection is known to be unhealthy or the circuit breaker is open.
+    """
+    pass
+
+
+class RuleLimitExceededError(DatabaseOperationError):
+    """
+    Raised when adding a forwarding rule would exceed the guild's rule limit.
+    The limit is checked atomically inside the update, so this is authoritative.
+    """
+
+    def __init__(self, max_rules: int):
+        self.max_rules = max_rules
+        super().__init__(f"Guild already has the maximum of {max_rules} forwarding rules")
+
+
+class ConcurrentModificationError(DatabaseOperationError):
+    """
+    Raised when a compare-and-swap update finds that the document changed since it was read.
+    The caller should reload the current version and retry or ask the user to.
+    """
+    pass
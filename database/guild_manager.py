@@ -1,11 +1,16 @@
 import os
+import time
 import asyncio
+import tracemalloc
 import uuid
 from typing import Dict, Any, List, Callable, Optional
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from logger.logger_setup import get_logger
-from .exceptions import DatabaseOperationError
+from .exceptions import DatabaseOperationError, RuleLimitExceededError, ConcurrentModificationError
 from .constants import DEFAULT_BOT_SETTINGS, DEFAULT_GUILD_SETTINGS_TEMPLATE
+from .storage import StorageBackend, MongoStorage
+from .snowflake import GuildId, RULE_SNOWFLAKE_FIELDS, guild_key, normalize_rule, to_snowflake
+from .rule_index import GuildRuleIndex, RULE_INDEX_PROJECTION
 
 logger = get_logger("GuildManager", level=20, json_format=False, colored_console=True)
 
@@ -14,10 +19,17 @@ class GuildManager:
     """
     Manages all database operations related to guilds, including settings,
     rules, and logging. It also provides an observer pattern for guild events.
+    Reads and writes go through a StorageBackend (MongoDB unless another is given);
+    caching, background jobs and event listeners live here.
+    Guild ids may be passed as ints or strings; rules always come back with int channel ids.
     """
 
-    def __init__(self, database_core):
+    def __init__(self, database_core, storage: Optional[StorageBackend] = None,
+                 entitlement_refresh_interval: int = 300, stats_cache_ttl: float = 60.0,
+                 daily_count_ttl: float = 60.0,
+                 warm_start: bool = False, warm_start_batch_size: int = 1000):
         self.db = database_core
+        self.storage = storage or MongoStorage(database_core)
         # Observer pattern listeners: other parts of the bot can subscribe to these events.
         self._guild_join_listeners: List[Callable] = []
         self._guild_leave_listeners: List[Callable] = []
@@ -26,16 +38,61 @@ class GuildManager:
             "guilds_auto_configured": 0,
             "guilds_removed": 0,
             "welcome_messages_sent": 0,
-            "setup_errors": 0
+            "setup_errors": 0,
+            "entitlement_refreshes": 0,
+            "entitlement_cache_misses": 0,
+            "rule_index_hits": 0,
+            "rule_index_misses": 0,
+            "daily_count_hits": 0,
+            "daily_count_misses": 0
         }
 
+        # Global config and premium entitlement cache, filled by refresh_entitlements().
+        # Premium entries carry the subscription's expires_at, so they lapse exactly on time
+        # without a TTL; the periodic refresh only picks up subscriptions written elsewhere.
+        self._bot_settings: Optional[Dict[str, Any]] = None
+        self._premium_expiry: Dict[str, datetime] = {}  # guild_id -> latest active expires_at (UTC)
+        self._entitlements_loaded = False
+        self._entitlement_generation = 0  # Bumped by local writes so an in-flight refresh can't clobber them
+        self._entitlement_refresh_task: Optional[asyncio.Task] = None
+        self._recovery_refresh_task: Optional[asyncio.Task] = None  # One-off refresh after an outage
+        self.entitlement_refresh_interval = entitlement_refresh_interval  # Seconds between background refreshes
+
+        self.db.add_connection_state_listener(self._on_connection_state_change)
+
+        # Forwarding statistics results: (guild_id, days, rule_id) -> (expires_at monotonic, stats)
+        self._stats_cache: Dict[tuple, tuple] = {}
+        self.stats_cache_ttl = stats_cache_ttl  # Seconds a stats result is reused
+
+        # Today's successful forwards per guild: guild_id -> [start of day (UTC), count, reconcile_at monotonic].
+        # Bumped in memory by log_forwarded_message() and recounted from storage every `daily_count_ttl`
+        # seconds, so forwards logged by other processes are picked up too.
+        self._daily_counts: Dict[str, list] = {}
+        self.daily_count_ttl = daily_count_ttl
+
+        # Guild data purges: guild_id -> job record (status, deleted counts, timestamps, task).
+        # Running jobs are always kept; of the finished ones only the most recent are.
+        self.purge_jobs: Dict[str, Dict[str, Any]] = {}
+        self.max_finished_purge_jobs = 100
+
+        # Compiled rule indexes for the message path, built on first use or all at once by
+        # warm_start(), and dropped by every write that goes through this manager.
+        self._rule_indexes: Dict[str, GuildRuleIndex] = {}
+        self._rule_guilds: Dict[str, str] = {}  # rule_id -> guild_id of every indexed rule
+        self._rule_index_loads: Dict[str, asyncio.Future] = {}  # Coalesces concurrent misses per guild
+        self._rule_index_generation = 0  # Bumped by invalidations so an in-flight load can't install stale data
+        self._warm_start_dirty: Optional[set] = None  # Guild and rule ids invalidated while warm_start() runs
+        self.warm_start_enabled = warm_start
+        self.warm_start_batch_size = warm_start_batch_size
+        self.warm_start_report: Optional[Dict[str, Any]] = None
+
     def add_guild_join_listener(self, callback: Callable):
         """
         Add a listener for guild join events.
         The callback will be called with the guild_id and guild_name as arguments.
         """
         self._guild_join_listeners.append(callback)
-        logger.debug(f"Added guild join listener: {callback.__name__}")
+        logger.debug("Added guild join listener: %s", callback.__name__)
 
     def add_guild_leave_listener(self, callback: Callable):
         """
@@ -43,14 +100,15 @@ class GuildManager:
         The callback will be called with the guild_id and guild_name as arguments.
         """
         self._guild_leave_listeners.append(callback)
-        logger.debug(f"Added guild leave listener: {callback.__name__}")
+        logger.debug("Added guild leave listener: %s", callback.__name__)
 
     async def _notify_guild_join(self, guild_id: str, guild_name: str):
         """Internal method to notify all registered listeners about a guild join."""
         if not self._guild_join_listeners:
             return
 
-        logger.info(f"Notifying {len(self._guild_join_listeners)} listeners about guild join: {guild_name} ({guild_id})")
+        logger.info("Notifying %s listeners about guild join: %s (%s)",
+                    len(self._guild_join_listeners), guild_name, guild_id)
         for listener in self._guild_join_listeners:
             try:
                 if asyncio.iscoroutinefunction(listener):
@@ -65,7 +123,8 @@ class GuildManager:
         if not self._guild_leave_listeners:
             return
 
-        logger.info(f"Notifying {len(self._guild_leave_listeners)} listeners about guild leave: {guild_name} ({guild_id})")
+        logger.info("Notifying %s listeners about guild leave: %s (%s)",
+                    len(self._guild_leave_listeners), guild_name, guild_id)
         for listener in self._guild_leave_listeners:
             try:
                 if asyncio.iscoroutinefunction(listener):
@@ -82,51 +141,183 @@ class GuildManager:
         from the default template, it's updated.
         """
         logger.info("⚙️ Initializing default bot settings...")
-        bot_settings = self.db.get_collection("discord_forwarding_bot", "bot_settings")
-
         default_settings = DEFAULT_BOT_SETTINGS.copy()
         default_settings["_id"] = "global_config"
         default_settings["master_admin_id"] = os.getenv("BOT_OWNER_ID", "")
         default_settings["created_at"] = datetime.now(timezone.utc)
         default_settings["updated_at"] = datetime.now(timezone.utc)
 
-        existing = await bot_settings.find_one({"_id": "global_config"})
+        existing = await self.storage.get_bot_settings()
         if not existing:
-            await bot_settings.insert_one(default_settings)
+            await self.storage.create_bot_settings(default_settings)
+            self._cache_bot_settings(default_settings)
             logger.info("✅ Default bot settings initialized")
         else:
             # Check for and add any missing fields from the default settings.
             update_fields = {key: value for key, value in default_settings.items() if key not in existing}
             if update_fields:
-                await bot_settings.update_one(
-                    {"_id": "global_config"},
-                    {"$set": update_fields}
-                )
-                logger.info(f"✅ Updated bot settings with new fields: {list(update_fields.keys())}")
+                await self.storage.update_bot_settings(update_fields)
+                self._cache_bot_settings({**existing, **update_fields})
+                logger.info("✅ Updated bot settings with new fields: %s", list(update_fields.keys()))
             else:
+                self._cache_bot_settings(existing)
                 logger.info("✅ Bot settings already exist and are up-to-date")
 
-    async def setup_new_guild(self, guild_id: str, guild_name: str) -> Dict[str, Any]:
+    async def migrate_snowflake_ids(self) -> int:
+        """
+        One-off migration storing every rule's channel ids as ints.
+        Completion is recorded in bot_settings.migrations, so later startups skip the scan.
+        Returns the number of rules rewritten.
+        """
+        if (await self.get_bot_settings()).get("migrations", {}).get("snowflake_ids"):
+            return 0
+
+        logger.info("🔢 Migrating rule channel ids to int snowflakes...")
+        updates = []
+        for guild in await self.storage.list_guilds():
+            for rule in guild.get("rules", []):
+                try:
+                    fields = {field: to_snowflake(rule[field]) for field in RULE_SNOWFLAKE_FIELDS
+                              if rule.get(field) is not None and type(rule[field]) is not int}
+                except ValueError as e:
+                    logger.warning(f"⚠️ Skipping rule {rule.get('rule_id')} in guild {guild.get('_id')}: {e}")
+                    continue
+
+                # A concurrent edit fails the version check; it normalizes the ids itself
+                if fields:
+                    updates.append(lambda rule=rule, fields=fields: self.storage.update_rule(
+                        rule["rule_id"], fields, rule.get("version", 0)))
+
+        # Storage calls retry on their own, so the bulk executor only bounds concurrency
+        results = await self.db.run_bulk(updates, "migrate_snowflake_ids", retry=False)
+        migrated = sum(1 for item in results if item.ok and item.result)
+        failed = sum(1 for item in results if not item.ok)
+        if failed:
+            # Leave the migration unmarked so the next startup picks up the rest
+            logger.warning(f"⚠️ Snowflake migration: {failed} rule update(s) failed, will retry on next startup")
+            return migrated
+
+        self.invalidate_rule_index()
+        await self.update_bot_settings({"migrations.snowflake_ids": datetime.now(timezone.utc)})
+        logger.info("✅ Snowflake migration complete: %s rule(s) updated", migrated)
+        return migrated
+
+    async def get_bot_settings(self) -> Dict[str, Any]:
+        """Get the global bot settings, served from the entitlement cache once loaded."""
+        if self._bot_settings is None:
+            self.metrics["entitlement_cache_misses"] += 1
+            self._cache_bot_settings(await self.storage.get_bot_settings() or {})
+        return self._bot_settings
+
+    async def update_bot_settings(self, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Update the global bot settings and refresh the cached copy from the result."""
+        updates["updated_at"] = datetime.now(timezone.utc)
+        settings = await self.storage.update_bot_settings(updates)
+        self._cache_bot_settings(settings or {})
+        return self._bot_settings
+
+    async def set_premium_subscription(self, guild_id: GuildId, expires_at: datetime, is_active: bool = True):
+        """Create or update a guild's premium subscription and apply it to the entitlement cache."""
+        guild_id = guild_key(guild_id)
+        await self.storage.set_premium_subscription(guild_id, expires_at, is_active)
+
+        self._entitlement_generation += 1
+        if is_active:
+            self._premium_expiry[guild_id] = _as_utc(expires_at)
+        else:
+            self._premium_expiry.pop(guild_id, None)
+
+    def _cache_bot_settings(self, settings: Dict[str, Any]):
+        """Replace the cached global config after a local read or write."""
+        self._entitlement_generation += 1
+        self._bot_settings = settings
+
+    async def refresh_entitlements(self):
+        """
+        Reload the global config and every active premium subscription.
+        Two queries in total, regardless of how many guilds are premium.
+        """
+        generation = self._entitlement_generation
+        settings = await self.storage.get_bot_settings()
+        active = await self.storage.list_active_premium(datetime.now(timezone.utc))
+
+        premium_expiry: Dict[str, datetime] = {}
+        for guild_id, expires_at in active:
+            expires_at = _as_utc(expires_at)
+            if guild_id not in premium_expiry or expires_at > premium_expiry[guild_id]:
+                premium_expiry[guild_id] = expires_at
+
+        if generation != self._entitlement_generation:
+            # A local write landed while we were reading; keep it and catch up next cycle
+            logger.debug("Entitlement refresh raced with a local write, discarding result")
+            return
+
+        self._bot_settings = settings or {}
+        self._premium_expiry = premium_expiry
+        self._entitlements_loaded = True
+        self.metrics["entitlement_refreshes"] += 1
+        logger.debug("Entitlement cache refreshed: %s premium guild(s)", len(premium_expiry))
+
+    def start_entitlement_refresh(self):
+        """Start refreshing the entitlement cache in the background."""
+        if self._entitlement_refresh_task and not self._entitlement_refresh_task.done():
+            return
+
+        logger.info("🔄 Starting entitlement cache refresh (interval: %ss)", self.entitlement_refresh_interval)
+        self._entitlement_refresh_task = asyncio.create_task(self._entitlement_refresh_loop())
+
+    async def stop_entitlement_refresh(self):
+        """Stop the background entitlement refresh tasks."""
+        for task in (self._entitlement_refresh_task, self._recovery_refresh_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._entitlement_refresh_task = None
+        self._recovery_refresh_task = None
+
+    async def _entitlement_refresh_loop(self):
+        """Background task that keeps the entitlement cache current."""
+        while True:
+            await asyncio.sleep(self.entitlement_refresh_interval)
+            if self.storage.is_healthy():
+                await self._refresh_entitlements_safely()
+
+    async def _refresh_entitlements_safely(self):
+        """Refresh the entitlement cache, keeping the previous contents on failure."""
+        try:
+            await self.refresh_entitlements()
+        except Exception as e:
+            logger.warning(f"⚠️ Entitlement cache refresh failed, keeping cached values: {e}")
+
+    async def _on_connection_state_change(self, previous: str, state: str):
+        """Reload the entitlement cache after recovering from an outage."""
+        if state == "healthy" and previous in ("degraded", "reconnecting") and self._entitlements_loaded:
+            if self._recovery_refresh_task and not self._recovery_refresh_task.done():
+                return
+            self._recovery_refresh_task = asyncio.create_task(self._refresh_entitlements_safely())
+
+    async def setup_new_guild(self, guild_id: GuildId, guild_name: str) -> Dict[str, Any]:
         """
         Sets up default settings for a new guild. If the guild already exists,
         it updates the name and ensures it's marked as auto-setup complete.
         """
-        logger.info(f"🏰 Setting up default settings for new guild: {guild_name} ({guild_id})")
+        guild_id = guild_key(guild_id)
+        logger.info("🏰 Setting up default settings for new guild: %s (%s)", guild_name, guild_id)
         try:
-            collection = self.db.get_collection("discord_forwarding_bot", "guild_settings")
-            existing = await collection.find_one({"_id": guild_id})
+            existing = await self.storage.get_guild(guild_id)
 
             if existing:
-                logger.info(f"ℹ️ Guild {guild_name} already exists in database, ensuring it is up-to-date...")
-                await collection.update_one(
-                    {"_id": guild_id},
-                    {"$set": {
-                        "guild_name": guild_name,
-                        "updated_at": datetime.now(timezone.utc),
-                        "auto_setup_complete": True
-                    }}
-                )
-                return await collection.find_one({"_id": guild_id})
+                logger.info("ℹ️ Guild %s already exists in database, ensuring it is up-to-date...", guild_name)
+                settings = await self.storage.update_guild_and_fetch(guild_id, {
+                    "guild_name": guild_name,
+                    "updated_at": datetime.now(timezone.utc),
+                    "auto_setup_complete": True
+                })
+                self.invalidate_rule_index(guild_id)
+                return settings
             else:
                 default_settings = DEFAULT_GUILD_SETTINGS_TEMPLATE.copy()
                 default_settings.update({
@@ -137,9 +328,10 @@ class GuildManager:
                     "created_at": datetime.now(timezone.utc),
                     "updated_at": datetime.now(timezone.utc)
                 })
-                await collection.insert_one(default_settings)
+                await self.storage.create_guild(default_settings)
+                self.invalidate_rule_index(guild_id)
                 self.metrics["guilds_auto_configured"] += 1
-                logger.info(f"✅ Successfully set up default settings for guild: {guild_name}")
+                logger.info("✅ Successfully set up default settings for guild: %s", guild_name)
                 await self._notify_guild_join(guild_id, guild_name)
                 return default_settings
         except Exception as e:
@@ -147,151 +339,405 @@ class GuildManager:
             logger.error(f"❌ Failed to set up guild {guild_name}: {e}")
             raise DatabaseOperationError(f"Failed to set up guild: {e}") from e
 
-    async def remove_guild_data(self, guild_id: str, guild_name: str) -> bool:
+    async def remove_guild_data(self, guild_id: GuildId, guild_name: str, progress: Optional[Dict[str, Any]] = None) -> bool:
         """
         Removes all data associated with a guild from the database.
-        This includes guild settings and user permissions.
+        Deleted counts are written to `progress["deleted"]` as the storage backend purges.
         """
-        logger.info(f"🗑️ Removing data for guild: {guild_name} ({guild_id})")
+        guild_id = guild_key(guild_id)
+        logger.info("🗑️ Removing data for guild: %s (%s)", guild_name, guild_id)
+        progress = progress if progress is not None else {}
+        progress.setdefault("deleted", {})
+
         try:
-            db = self.db.db_client["discord_forwarding_bot"]
-            await db["guild_settings"].delete_one({"_id": guild_id})
-            await db["user_permissions"].delete_many({"guild_id": guild_id})
+            await self.storage.purge_guild(guild_id, progress)
+            self._forget_guild(guild_id)
             await self._notify_guild_leave(guild_id, guild_name)
             self.metrics["guilds_removed"] += 1
-            logger.info(f"✅ Successfully removed data for guild: {guild_name}")
+            logger.info("✅ Successfully removed data for guild: %s (%s)", guild_name, progress['deleted'])
             return True
         except Exception as e:
             logger.error(f"❌ Failed to remove guild data for {guild_name}: {e}")
             return False
 
-    async def get_guild_settings(self, guild_id: str) -> Dict[str, Any]:
+    def _forget_guild(self, guild_id: str):
+        """Drop cached state for a guild whose data has been purged."""
+        self._premium_expiry.pop(guild_id, None)
+        self._daily_counts.pop(guild_id, None)
+        self.invalidate_rule_index(guild_id)
+        self._stats_cache = {key: value for key, value in self._stats_cache.items() if key[0] != guild_id}
+
+    def start_guild_purge(self, guild_id: GuildId, guild_name: str) -> Dict[str, Any]:
+        """
+        Purge a guild's data in a background task and return its job record.
+        The record's status and per-collection deleted counts update while the purge runs;
+        an already running purge for the same guild is returned instead of starting another.
+        """
+        guild_id = guild_key(guild_id)
+        job = self.purge_jobs.get(guild_id)
+        if job and job["status"] == "running":
+            return job
+
+        job = {
+            "guild_id": guild_id,
+            "guild_name": guild_name,
+            "status": "running",
+            "deleted": {},
+            "started_at": datetime.now(timezone.utc),
+            "finished_at": None,
+        }
+        # Re-inserted so the dict stays ordered by start time
+        self.purge_jobs.pop(guild_id, None)
+        self.purge_jobs[guild_id] = job
+
+        async def run():
+            success = False
+            try:
+                success = await self.remove_guild_data(guild_id, guild_name, progress=job)
+            finally:
+                job["status"] = "completed" if success else "failed"
+                job["finished_at"] = datetime.now(timezone.utc)
+                job.pop("task", None)
+                self._prune_purge_jobs()
+
+        job["task"] = asyncio.create_task(run())
+        return job
+
+    def _prune_purge_jobs(self):
+        """Forget the oldest finished purge jobs beyond max_finished_purge_jobs."""
+        finished = [guild_id for guild_id, job in self.purge_jobs.items() if job["status"] != "running"]
+        for guild_id in finished[:max(0, len(finished) - self.max_finished_purge_jobs)]:
+            del self.purge_jobs[guild_id]
+
+    def get_purge_job(self, guild_id: GuildId) -> Optional[Dict[str, Any]]:
+        """Get the most recent purge job for a guild, if any."""
+        guild_id = guild_key(guild_id)
+        return self.purge_jobs.get(guild_id)
+
+    async def sweep_orphaned_guilds(self, active_guild_ids: set, max_purges: int = 25) -> List[str]:
+        """
+        Start purge jobs for guilds that have data but that the bot is no longer in.
+        `active_guild_ids` must be the complete set of guild ids the bot is currently in.
+        At most `max_purges` purges are started per sweep; the rest are picked up next time.
+        """
+        known_ids = await self.storage.list_known_guild_ids()
+        active = {str(guild_id) for guild_id in active_guild_ids}
+        orphans = sorted(known_ids - active - {"global_config"})
+        if not orphans:
+            return []
+
+        logger.info("🧹 Found %s orphaned guild(s), purging up to %s", len(orphans), max_purges)
+        started = orphans[:max_purges]
+        for guild_id in started:
+            self.start_guild_purge(guild_id, "Orphaned Guild")
+        return started
+
+    async def get_guild_settings(self, guild_id: GuildId) -> Dict[str, Any]:
         """
         Get guild settings or create default if not exists.
         This is the primary method for accessing guild settings.
         """
-        collection = self.db.get_collection("discord_forwarding_bot", "guild_settings")
-        settings = await collection.find_one({"_id": guild_id})
+        guild_id = guild_key(guild_id)
+        settings = await self.storage.get_guild(guild_id)
         if not settings:
-            logger.info(f"Guild {guild_id} not found, creating default settings...")
+            logger.info("Guild %s not found, creating default settings...", guild_id)
             return await self.setup_new_guild(guild_id, "Unknown Guild")
-        return settings
+        return _with_normalized_rules(settings)
 
-    async def update_guild_settings(self, guild_id: str, updates: Dict[str, Any]) -> bool:
+    async def update_guild_settings(self, guild_id: GuildId, updates: Dict[str, Any]) -> bool:
         """
         Update top-level fields in a guild's settings document.
         This is used for general settings updates.
         """
-        collection = self.db.get_collection("discord_forwarding_bot", "guild_settings")
+        guild_id = guild_key(guild_id)
         updates["updated_at"] = datetime.now(timezone.utc)
-        result = await collection.update_one(
-            {"_id": guild_id},
-            {"$set": updates}
-        )
-        return result.modified_count > 0
+        updated = await self.storage.update_guild(guild_id, updates)
+        self.invalidate_rule_index(guild_id)
+        return updated
 
     async def get_all_guilds(self) -> List[Dict[str, Any]]:
         """Get all guilds that have settings in the database."""
-        collection = self.db.get_collection("discord_forwarding_bot", "guild_settings")
-        cursor = collection.find({})
-        return await cursor.to_list(length=None)
+        return [_with_normalized_rules(guild) for guild in await self.storage.list_guilds()]
 
-    async def get_all_rules(self, guild_id: str) -> List[Dict[str, Any]]:
+    async def get_all_rules(self, guild_id: GuildId) -> List[Dict[str, Any]]:
         """Get all forwarding rules for a specific guild."""
-        logger.debug(f"Fetching all forwarding rules for guild {guild_id}")
-        return await self.get_guild_rules(str(guild_id))
+        guild_id = guild_key(guild_id)
+        logger.debug("Fetching all forwarding rules for guild %s", guild_id)
+        return await self.get_guild_rules(guild_id)
 
     async def get_guild_count(self) -> int:
         """Get total number of guilds in the database."""
-        collection = self.db.get_collection("discord_forwarding_bot", "guild_settings")
-        return await collection.count_documents({})
+        return await self.storage.count_guilds()
 
-    async def get_guild_rules(self, guild_id: str) -> List[Dict[str, Any]]:
+    async def get_guild_rules(self, guild_id: GuildId) -> List[Dict[str, Any]]:
         """Get all rules for a guild."""
+        guild_id = guild_key(guild_id)
         guild_settings = await self.get_guild_settings(guild_id)
         return guild_settings.get("rules", [])
 
+    async def list_rules(self, guild_id: GuildId) -> List[Dict[str, Any]]:
+        """
+        List a guild's rules for display.
+        Served from a secondary when possible, but causally consistent with the
+        guild's most recent rule edit made by this process.
+        """
+        guild_id = guild_key(guild_id)
+        rules = await self.storage.list_rules(guild_id)
+        for rule in rules:
+            normalize_rule(rule)
+        return rules
+
+    async def get_rule_index(self, guild_id: GuildId) -> GuildRuleIndex:
+        """
+        The guild's compiled rule index, used by the message path.
+        A miss loads the guild's settings once, however many messages are waiting on it.
+        """
+        guild_id = guild_key(guild_id)
+        index = self._rule_indexes.get(guild_id)
+        if index is not None:
+            self.metrics["rule_index_hits"] += 1
+            return index
+
+        self.metrics["rule_index_misses"] += 1
+        load = self._rule_index_loads.get(guild_id)
+        if load is None:
+            load = self._rule_index_loads[guild_id] = asyncio.ensure_future(self._load_rule_index(guild_id))
+            load.add_done_callback(lambda _: self._rule_index_loads.pop(guild_id, None))
+        # Shielded so one cancelled waiter doesn't cancel the load for the others
+        return await asyncio.shield(load)
+
+    async def _load_rule_index(self, guild_id: str) -> GuildRuleIndex:
+        generation = self._rule_index_generation
+        index = GuildRuleIndex.compile(await self.get_guild_settings(guild_id), guild_id)
+        if generation == self._rule_index_generation:
+            self._install_rule_index(index)
+        return index
+
+    def invalidate_rule_index(self, guild_id: Optional[str] = None, rule_id: Optional[str] = None):
+        """
+        Drop the compiled index of the guild owning `guild_id` or `rule_id` after a write;
+        with neither, drop every index. Indexes are rebuilt on the guild's next message.
+        """
+        self._rule_index_generation += 1
+        if guild_id is None and rule_id is None:
+            self._rule_indexes.clear()
+            self._rule_guilds.clear()
+            return
+
+        if guild_id is None:
+            guild_id = self._rule_guilds.get(rule_id)
+        if self._warm_start_dirty is not None:
+            self._warm_start_dirty.update(key for key in (guild_id, rule_id) if key is not None)
+        if guild_id is not None:
+            self._drop_rule_index(guild_id)
+
+    def _install_rule_index(self, index: GuildRuleIndex):
+        self._drop_rule_index(index.guild_id)
+        self._rule_indexes[index.guild_id] = index
+        for rule_id in index.rule_ids:
+            self._rule_guilds[rule_id] = index.guild_id
+
+    def _drop_rule_index(self, guild_id: str):
+        index = self._rule_indexes.pop(guild_id, None)
+        if index is not None:
+            for rule_id in index.rule_ids:
+                self._rule_guilds.pop(rule_id, None)
+
+    def _is_warm_start_dirty(self, index: GuildRuleIndex) -> bool:
+        dirty = self._warm_start_dirty
+        return bool(dirty) and (index.guild_id in dirty or not dirty.isdisjoint(index.rule_ids))
+
+    async def warm_start(self, batch_size: Optional[int] = None, measure_memory: bool = True) -> Dict[str, Any]:
+        """
+        Build the rule index of every guild from a single streaming cursor, so the first
+        messages after a restart don't each wait on their guild's settings read.
+        Returns the guild and rule counts, elapsed time and the memory the indexes hold
+        (traced with tracemalloc); the report is also kept in `warm_start_report`.
+        """
+        batch_size = batch_size or self.warm_start_batch_size
+        logger.info("🔥 Warm start: loading rule indexes for all guilds (batch size %s)...", batch_size)
+
+        started_tracing = measure_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        generation = self._rule_index_generation
+        self._warm_start_dirty = set()
+        start = time.perf_counter()
+        guilds = rules = 0
+
+        try:
+            async for settings in self.storage.stream_guilds(RULE_INDEX_PROJECTION, batch_size):
+                if settings.get("_id") == "global_config":
+                    continue
+                index = GuildRuleIndex.compile(settings)
+                if not self._is_warm_start_dirty(index):
+                    self._install_rule_index(index)
+                guilds += 1
+                rules += index.rule_count
+
+            # A write that landed while the cursor was open may have been read before it applied
+            if self._rule_index_generation != generation:
+                for index in list(self._rule_indexes.values()):
+                    if self._is_warm_start_dirty(index):
+                        self._drop_rule_index(index.guild_id)
+        finally:
+            self._warm_start_dirty = None
+            elapsed = time.perf_counter() - start
+            memory = peak = 0
+            if tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                memory, peak = current - memory_before, peak - memory_before
+            if started_tracing:
+                tracemalloc.stop()
+
+        self.warm_start_report = {
+            "guilds": guilds,
+            "active_rules": rules,
+            "seconds": round(elapsed, 3),
+            "memory_bytes": memory,
+            "peak_memory_bytes": peak,
+            "completed_at": datetime.now(timezone.utc),
+        }
+        logger.info("✅ Warm start complete: %s guild(s), %s active rule(s) indexed in %.2fs "
+                    "(%.1f MiB held, %.1f MiB peak)", guilds, rules, elapsed, memory / 1048576, peak / 1048576)
+        return self.warm_start_report
+
     async def get_rule_by_id(self, rule_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific forwarding rule by its unique ID."""
-        collection = self.db.get_collection("discord_forwarding_bot", "guild_settings")
-        result = await collection.find_one({"rules.rule_id": rule_id})
-        if result:
-            for rule in result.get("rules", []):
-                if rule.get("rule_id") == rule_id:
-                    return rule
-        return None
+        rule = await self.storage.get_rule(rule_id)
+        if rule is not None:
+            normalize_rule(rule)
+        return rule
 
-    async def update_rule(self, rule_id: str, updates: Dict[str, Any]) -> bool:
+    async def update_rule(self, rule_id: str, updates: Dict[str, Any], expected_version: Optional[int] = None) -> bool:
         """
         Updates fields of a specific rule within a guild's `rules` array.
+        With `expected_version` the update is a compare-and-swap on the rule's `version`:
+        if someone else changed the rule first, ConcurrentModificationError is raised.
         """
-        collection = self.db.get_collection("discord_forwarding_bot", "guild_settings")
+        # Versions are maintained by the storage backend; never let a caller overwrite them
+        updates = {key: value for key, value in updates.items() if key not in ("rule_id", "version")}
+        normalize_rule(updates, strict=True)
         updates["updated_at"] = datetime.now(timezone.utc)
 
-        # This uses the '$' positional operator to update the specific element
-        # in the 'rules' array that was matched by the query filter.
-        update_fields = {f"rules.$.{key}": value for key, value in updates.items()}
+        updated = await self.storage.update_rule(rule_id, updates, expected_version)
+        self.invalidate_rule_index(rule_id=rule_id)
+        if updated:
+            return True
 
-        result = await collection.update_one(
-            {"rules.rule_id": rule_id},
-            {"$set": update_fields}
-        )
-        return result.modified_count > 0
+        if expected_version is not None and await self.get_rule_by_id(rule_id) is not None:
+            raise ConcurrentModificationError(
+                f"Rule {rule_id} was modified concurrently (expected version {expected_version})")
+        return False
 
     async def delete_rule(self, rule_id: str) -> bool:
         """Soft deletes a rule by setting its `is_active` flag to False."""
         return await self.update_rule(rule_id, {"is_active": False})
 
-    async def permanently_delete_rule(self, guild_id: str, rule_id: str) -> bool:
+    async def permanently_delete_rule(self, guild_id: GuildId, rule_id: str) -> bool:
         """Permanently deletes a rule by removing it from the database."""
+        guild_id = guild_key(guild_id)
         try:
-            collection = self.db.get_collection("discord_forwarding_bot", "guild_settings")
-            result = await collection.update_one(
-                {"_id": guild_id},
-                {"$pull": {"rules": {"rule_id": rule_id}}}
-            )
-            return result.modified_count > 0
+            deleted = await self.storage.delete_rule(guild_id, rule_id)
+            self.invalidate_rule_index(guild_id)
+            return deleted
         except Exception as e:
             logger.error(f"Error permanently deleting rule {rule_id} from guild {guild_id}: {e}", exc_info=True)
             return False
 
     async def log_forwarded_message(self, log_data: Dict[str, Any]):
         """Log a forwarded message for tracking and rate-limiting."""
-        collection = self.db.get_collection("discord_forwarding_bot", "message_logs")
+        log_data["guild_id"] = guild_key(log_data["guild_id"])
         log_data["forwarded_at"] = datetime.now(timezone.utc)
-        await collection.insert_one(log_data)
+        await self.storage.insert_message_log(log_data)
 
-    async def get_daily_message_count(self, guild_id: str, date: datetime = None) -> int:
-        """Get number of messages forwarded today for a guild."""
-        if date is None:
-            date = datetime.now(timezone.utc)
-        start_of_day = datetime(date.year, date.month, date.day, tzinfo=timezone.utc)
+        if log_data.get("success", True):
+            entry = self._daily_counts.get(log_data["guild_id"])
+            if entry and entry[0] == _start_of_day(log_data["forwarded_at"]):
+                entry[1] += 1
 
-        collection = self.db.get_collection("discord_forwarding_bot", "message_logs")
-        count = await collection.count_documents({
-            "guild_id": guild_id,
-            "forwarded_at": {"$gte": start_of_day},
-            "success": True
-        })
+    async def get_daily_message_count(self, guild_id: GuildId, date: datetime = None) -> int:
+        """
+        Get number of messages forwarded today for a guild.
+        Today's count is served from memory and recounted from storage every `daily_count_ttl`
+        seconds or when the UTC day rolls over; other dates always query storage.
+        """
+        guild_id = guild_key(guild_id)
+        today = _start_of_day(datetime.now(timezone.utc))
+        start_of_day = today if date is None else _start_of_day(date)
+        if start_of_day != today:
+            return await self.storage.count_messages(guild_id, start_of_day)
+
+        entry = self._daily_counts.get(guild_id)
+        if entry and entry[0] == today and entry[2] > time.monotonic():
+            self.metrics["daily_count_hits"] += 1
+            return entry[1]
+
+        self.metrics["daily_count_misses"] += 1
+        count = await self.storage.count_messages(guild_id, today)
+        # Forwards logged while the count was in flight may be missed until the next recount
+        self._daily_counts[guild_id] = [today, count, time.monotonic() + self.daily_count_ttl]
         return count
 
-    async def is_premium_guild(self, guild_id: str) -> bool:
-        """Check if a guild has an active premium subscription."""
-        collection = self.db.get_collection("discord_forwarding_bot", "premium_subscriptions")
-        premium = await collection.find_one({
+    async def get_forwarding_stats(self, guild_id: GuildId, days: int = 7, rule_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Forwarding statistics for a guild over the last `days` days.
+        Returns totals, per-rule and per-destination counts with failure rates, and hourly
+        counts per rule. The storage backend answers all of it in one pass over its
+        (guild_id, forwarded_at) index; results are cached for `stats_cache_ttl` seconds.
+        """
+        guild_id = guild_key(guild_id)
+        cache_key = (guild_id, days, rule_id)
+        cached = self._stats_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        facets = await self.storage.forwarding_stats(guild_id, since, rule_id)
+
+        totals = (facets.get("totals") or [{"total": 0, "failed": 0}])[0]
+        stats = {
             "guild_id": guild_id,
-            "is_active": True,
-            "expires_at": {"$gt": datetime.now(timezone.utc)}
-        })
-        return premium is not None
+            "rule_id": rule_id,
+            "days": days,
+            "since": since,
+            **_with_failure_rate(totals),
+            "by_rule": [{"rule_id": row["_id"], **_with_failure_rate(row)} for row in facets.get("by_rule", [])],
+            "by_destination": [
+                {"destination_channel_id": row["_id"], **_with_failure_rate(row)}
+                for row in facets.get("by_destination", [])
+            ],
+            "hourly": [
+                {"rule_id": row["_id"].get("rule_id"), "hour": row["_id"]["hour"], **_with_failure_rate(row)}
+                for row in facets.get("hourly", [])
+            ],
+        }
 
-    async def get_guild_limits(self, guild_id: str) -> Dict[str, Any]:
+        now = time.monotonic()
+        if len(self._stats_cache) > 1000:
+            self._stats_cache = {key: value for key, value in self._stats_cache.items() if value[0] > now}
+        self._stats_cache[cache_key] = (now + self.stats_cache_ttl, stats)
+        return stats
+
+    async def is_premium_guild(self, guild_id: GuildId) -> bool:
+        """Check if a guild has an active premium subscription."""
+        guild_id = guild_key(guild_id)
+        if self._entitlements_loaded:
+            expires_at = self._premium_expiry.get(guild_id)
+            return expires_at is not None and expires_at > datetime.now(timezone.utc)
+
+        self.metrics["entitlement_cache_misses"] += 1
+        return await self.storage.has_active_premium(guild_id, datetime.now(timezone.utc))
+
+    async def get_guild_limits(self, guild_id: GuildId) -> Dict[str, Any]:
         """
         Get guild limits based on premium status.
         This method checks the bot's global settings and the guild's premium status
         to determine the limits for the guild.
         """
-        bot_settings = await self.db.get_collection("discord_forwarding_bot", "bot_settings").find_one({"_id": "global_config"})
+        guild_id = guild_key(guild_id)
+        bot_settings = await self.get_bot_settings()
         is_premium = await self.is_premium_guild(guild_id)
 
         return {
@@ -304,50 +750,84 @@ class GuildManager:
         """Get guild management metrics."""
         return self.metrics.copy()
 
-    async def add_rule(self, guild_id: int, rule_name: str, source_channel_id: int,
+    async def add_rule(self, guild_id: GuildId, rule_name: str, source_channel_id: int,
                                   destination_channel_id: int, enabled: bool = True,
                                   settings: dict = None) -> bool:
         """
         Adds a new forwarding rule to a guild's settings. If the guild document
         does not exist, it will be created first.
+        The storage backend checks the rule limit atomically with the insert, so concurrent
+        wizards cannot both squeeze past it; RuleLimitExceededError is raised when the guild is full.
         """
+        guild_id = guild_key(guild_id)
         try:
-            logger.info(f"Adding forwarding rule '{rule_name}' for guild {guild_id}")
+            logger.info("Adding forwarding rule '%s' for guild %s", rule_name, guild_id)
             rule_data = {
                 "rule_id": str(uuid.uuid4()),
                 "rule_name": rule_name,
-                "source_channel_id": source_channel_id,
-                "destination_channel_id": destination_channel_id,
+                "source_channel_id": to_snowflake(source_channel_id),
+                "destination_channel_id": to_snowflake(destination_channel_id),
                 "is_active": enabled,
                 "settings": settings or {},
+                "version": 1,
                 "created_at": datetime.now(timezone.utc),
                 "updated_at": datetime.now(timezone.utc)
             }
 
-            collection = self.db.get_collection("discord_forwarding_bot", "guild_settings")
-            result = await collection.update_one(
-                {"_id": str(guild_id)},
-                {"$push": {"rules": rule_data}, "$set": {"updated_at": datetime.now(timezone.utc)}}
-            )
-
-            if result.modified_count > 0:
-                logger.info(f"✅ Successfully added rule '{rule_name}' for guild {guild_id}")
-                return True
-            else:
-                # If the update failed, it might be because the guild document doesn't exist.
-                # We'll create it and try adding the rule again.
-                logger.warning(f"Guild {guild_id} not found. Creating settings and retrying rule addition.")
-                guild_settings = await self.get_guild_settings(str(guild_id))
-                if guild_settings:
-                    result = await collection.update_one(
-                        {"_id": str(guild_id)},
-                        {"$push": {"rules": rule_data}, "$set": {"updated_at": datetime.now(timezone.utc)}}
-                    )
-                    if result.modified_count > 0:
-                        logger.info(f"✅ Successfully added rule '{rule_name}' for guild {guild_id} after creating settings.")
-                        return True
-                logger.error(f"Failed to add rule for guild {guild_id} even after attempting to create settings.")
-                return False
+            # The guild's own limit applies unless its premium tier allows more
+            limits = await self.get_guild_limits(guild_id)
+            min_limit = limits["max_rules"] if limits["is_premium"] else 0
+
+            for attempt in range(2):
+                added = await self.storage.add_rule(guild_id, rule_data, limits["max_rules"], min_limit)
+                self.invalidate_rule_index(guild_id)
+                if added:
+                    logger.info("✅ Successfully added rule '%s' for guild %s", rule_name, guild_id)
+                    return True
+
+                # Nothing was added: the guild is missing, full, or an earlier attempt already applied
+                guild = await self.storage.get_guild(guild_id)
+                if guild is None:
+                    if attempt == 0:
+                        logger.warning(f"Guild {guild_id} not found. Creating settings and retrying rule addition.")
+                        await self.get_guild_settings(guild_id)
+                        continue
+                    break
+
+                if any(rule.get("rule_id") == rule_data["rule_id"] for rule in guild.get("rules", [])):
+                    return True
+
+                limit = max(guild.get("limits", {}).get("max_rules", limits["max_rules"]), min_limit)
+                raise RuleLimitExceededError(limit)
+
+            logger.error(f"Failed to add rule for guild {guild_id} even after attempting to create settings.")
+            return False
+        except RuleLimitExceededError:
+            raise
         except Exception as e:
             logger.error(f"❌ Error adding forwarding rule: {e}", exc_info=True)
-            return False
\ No newline at end of file
+            return False
+
+def _with_normalized_rules(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize the channel ids of a guild settings document's rules in place."""
+    for rule in settings.get("rules", []):
+        normalize_rule(rule)
+    return settings
+
+
+def _with_failure_rate(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Total/failed counters from a $group row plus the failure rate."""
+    total = row.get("total", 0)
+    failed = row.get("failed", 0)
+    return {"total": total, "failed": failed, "failure_rate": round(failed / total, 4) if total else 0.0}
+
+
+def _start_of_day(value: datetime) -> datetime:
+    """Midnight UTC of the day `value` falls on."""
+    value = _as_utc(value)
+    return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """MongoDB returns naive UTC datetimes unless the client is tz-aware."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,128 @@
+"""
+Document shapes for message_logs.
+
+Version 1 (legacy) documents use long field names and store every id as a decimal string:
+    {guild_id, rule_id, source_channel_id, destination_channel_id, original_message_id,
+     success, error?, degraded?, forwarded_at}
+
+Version 2 (compact) documents store snowflakes as Int64, the rule id as a binary UUID and
+use single-letter keys. Success is implied: only failed forwards carry an error ("e").
+    {v: 2, g, r, s, d, m, e?, x?, t}
+
+`degraded` marks a successful forward that was delivered with content left out; it holds
+the reason.
+
+Both shapes live side by side in the collection, so every query built here matches either
+one, and decode_log() turns any stored document back into the version 1 shape.
+"""
+import uuid
+from typing import Dict, Any, Optional
+
+from bson.binary import Binary, UUID_SUBTYPE
+from bson.int64 import Int64
+
+COMPACT_VERSION = 2
+
+# Version 1 field -> version 2 key
+COMPACT_FIELDS = {
+    "guild_id": "g",
+    "rule_id": "r",
+    "source_channel_id": "s",
+    "destination_channel_id": "d",
+    "original_message_id": "m",
+    "error": "e",
+    "degraded": "x",
+    "forwarded_at": "t",
+}
+SNOWFLAKE_FIELDS = ("guild_id", "source_channel_id", "destination_channel_id", "original_message_id")
+
+
+def snowflake(value: Any) -> Any:
+    """A Discord id as Int64; anything that isn't a decimal id is stored unchanged."""
+    if isinstance(value, int):
+        return Int64(value)
+    if isinstance(value, str) and value.isdigit():
+        return Int64(int(value))
+    return value
+
+
+def rule_uuid(value: Any) -> Any:
+    """A rule id as a binary UUID; ids that aren't UUIDs are stored unchanged."""
+    if not isinstance(value, str):
+        return value
+    try:
+        return Binary.from_uuid(uuid.UUID(value))
+    except ValueError:
+        return value
+
+
+def id_str(value: Any) -> Optional[str]:
+    """Normalize a stored id (string, Int64 or binary UUID) back to its string form."""
+    if value is None:
+        return None
+    if isinstance(value, Binary) and value.subtype == UUID_SUBTYPE:
+        return str(value.as_uuid())
+    return str(value)
+
+
+def encode_log(log_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a version 1 log entry into a compact version 2 document."""
+    document: Dict[str, Any] = {"v": COMPACT_VERSION}
+    for field, key in COMPACT_FIELDS.items():
+        value = log_data.get(field)
+        if value is None or field == "error":
+            continue
+        if field in SNOWFLAKE_FIELDS:
+            value = snowflake(value)
+        elif field == "rule_id":
+            value = rule_uuid(value)
+        document[key] = value
+
+    # The error field doubles as the failure flag
+    if not log_data.get("success", True):
+        document["e"] = (log_data.get("error") or "")[:500]
+    return document
+
+
+def decode_log(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Read a stored log document of either version as a version 1 entry."""
+    if document.get("v", 1) < COMPACT_VERSION:
+        return document
+
+    entry: Dict[str, Any] = {"_id": document.get("_id")}
+    for field, key in COMPACT_FIELDS.items():
+        if key in document:
+            entry[field] = document[key] if field in ("error", "degraded", "forwarded_at") else id_str(document[key])
+    entry["success"] = "e" not in document
+    return entry
+
+
+# Query helpers: each returns a filter or expression that matches both document versions
+
+def guild_filter(guild_id: str) -> Dict[str, Any]:
+    """All of a guild's log documents."""
+    return {"$or": [{"guild_id": guild_id}, {"g": snowflake(guild_id)}]}
+
+
+def guild_since_filter(guild_id: str, since, rule_id: Optional[str] = None,
+                       successful_only: bool = False) -> Dict[str, Any]:
+    """
+    A guild's log documents since `since`. Each branch of the $or is served by its own
+    (guild, time) index.
+    """
+    legacy: Dict[str, Any] = {"guild_id": guild_id, "forwarded_at": {"$gte": since}}
+    compact: Dict[str, Any] = {"g": snowflake(guild_id), "t": {"$gte": since}}
+    if rule_id:
+        legacy["rule_id"] = rule_id
+        compact["r"] = rule_uuid(rule_id)
+    if successful_only:
+        legacy["success"] = True
+        compact["e"] = {"$exists": False}
+    return {"$or": [legacy, compact]}
+
+
+# Aggregation expressions resolving a field from whichever shape the document has
+RULE_ID_EXPR = {"$ifNull": ["$rule_id", "$r"]}
+DESTINATION_EXPR = {"$ifNull": ["$destination_channel_id", "$d"]}
+FORWARDED_AT_EXPR = {"$ifNull": ["$forwarded_at", "$t"]}
+FAILED_EXPR = {"$or": [{"$eq": ["$success", False]}, {"$eq": [{"$type": "$e"}, "string"]}]}
@@ -0,0 +1,286 @@
+"""
+Operation-level database metrics: latency histograms, in-flight gauges and the pymongo
+command / connection pool listeners that feed them.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from pymongo import monitoring
+
+from logger.timing import LATENCY_BUCKETS_MS, LatencyHistogram
+
+
+class OperationMetrics:
+    """
+    Latency histograms and gauges keyed by operation name.
+
+    Histograms and operation gauges are only mutated on the event loop thread. pymongo
+    listeners run on driver threads: they hand latency samples over through a bounded deque
+    (append and popleft are atomic), which is folded into the histograms whenever metrics
+    are read or `drain()` is called. Samples beyond `max_pending` are dropped and counted.
+    Pool counters and command failures are updated in place under a lock instead, since a
+    lost check-in would leave the in-use gauges wrong for good.
+    """
+
+    def __init__(self, max_pending: int = 100_000):
+        self.operations: Dict[str, LatencyHistogram] = {}
+        self.commands: Dict[str, LatencyHistogram] = {}
+        self.pool_wait = LatencyHistogram()
+
+        self.in_flight: Dict[str, int] = {}
+        self.operation_failures: Dict[str, int] = {}
+        self.command_failures: Dict[str, int] = {}
+        self.pool = {
+            "checked_out": 0,
+            "max_checked_out": 0,
+            "checkout_timeouts": 0,
+            "checkout_failures": 0,
+            "connections_created": 0,
+            "connections_closed": 0,
+            "clears": 0,
+        }
+        # maxPoolSize applies per server, so occupancy is also tracked per server address
+        self.pool_in_use: Dict[str, int] = {}
+        self.pool_window_peak: Dict[str, int] = {}  # Peak in use per server since take_pool_window()
+
+        self.dropped_samples = 0
+
+        self._pending: deque = deque()
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+
+    # Event loop side
+
+    def operation_started(self, name: str):
+        """Mark an operation as in flight."""
+        self.in_flight[name] = self.in_flight.get(name, 0) + 1
+
+    def operation_finished(self, name: str, duration_ms: float, failed: bool = False):
+        """Record an operation's latency and drop it from the in-flight gauge."""
+        self.in_flight[name] = self.in_flight.get(name, 1) - 1
+
+        histogram = self.operations.get(name)
+        if histogram is None:
+            histogram = self.operations[name] = LatencyHistogram()
+        histogram.observe(duration_ms)
+
+        if failed:
+            self.operation_failures[name] = self.operation_failures.get(name, 0) + 1
+
+    def drain(self):
+        """Fold observations submitted by driver threads into the histograms and gauges."""
+        pending = self._pending
+        while pending:
+            try:
+                kind, name, value = pending.popleft()
+            except IndexError:
+                break
+
+            if kind == "command":
+                histogram = self.commands.get(name)
+                if histogram is None:
+                    histogram = self.commands[name] = LatencyHistogram()
+                histogram.observe(value)
+            elif kind == "pool_wait":
+                self.pool_wait.observe(value)
+
+    def take_pool_window(self) -> Dict[str, int]:
+        """Return the peak connections in use per server since the last call and start a new window."""
+        with self._lock:
+            peaks = self.pool_window_peak
+            self.pool_window_peak = {server: in_use for server, in_use in self.pool_in_use.items() if in_use}
+        return peaks
+
+    # Driver thread side
+
+    def submit(self, kind: str, name: str, value: float):
+        """Thread-safe hand-off of a latency sample, used by the pymongo listeners."""
+        if len(self._pending) >= self._max_pending:
+            with self._lock:
+                self.dropped_samples += 1
+            return
+        self._pending.append((kind, name, value))
+
+    def count(self, name: str, delta: int = 1):
+        """Adjust a pool counter."""
+        with self._lock:
+            self.pool[name] += delta
+
+    def command_failed(self, name: str):
+        """Count a failed wire command."""
+        with self._lock:
+            self.command_failures[name] = self.command_failures.get(name, 0) + 1
+
+    def connection_checked_out(self, server: str, delta: int):
+        """Adjust the connections in use, overall and on `server`, by +1 or -1."""
+        with self._lock:
+            checked_out = self.pool["checked_out"] = self.pool["checked_out"] + delta
+            if checked_out > self.pool["max_checked_out"]:
+                self.pool["max_checked_out"] = checked_out
+            in_use = self.pool_in_use[server] = self.pool_in_use.get(server, 0) + delta
+            if in_use > self.pool_window_peak.get(server, 0):
+                self.pool_window_peak[server] = in_use
+
+    # Reporting
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current histograms and gauges."""
+        self.drain()
+        with self._lock:
+            command_failures = dict(self.command_failures)
+            pool = dict(self.pool)
+            pool_in_use = {server: count for server, count in self.pool_in_use.items() if count}
+            dropped_samples = self.dropped_samples
+        return {
+            "operations": {name: h.snapshot() for name, h in self.operations.items()},
+            "operation_failures": dict(self.operation_failures),
+            "in_flight": {name: count for name, count in self.in_flight.items() if count},
+            "commands": {name: h.snapshot() for name, h in self.commands.items()},
+            "command_failures": command_failures,
+            "pool": pool,
+            "pool_in_use": pool_in_use,
+            "pool_wait": self.pool_wait.snapshot(),
+            "dropped_samples": dropped_samples,
+        }
+
+    def export_prometheus(self, prefix: str = "stygian_db") -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        self.drain()
+        with self._lock:
+            command_failures = dict(self.command_failures)
+            pool = dict(self.pool)
+            dropped_samples = self.dropped_samples
+        lines: List[str] = []
+
+        def histogram_family(metric: str, help_text: str, label: str, histograms: Dict[str, LatencyHistogram]):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for name, histogram in sorted(histograms.items()):
+                labels = f'{label}="{_escape_label(name)}",' if label else ""
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS_MS, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{{labels}le="{bound:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{labels}le="+Inf"}} {histogram.count}')
+                plain_labels = "{" + labels.rstrip(",") + "}" if labels else ""
+                lines.append(f"{metric}_sum{plain_labels} {histogram.sum_ms:.6f}")
+                lines.append(f"{metric}_count{plain_labels} {histogram.count}")
+
+        def labelled_family(metric: str, help_text: str, metric_type: str, label: str, values: Dict[str, int]):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for name, value in sorted(values.items()):
+                lines.append(f'{metric}{{{label}="{_escape_label(name)}"}} {value}')
+
+        histogram_family(f"{prefix}_operation_latency_ms", "Latency of DatabaseCore operations.",
+                         "operation", self.operations)
+        labelled_family(f"{prefix}_operation_failures_total", "Failed DatabaseCore operations.",
+                        "counter", "operation", self.operation_failures)
+        labelled_family(f"{prefix}_operations_in_flight", "DatabaseCore operations currently running.",
+                        "gauge", "operation", self.in_flight)
+        histogram_family(f"{prefix}_command_latency_ms", "Latency of MongoDB wire commands.",
+                         "command", self.commands)
+        labelled_family(f"{prefix}_command_failures_total", "Failed MongoDB wire commands.",
+                        "counter", "command", command_failures)
+        histogram_family(f"{prefix}_pool_checkout_wait_ms", "Time spent waiting for a pooled connection.",
+                         "", {"": self.pool_wait})
+
+        for name, value in sorted(pool.items()):
+            metric_type = "gauge" if name in ("checked_out", "max_checked_out") else "counter"
+            metric = f"{prefix}_pool_{name}" + ("_total" if metric_type == "counter" else "")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            lines.append(f"{metric} {value}")
+
+        lines.append(f"# HELP {prefix}_dropped_samples_total Latency samples dropped because the hand-off queue was full.")
+        lines.append(f"# TYPE {prefix}_dropped_samples_total counter")
+        lines.append(f"{prefix}_dropped_samples_total {dropped_samples}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class CommandLatencyListener(monitoring.CommandListener):
+    """Feeds per-command latencies from the driver into OperationMetrics."""
+
+    def __init__(self, metrics: OperationMetrics):
+        self.metrics = metrics
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.metrics.submit("command", event.command_name, event.duration_micros / 1000.0)
+
+    def failed(self, event):
+        self.metrics.submit("command", event.command_name, event.duration_micros / 1000.0)
+        self.metrics.command_failed(event.command_name)
+
+
+class PoolWaitListener(monitoring.ConnectionPoolListener):
+    """
+    Tracks connection checkout wait times and pool occupancy.
+    pymongo >= 4.7 reports the checkout duration on the event; for older drivers the wait is
+    measured from the checkout-started event, which fires on the same thread.
+    """
+
+    def __init__(self, metrics: OperationMetrics):
+        self.metrics = metrics
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        self.metrics.submit("pool_wait", "", self._wait_ms(event))
+        self.metrics.connection_checked_out(_address(event), 1)
+
+    def connection_check_out_failed(self, event):
+        self.metrics.submit("pool_wait", "", self._wait_ms(event))
+        if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+            self.metrics.count("checkout_timeouts")
+        else:
+            self.metrics.count("checkout_failures")
+
+    def connection_checked_in(self, event):
+        self.metrics.connection_checked_out(_address(event), -1)
+
+    def connection_created(self, event):
+        self.metrics.count("connections_created")
+
+    def connection_closed(self, event):
+        self.metrics.count("connections_closed")
+
+    def pool_cleared(self, event):
+        self.metrics.count("clears")
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def _wait_ms(self, event) -> float:
+        duration: Optional[float] = getattr(event, "duration", None)
+        if duration is not None:
+            return duration * 1000.0
+
+        started = getattr(self._local, "started", None)
+        return (time.perf_counter() - started) * 1000.0 if started is not None else 0.0
+
+
+def _address(event) -> str:
+    """host:port of the server a pool event belongs to."""
+    host, port = event.address
+    return f"{host}:{port}"
@@ -0,0 +1,182 @@
+"""
+Connection pool advisor.
+
+Reads the checkout wait times and per-server in-use counts that PoolWaitListener feeds into
+OperationMetrics, once per evaluation window (every health check), and turns them into
+saturation events and pool setting recommendations. maxPoolSize applies per server, so the
+advisor sizes the pool for the busiest server (mongos or replica set member); adding mongos
+routers spreads the load and the recommendation follows.
+"""
+import math
+from collections import deque
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+from logger.logger_setup import get_logger
+from .monitoring import OperationMetrics, LatencyHistogram
+
+logger = get_logger("PoolAdvisor", level=20, json_format=False, colored_console=True)
+
+
+@dataclass
+class PoolSettings:
+    """The driver pool options the advisor tunes."""
+    max_pool_size: int
+    min_pool_size: int
+    max_connecting: int
+    wait_queue_timeout: int  # ms
+
+
+class PoolAdvisor:
+    """
+    Recommends pool settings from observed pool usage.
+
+    - Saturated (busiest server at `saturation_ratio` of maxPoolSize, or checkout timeouts):
+      grow maxPoolSize so the observed peak sits at `target_utilization`.
+    - Checkouts waiting longer than `wait_threshold_ms` at p95 while the pool still has room:
+      connections are being established too slowly, so raise maxConnecting.
+    - Consistently under a quarter used for `idle_windows` busy windows: shrink maxPoolSize.
+    """
+
+    def __init__(self, metrics: OperationMetrics, wait_threshold_ms: float = 25.0, saturation_ratio: float = 0.9,
+                 target_utilization: float = 0.7, min_checkouts: int = 200, idle_windows: int = 10,
+                 pool_size_limit: int = 500, max_connecting_limit: int = 16, history: int = 50):
+        self.metrics = metrics
+        self.wait_threshold_ms = wait_threshold_ms  # p95 checkout wait considered slow
+        self.saturation_ratio = saturation_ratio  # Fraction of maxPoolSize in use that counts as saturated
+        self.target_utilization = target_utilization  # Fraction of maxPoolSize the observed peak should use
+        self.min_checkouts = min_checkouts  # Checkouts a window needs before its waits are trusted
+        self.idle_windows = idle_windows  # Consecutive underused windows before recommending a smaller pool
+        self.pool_size_limit = pool_size_limit  # Never recommend more connections per server than this
+        self.max_connecting_limit = max_connecting_limit
+
+        self.recommendation: Optional[Dict[str, Any]] = None
+        self.saturation_events: deque = deque(maxlen=history)
+        self.counters = {
+            "windows": 0,
+            "saturation_events": 0,
+            "recommendations": 0,
+            "applied": 0,
+        }
+
+        self._last_wait_counts: List[int] = list(metrics.pool_wait.counts)
+        self._last_pool = dict(metrics.pool)
+        self._underused_windows = 0
+
+    def evaluate(self, current: PoolSettings) -> Optional[Dict[str, Any]]:
+        """
+        Close the current window: record a saturation event if the pool was saturated and
+        update the recommendation. Returns the pending recommendation, if any.
+        """
+        self.metrics.drain()
+        peaks = self.metrics.take_pool_window()
+        wait = self._window_wait()
+        pool = self.metrics.pool
+        timeouts = pool["checkout_timeouts"] - self._last_pool.get("checkout_timeouts", 0)
+        self._last_pool = dict(pool)
+        self.counters["windows"] += 1
+
+        busiest = max(peaks, key=peaks.get) if peaks else None
+        peak = peaks.get(busiest, 0) if busiest else 0
+        p95_wait = wait.quantile(0.95)
+        trusted = wait.count >= self.min_checkouts
+
+        saturated = peak >= current.max_pool_size * self.saturation_ratio or timeouts > 0
+        slow_checkouts = trusted and p95_wait > self.wait_threshold_ms
+        if saturated or slow_checkouts:
+            self._record_saturation(current, busiest, peak, wait, timeouts)
+
+        proposed, reasons = self._propose(current, peak, wait, timeouts, saturated, slow_checkouts, trusted)
+        if proposed == current:
+            return self.recommendation
+
+        self.recommendation = {
+            **asdict(proposed),
+            "reasons": reasons,
+            "observed": {"peak_in_use": peak, "server": busiest, "checkouts": wait.count,
+                         "p95_wait_ms": p95_wait, "checkout_timeouts": timeouts},
+            "recommended_at": datetime.now(timezone.utc),
+        }
+        self.counters["recommendations"] += 1
+        logger.info("🏊 Pool recommendation: %s (%s)", asdict(proposed), '; '.join(reasons))
+        return self.recommendation
+
+    def take_recommendation(self) -> Optional[PoolSettings]:
+        """Pop the pending recommendation as PoolSettings, for applying on the next reconnect."""
+        recommendation, self.recommendation = self.recommendation, None
+        if recommendation is None:
+            return None
+
+        self.counters["applied"] += 1
+        return PoolSettings(**{field: recommendation[field] for field in PoolSettings.__dataclass_fields__})
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters, the pending recommendation and recent saturation events."""
+        return {
+            **self.counters,
+            "recommendation": dict(self.recommendation) if self.recommendation else None,
+            "recent_saturation_events": list(self.saturation_events)[-10:],
+        }
+
+    def _window_wait(self) -> LatencyHistogram:
+        """Checkout waits observed since the previous window."""
+        counts = self.metrics.pool_wait.counts
+        window = LatencyHistogram()
+        window.counts = [now - before for now, before in zip(counts, self._last_wait_counts)]
+        window.count = sum(window.counts)
+        window.max_ms = self.metrics.pool_wait.max_ms
+        self._last_wait_counts = list(counts)
+        return window
+
+    def _record_saturation(self, current: PoolSettings, server: Optional[str], peak: int,
+                           wait: LatencyHistogram, timeouts: int):
+        event = {
+            "at": datetime.now(timezone.utc),
+            "server": server,
+            "peak_in_use": peak,
+            "max_pool_size": current.max_pool_size,
+            "p95_wait_ms": wait.quantile(0.95),
+            "p99_wait_ms": wait.quantile(0.99),
+            "checkout_timeouts": timeouts,
+        }
+        self.saturation_events.append(event)
+        self.counters["saturation_events"] += 1
+        logger.warning(f"⚠️ Connection pool saturated on {server or 'unknown server'}: {peak}/{current.max_pool_size} "
+                       f"in use, p95 wait {event['p95_wait_ms']:g}ms, {timeouts} checkout timeout(s)")
+
+    def _propose(self, current: PoolSettings, peak: int, wait: LatencyHistogram, timeouts: int,
+                 saturated: bool, slow_checkouts: bool, trusted: bool):
+        proposed = PoolSettings(**asdict(current))
+        reasons: List[str] = []
+        sized_for_peak = math.ceil(peak / self.target_utilization)
+
+        if saturated:
+            self._underused_windows = 0
+            proposed.max_pool_size = min(self.pool_size_limit,
+                                         max(sized_for_peak, math.ceil(current.max_pool_size * 1.5)))
+            reasons.append(f"peak {peak}/{current.max_pool_size} in use"
+                           + (f" with {timeouts} checkout timeout(s)" if timeouts else ""))
+        elif trusted and peak < current.max_pool_size * 0.25:
+            self._underused_windows += 1
+            if self._underused_windows >= self.idle_windows:
+                proposed.max_pool_size = max(sized_for_peak, current.min_pool_size, 10)
+                reasons.append(f"peak {peak}/{current.max_pool_size} in use for {self._underused_windows} windows")
+        else:
+            self._underused_windows = 0
+
+        if slow_checkouts and not saturated:
+            # Waiting while the pool still has room means connection setup is the bottleneck
+            proposed.max_connecting = min(self.max_connecting_limit, current.max_connecting * 2)
+            if proposed.max_connecting != current.max_connecting:
+                reasons.append(f"p95 checkout wait {wait.quantile(0.95):g}ms with a pool below capacity")
+
+        # The wait queue timeout should sit well above the waits seen under load
+        p99_wait = wait.quantile(0.99)
+        if trusted and p99_wait * 4 > current.wait_queue_timeout:
+            proposed.wait_queue_timeout = min(60000, int(math.ceil(p99_wait * 4 / 1000.0)) * 1000)
+            if proposed.wait_queue_timeout != current.wait_queue_timeout:
+                reasons.append(f"p99 checkout wait {p99_wait:g}ms")
+
+        proposed.min_pool_size = min(current.min_pool_size, proposed.max_pool_size)
+        return proposed, reasons
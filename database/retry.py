@@ -0,0 +1,150 @@
+"""
+Retry policy for database operations: pymongo error classification, jittered exponential
+backoff bounded by a total deadline, and a circuit breaker that fails fast while the
+database is known to be unavailable.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from enum import Enum
+
+from pymongo.errors import (
+    AutoReconnect,
+    ConnectionFailure,
+    DuplicateKeyError,
+    NetworkTimeout,
+    NotPrimaryError,
+    OperationFailure,
+    PyMongoError,
+    ServerSelectionTimeoutError,
+    WriteConcernError,
+    WTimeoutError,
+)
+
+
+class ErrorClass(Enum):
+    """How a failed operation may be retried."""
+    TRANSIENT = "transient"  # Server labelled the error retryable/transient
+    NOT_PRIMARY = "not_primary"  # No suitable node served the request, so it was never applied
+    NETWORK = "network"  # Timeout or dropped connection: the outcome is unknown
+    NON_RETRYABLE = "non_retryable"  # Duplicate key, validation, bad query, programming errors
+
+
+# Server error codes raised when a node stops being (or never was) the primary
+NOT_PRIMARY_CODES = {
+    91,  # ShutdownInProgress
+    189,  # PrimarySteppedDown
+    10107,  # NotWritablePrimary
+    11600,  # InterruptedAtShutdown
+    11602,  # InterruptedDueToReplStateChange
+    13435,  # NotPrimaryNoSecondaryOk
+    13436,  # NotPrimaryOrSecondary
+}
+
+# Server error codes for transient network conditions between cluster members
+TRANSIENT_CODES = {
+    6,  # HostUnreachable
+    7,  # HostNotFound
+    89,  # NetworkTimeout
+    9001,  # SocketException
+}
+
+
+def classify_error(error: BaseException) -> ErrorClass:
+    """Classify an exception raised by a database operation."""
+    if isinstance(error, DuplicateKeyError):
+        return ErrorClass.NON_RETRYABLE
+
+    # NotPrimaryError is an AutoReconnect subclass, so it must be checked first
+    if isinstance(error, (NotPrimaryError, ServerSelectionTimeoutError)):
+        return ErrorClass.NOT_PRIMARY
+
+    # Checked before the error labels: pymongo labels every connection failure during a
+    # retryable write RetryableWriteError, but the write may still have been applied
+    if isinstance(error, (NetworkTimeout, AutoReconnect, ConnectionFailure, WTimeoutError, WriteConcernError,
+                          asyncio.TimeoutError)):
+        return ErrorClass.NETWORK
+
+    if isinstance(error, PyMongoError) and (
+            error.has_error_label("RetryableWriteError") or error.has_error_label("TransientTransactionError")):
+        return ErrorClass.TRANSIENT
+
+    if isinstance(error, OperationFailure):
+        if error.code in NOT_PRIMARY_CODES:
+            return ErrorClass.NOT_PRIMARY
+        if error.code in TRANSIENT_CODES:
+            return ErrorClass.TRANSIENT
+
+    return ErrorClass.NON_RETRYABLE
+
+
+def should_retry(error_class: ErrorClass, idempotent: bool) -> bool:
+    """
+    Decide whether an error class may be retried.
+    Network errors leave the outcome unknown, so only idempotent operations retry them.
+    """
+    if error_class in (ErrorClass.TRANSIENT, ErrorClass.NOT_PRIMARY):
+        return True
+    if error_class is ErrorClass.NETWORK:
+        return idempotent
+    return False
+
+
+@dataclass
+class RetryPolicy:
+    """Backoff settings for DatabaseCore.execute_with_retry."""
+    max_attempts: int = 4
+    base_delay: float = 0.1  # Seconds before the first retry (upper bound, jittered)
+    max_delay: float = 2.0  # Cap on a single backoff sleep
+    deadline: float = 10.0  # Total seconds an operation may spend including retries
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) failed attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated availability failures.
+    Opens after `failure_threshold` consecutive failures; once `reset_timeout` seconds
+    have passed a single probe is let through (half-open) and its outcome closes or
+    re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may proceed right now."""
+        if self.state == "closed":
+            return True
+
+        # Let one probe through per reset window; a probe that never reports back
+        # (e.g. cancelled) does not wedge the circuit half-open
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self.opened_at = time.monotonic()
+            return True
+
+        return False
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        self.state = "closed"
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        """Count an availability failure, opening the circuit when the threshold is reached."""
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def reset(self):
+        """Force the circuit closed (e.g. after a successful reconnect)."""
+        self.record_success()
@@ -0,0 +1,61 @@
+"""
+Compiled per-guild forwarding rules.
+
+The message path only needs a guild's feature flags, limits and the active rules for the
+channel a message arrived in. GuildRuleIndex keeps exactly that, with the rules grouped by
+source channel, so on_message does one dict lookup instead of scanning every rule.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Any, FrozenSet, List, Optional, Tuple
+
+from logger.logger_setup import get_logger
+from .snowflake import RULE_SNOWFLAKE_FIELDS, is_snowflake, normalize_rule
+
+logger = get_logger("GuildManager", level=20, json_format=False, colored_console=True)
+
+# Fields of a guild settings document the index is built from
+RULE_INDEX_PROJECTION = {"features": 1, "limits": 1, "rules": 1}
+
+
+@dataclass(frozen=True)
+class GuildRuleIndex:
+    """Read-only forwarding view of one guild's settings."""
+    guild_id: str
+    features: Dict[str, Any] = field(default_factory=dict)
+    limits: Dict[str, Any] = field(default_factory=dict)
+    rules_by_channel: Dict[int, Tuple[Dict[str, Any], ...]] = field(default_factory=dict)
+    rule_ids: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def compile(cls, settings: Dict[str, Any], guild_id: Optional[str] = None) -> "GuildRuleIndex":
+        """Build the index from a guild settings document (full or projected)."""
+        rules_by_channel: Dict[int, List[Dict[str, Any]]] = {}
+        rule_ids = set()
+        for rule in settings.get("rules", []):
+            normalize_rule(rule)
+            if rule.get("rule_id"):
+                rule_ids.add(rule["rule_id"])
+            if not rule.get("is_active") or rule.get("source_channel_id") is None:
+                continue
+            invalid = [field for field in RULE_SNOWFLAKE_FIELDS if not is_snowflake(rule.get(field))]
+            if invalid:
+                logger.warning("⚠️ Rule %s in guild %s has an invalid %s; not forwarding it",
+                               rule.get("rule_id"), guild_id or settings.get("_id"), " / ".join(invalid))
+                continue
+            rules_by_channel.setdefault(rule["source_channel_id"], []).append(rule)
+
+        return cls(
+            guild_id=guild_id or str(settings["_id"]),
+            features=settings.get("features", {}),
+            limits=settings.get("limits", {}),
+            rules_by_channel={channel_id: tuple(rules) for channel_id, rules in rules_by_channel.items()},
+            rule_ids=frozenset(rule_ids),
+        )
+
+    def rules_for(self, channel_id: int) -> Tuple[Dict[str, Any], ...]:
+        """Active rules whose source is `channel_id`, in the guild's rule order."""
+        return self.rules_by_channel.get(channel_id, ())
+
+    @property
+    def rule_count(self) -> int:
+        return sum(len(rules) for rules in self.rules_by_channel.values())
@@ -0,0 +1,56 @@
+"""
+Discord snowflake ids.
+
+Guild, channel, user and message ids are plain ints everywhere in the bot, including the
+channel ids stored in forwarding rules. The one exception is the key of a guild's documents
+(guild_settings._id, premium_subscriptions.guild_id, ...), which is the decimal string
+produced by guild_key(); GuildManager converts at its boundary, so callers pass ints.
+"""
+from typing import Any, Dict, Optional, Union
+
+# Rule fields that hold snowflakes
+RULE_SNOWFLAKE_FIELDS = ("source_channel_id", "destination_channel_id")
+
+GuildId = Union[int, str]
+
+
+def to_snowflake(value: Any) -> Optional[int]:
+    """Normalize an id (int, Int64 or decimal string) to an int; None and "" stay None."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, int) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    raise ValueError(f"Not a snowflake id: {value!r}")
+
+
+def guild_key(guild_id: GuildId) -> str:
+    """The key a guild's documents are stored under."""
+    return guild_id if isinstance(guild_id, str) else str(guild_id)
+
+
+def is_snowflake(value: Any) -> bool:
+    """Whether `value` is already a normalized id."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def normalize_rule(rule: Dict[str, Any], strict: bool = False) -> bool:
+    """
+    Convert a rule's channel ids to ints in place; returns whether anything changed.
+    Ids that aren't snowflakes are left as they are, so one bad stored rule can't break
+    reading its guild; with `strict` (writes) they raise ValueError instead.
+    """
+    changed = False
+    for field in RULE_SNOWFLAKE_FIELDS:
+        value = rule.get(field)
+        if value is None or type(value) is int:
+            continue
+        try:
+            rule[field] = to_snowflake(value)
+        except ValueError:
+            if strict:
+                raise
+            continue
+        changed = True
+    return changed
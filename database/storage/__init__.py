@@ -0,0 +1,29 @@
+import os
+
+from .base import StorageBackend
+from .mongo import MongoStorage
+from .sqlite import SQLiteStorage
+
+STORAGE_BACKENDS = ("mongo", "sqlite")
+
+
+def create_storage(database_core, backend: str = None) -> StorageBackend:
+    """
+    Create the storage backend selected by STORAGE_BACKEND ("mongo" by default).
+    The SQLite backend stores everything in SQLITE_PATH and needs no MongoDB server.
+    """
+    backend = (backend or os.getenv("STORAGE_BACKEND", "mongo")).lower()
+    if backend == "mongo":
+        return MongoStorage(database_core)
+    if backend == "sqlite":
+        return SQLiteStorage(os.getenv("SQLITE_PATH", "data/stygian.db"))
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}', expected one of {', '.join(STORAGE_BACKENDS)}")
+
+
+__all__ = [
+    'StorageBackend',
+    'MongoStorage',
+    'SQLiteStorage',
+    'STORAGE_BACKENDS',
+    'create_storage'
+]
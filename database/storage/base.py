@@ -0,0 +1,153 @@
+"""
+Storage interface used by GuildManager.
+
+A backend stores guild settings (with their embedded rules), the global bot settings,
+premium subscriptions and message logs. Documents are plain dicts shaped like the MongoDB
+documents: guild settings are keyed by "_id" and carry a "rules" list, and datetimes are
+timezone-aware UTC.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, AsyncIterator, List, Optional, Set, Tuple
+
+
+class StorageBackend(ABC):
+    """Abstract storage backend for guild, rule, log and entitlement data."""
+
+    name = "abstract"
+
+    # Lifecycle
+
+    @abstractmethod
+    async def initialize(self) -> bool:
+        """Open connections and make sure the schema exists."""
+
+    @abstractmethod
+    async def close(self):
+        """Release connections."""
+
+    @abstractmethod
+    def is_healthy(self) -> bool:
+        """Whether the backend can currently serve requests."""
+
+    # Global bot settings
+
+    @abstractmethod
+    async def get_bot_settings(self) -> Optional[Dict[str, Any]]:
+        """Get the global settings document, or None if it doesn't exist."""
+
+    @abstractmethod
+    async def create_bot_settings(self, settings: Dict[str, Any]):
+        """Insert the global settings document."""
+
+    @abstractmethod
+    async def update_bot_settings(self, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Set fields on the global settings document and return the updated document."""
+
+    # Premium subscriptions
+
+    @abstractmethod
+    async def set_premium_subscription(self, guild_id: str, expires_at: datetime, is_active: bool):
+        """Create or update a guild's premium subscription."""
+
+    @abstractmethod
+    async def has_active_premium(self, guild_id: str, now: datetime) -> bool:
+        """Whether a guild has an active subscription that expires after `now`."""
+
+    @abstractmethod
+    async def list_active_premium(self, now: datetime) -> List[Tuple[str, datetime]]:
+        """(guild_id, expires_at) for every active subscription that expires after `now`."""
+
+    # Guild settings
+
+    @abstractmethod
+    async def get_guild(self, guild_id: str) -> Optional[Dict[str, Any]]:
+        """Get a guild's settings document including its rules."""
+
+    @abstractmethod
+    async def create_guild(self, settings: Dict[str, Any]):
+        """Insert a new guild settings document."""
+
+    @abstractmethod
+    async def update_guild(self, guild_id: str, updates: Dict[str, Any]) -> bool:
+        """Set top-level fields on a guild; returns whether the document changed."""
+
+    @abstractmethod
+    async def update_guild_and_fetch(self, guild_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Set top-level fields on a guild and return the updated document."""
+
+    @abstractmethod
+    async def list_guilds(self) -> List[Dict[str, Any]]:
+        """Every guild settings document."""
+
+    async def stream_guilds(self, projection: Optional[Dict[str, Any]] = None,
+                            batch_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield every guild settings document. Backends that can stream override this to
+        fetch `batch_size` documents per round trip with only the `projection` fields.
+        """
+        for guild in await self.list_guilds():
+            yield guild
+
+    @abstractmethod
+    async def count_guilds(self) -> int:
+        """Number of guild settings documents."""
+
+    @abstractmethod
+    async def list_known_guild_ids(self) -> Set[str]:
+        """Ids of every guild that has settings or message logs stored."""
+
+    @abstractmethod
+    async def purge_guild(self, guild_id: str, progress: Dict[str, Any]):
+        """
+        Delete all of a guild's data.
+        Per-collection deleted counts are written to progress["deleted"] as they happen.
+        """
+
+    # Rules
+
+    @abstractmethod
+    async def list_rules(self, guild_id: str) -> List[Dict[str, Any]]:
+        """A guild's rules, for display (may be served from a replica)."""
+
+    @abstractmethod
+    async def get_rule(self, rule_id: str) -> Optional[Dict[str, Any]]:
+        """Find a rule by id across all guilds."""
+
+    @abstractmethod
+    async def add_rule(self, guild_id: str, rule: Dict[str, Any], default_limit: int, min_limit: int) -> bool:
+        """
+        Append a rule if the guild exists, does not already have it and is below its limit.
+        The limit is the guild's limits.max_rules (default_limit if unset), raised to at least
+        min_limit. The check and the insert must be atomic. Returns whether the rule was added.
+        """
+
+    @abstractmethod
+    async def update_rule(self, rule_id: str, updates: Dict[str, Any], expected_version: Optional[int]) -> bool:
+        """
+        Set fields on a rule and bump its version, optionally only if the rule is still at
+        `expected_version` (0 matches rules written before versioning). Returns whether a rule changed.
+        """
+
+    @abstractmethod
+    async def delete_rule(self, guild_id: str, rule_id: str) -> bool:
+        """Remove a rule from a guild; returns whether it existed."""
+
+    # Message logs
+
+    @abstractmethod
+    async def insert_message_log(self, log_data: Dict[str, Any]):
+        """Store a forwarded message log entry."""
+
+    @abstractmethod
+    async def count_messages(self, guild_id: str, since: datetime) -> int:
+        """Number of successful forwards for a guild since `since`."""
+
+    @abstractmethod
+    async def forwarding_stats(self, guild_id: str, since: datetime, rule_id: Optional[str]) -> Dict[str, List[Dict]]:
+        """
+        Forwarding counters since `since`. Returns the facets "totals", "by_rule",
+        "by_destination" and "hourly"; each row has "_id", "total" and "failed", where "_id"
+        is None, the rule id, the destination channel id, or {"rule_id", "hour"} respectively
+        ("hour" formatted as %Y-%m-%dT%H:00Z).
+        """
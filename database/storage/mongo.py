@@ -0,0 +1,396 @@
+"""
+MongoDB storage backend on top of DatabaseCore.
+
+Every query goes through DatabaseCore.execute_with_retry; rule and settings writes use
+causal sessions so follow-up reads from secondaries see them.
+"""
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Dict, Any, AsyncIterator, List, Optional, Set, Tuple
+
+from pymongo import DeleteMany, ReturnDocument
+
+from .. import log_schema
+from ..bulk import BulkWrite
+from ..exceptions import DatabaseOperationError
+from ..constants import GUILD_SCOPED_COLLECTIONS
+from .base import StorageBackend
+
+DATABASE_NAME = "discord_forwarding_bot"
+
+
+class MongoStorage(StorageBackend):
+    """Storage backend for the bot's MongoDB database."""
+
+    name = "mongo"
+
+    def __init__(self, database_core, purge_batch_size: int = 1000, purge_batch_pause: float = 0.1,
+                 compact_logs: bool = None):
+        self.db = database_core
+        # Write message logs in the compact log_schema shape; reads always handle both shapes
+        if compact_logs is None:
+            compact_logs = os.getenv("COMPACT_MESSAGE_LOGS", "true").lower() in ("1", "true", "yes")
+        self.compact_logs = compact_logs
+        self.purge_batch_size = purge_batch_size  # message_logs documents deleted per batch
+        self.purge_batch_pause = purge_batch_pause  # Seconds to yield between batches
+
+    def _collection(self, name: str):
+        return self.db.get_collection(DATABASE_NAME, name)
+
+    # Lifecycle
+
+    async def initialize(self) -> bool:
+        return await self.db.initialize()
+
+    async def close(self):
+        await self.db.close()
+
+    def is_healthy(self) -> bool:
+        return self.db.is_healthy()
+
+    # Global bot settings
+
+    async def get_bot_settings(self) -> Optional[Dict[str, Any]]:
+        collection = self._collection("bot_settings")
+        return await self.db.execute_with_retry(
+            lambda: collection.find_one({"_id": "global_config"}), "get_bot_settings")
+
+    async def create_bot_settings(self, settings: Dict[str, Any]):
+        collection = self._collection("bot_settings")
+        await self.db.execute_with_retry(
+            lambda: collection.insert_one(settings), "create_bot_settings", idempotent=False)
+
+    async def update_bot_settings(self, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        collection = self._collection("bot_settings")
+        return await self.db.execute_with_retry(
+            lambda: collection.find_one_and_update(
+                {"_id": "global_config"},
+                {"$set": updates},
+                return_document=ReturnDocument.AFTER
+            ),
+            "update_bot_settings"
+        )
+
+    # Premium subscriptions
+
+    async def set_premium_subscription(self, guild_id: str, expires_at: datetime, is_active: bool):
+        collection = self._collection("premium_subscriptions")
+        await self.db.execute_with_retry(
+            lambda: collection.update_one(
+                {"guild_id": guild_id},
+                {"$set": {
+                    "is_active": is_active,
+                    "expires_at": expires_at,
+                    "updated_at": datetime.now(timezone.utc)
+                }},
+                upsert=True
+            ),
+            "set_premium_subscription"
+        )
+
+    async def has_active_premium(self, guild_id: str, now: datetime) -> bool:
+        collection = self._collection("premium_subscriptions")
+        premium = await self.db.execute_with_retry(
+            lambda: collection.find_one(
+                {"guild_id": guild_id, "is_active": True, "expires_at": {"$gt": now}},
+                {"_id": 1}
+            ),
+            "is_premium_guild"
+        )
+        return premium is not None
+
+    async def list_active_premium(self, now: datetime) -> List[Tuple[str, datetime]]:
+        collection = self._collection("premium_subscriptions")
+        active = await self.db.execute_with_retry(
+            lambda: collection.find(
+                {"is_active": True, "expires_at": {"$gt": now}},
+                {"guild_id": 1, "expires_at": 1}
+            ).to_list(length=None),
+            "load_premium_subscriptions"
+        )
+        return [(str(subscription["guild_id"]), subscription["expires_at"]) for subscription in active]
+
+    # Guild settings
+
+    async def get_guild(self, guild_id: str) -> Optional[Dict[str, Any]]:
+        collection = self._collection("guild_settings")
+        return await self.db.execute_with_retry(
+            lambda: collection.find_one({"_id": guild_id}), "get_guild_settings")
+
+    async def create_guild(self, settings: Dict[str, Any]):
+        collection = self._collection("guild_settings")
+        await self.db.execute_with_retry(
+            lambda: collection.insert_one(settings), "create_guild", idempotent=False)
+
+    async def update_guild(self, guild_id: str, updates: Dict[str, Any]) -> bool:
+        collection = self._collection("guild_settings")
+
+        async def update():
+            async with self.db.causal_session(guild_id, write=True) as session:
+                return await collection.update_one({"_id": guild_id}, {"$set": updates}, session=session)
+
+        result = await self.db.execute_with_retry(update, "update_guild_settings")
+        return result.modified_count > 0
+
+    async def update_guild_and_fetch(self, guild_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        collection = self._collection("guild_settings")
+
+        async def update():
+            async with self.db.causal_session(guild_id, write=True) as session:
+                return await collection.find_one_and_update(
+                    {"_id": guild_id},
+                    {"$set": updates},
+                    return_document=ReturnDocument.AFTER,
+                    session=session
+                )
+
+        return await self.db.execute_with_retry(update, "refresh_guild")
+
+    async def list_guilds(self) -> List[Dict[str, Any]]:
+        collection = self.db.get_read_collection(DATABASE_NAME, "guild_settings", "get_all_guilds")
+        return await self.db.execute_with_retry(
+            lambda: collection.find({}).to_list(length=None), "get_all_guilds")
+
+    async def stream_guilds(self, projection: Optional[Dict[str, Any]] = None,
+                            batch_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        One cursor over guild_settings. A cursor can't be replayed mid-stream, so this is
+        tracked by operation_context but not retried; a failed warm start just falls back
+        to loading guilds on demand.
+        """
+        collection = self.db.get_read_collection(DATABASE_NAME, "guild_settings", "get_all_guilds")
+        async with self.db.operation_context("stream_guilds"):
+            async for guild in collection.find({}, projection).batch_size(batch_size):
+                yield guild
+
+    async def count_guilds(self) -> int:
+        collection = self.db.get_read_collection(DATABASE_NAME, "guild_settings", "get_guild_count")
+        return await self.db.execute_with_retry(lambda: collection.count_documents({}), "get_guild_count")
+
+    async def list_known_guild_ids(self) -> Set[str]:
+        guild_settings = self._collection("guild_settings")
+        message_logs = self._collection("message_logs")
+        known_ids = await asyncio.gather(
+            self.db.execute_with_retry(lambda: guild_settings.distinct("_id"), "orphan_scan_settings"),
+            self.db.execute_with_retry(lambda: message_logs.distinct("guild_id"), "orphan_scan_logs"),
+            self.db.execute_with_retry(lambda: message_logs.distinct("g"), "orphan_scan_compact_logs"),
+        )
+        return {str(guild_id) for ids in known_ids for guild_id in ids if guild_id}
+
+    async def purge_guild(self, guild_id: str, progress: Dict[str, Any]):
+        """
+        Purge every collection in GUILD_SCOPED_COLLECTIONS concurrently. The small collections
+        go out as one DatabaseCore.run_bulk() batch; message_logs is deleted in chunks of
+        `purge_batch_size` documents so a large guild never turns into one long-running delete.
+        """
+        # Some collections store the id as a string, others (setup_sessions) as an int
+        guild_match: Any = {"$in": [guild_id, int(guild_id)]} if str(guild_id).isdigit() else guild_id
+
+        async def purge_settings():
+            # One DeleteMany per collection, issued together through the bulk executor
+            names = [name for name in GUILD_SCOPED_COLLECTIONS if name != "message_logs"]
+            results = await self.db.run_bulk(
+                [BulkWrite(name, DeleteMany({GUILD_SCOPED_COLLECTIONS[name]: guild_match})) for name in names],
+                "purge_guild"
+            )
+            for name, item in zip(names, results):
+                if not item.ok:
+                    raise DatabaseOperationError(f"Failed to purge {name}: {item.error}")
+                progress["deleted"][name] = item.result.deleted_count
+
+        results = await asyncio.gather(
+            purge_settings(),
+            self._purge_in_batches(self._collection("message_logs"), log_schema.guild_filter(guild_id),
+                                   "message_logs", progress),
+            return_exceptions=True
+        )
+        failures = [error for error in results if isinstance(error, Exception)]
+        if failures:
+            raise failures[0]
+
+    async def _purge_in_batches(self, collection, query: Dict[str, Any], collection_name: str,
+                                progress: Dict[str, Any]):
+        """
+        Delete matching documents `purge_batch_size` _ids at a time, yielding between batches
+        so replication and other writers keep up.
+        """
+        deleted = 0
+        while True:
+            ids = await self.db.execute_with_retry(
+                lambda: collection.find(query, {"_id": 1}).limit(self.purge_batch_size).to_list(length=None),
+                f"purge_{collection_name}_scan"
+            )
+            if not ids:
+                break
+
+            batch = [document["_id"] for document in ids]
+            result = await self.db.execute_with_retry(
+                lambda: collection.delete_many({"_id": {"$in": batch}}), f"purge_{collection_name}")
+            deleted += result.deleted_count
+            progress["deleted"][collection_name] = deleted
+
+            if len(batch) < self.purge_batch_size:
+                break
+            await asyncio.sleep(self.purge_batch_pause)
+
+        progress["deleted"][collection_name] = deleted
+
+    # Rules
+
+    async def list_rules(self, guild_id: str) -> List[Dict[str, Any]]:
+        """Served from a secondary when possible, but causally consistent with this process's last rule edit."""
+        collection = self.db.get_read_collection(DATABASE_NAME, "guild_settings", "list_rules")
+
+        async def read():
+            async with self.db.causal_session(guild_id) as session:
+                return await collection.find_one({"_id": guild_id}, {"rules": 1}, session=session)
+
+        settings = await self.db.execute_with_retry(read, "list_rules")
+        return (settings or {}).get("rules", [])
+
+    async def get_rule(self, rule_id: str) -> Optional[Dict[str, Any]]:
+        collection = self._collection("guild_settings")
+        result = await self.db.execute_with_retry(
+            lambda: collection.find_one({"rules.rule_id": rule_id}, {"rules.$": 1}), "get_rule_by_id")
+        rules = (result or {}).get("rules", [])
+        return rules[0] if rules else None
+
+    async def add_rule(self, guild_id: str, rule: Dict[str, Any], default_limit: int, min_limit: int) -> bool:
+        collection = self._collection("guild_settings")
+        max_rules = {"$max": [{"$ifNull": ["$limits.max_rules", default_limit]}, min_limit]}
+
+        # The rule_id guard makes the $push idempotent, so ambiguous network errors can be retried
+        async def push():
+            async with self.db.causal_session(guild_id, write=True) as session:
+                return await collection.update_one(
+                    {
+                        "_id": guild_id,
+                        "rules.rule_id": {"$ne": rule["rule_id"]},
+                        "$expr": {"$lt": [{"$size": {"$ifNull": ["$rules", []]}}, max_rules]}
+                    },
+                    {
+                        "$push": {"rules": rule},
+                        "$inc": {"rules_version": 1},
+                        "$set": {"updated_at": datetime.now(timezone.utc)}
+                    },
+                    session=session
+                )
+
+        result = await self.db.execute_with_retry(push, "add_rule")
+        return result.modified_count > 0
+
+    async def update_rule(self, rule_id: str, updates: Dict[str, Any], expected_version: Optional[int]) -> bool:
+        collection = self._collection("guild_settings")
+
+        rule_match: Dict[str, Any] = {"rule_id": rule_id}
+        if expected_version is not None:
+            # Rules written before versioning have no version field and count as version 0
+            rule_match["version"] = expected_version if expected_version else {"$in": [0, None]}
+
+        # This uses the '$' positional operator to update the specific element
+        # in the 'rules' array that was matched by the query filter.
+        update_fields = {f"rules.$.{key}": value for key, value in updates.items()}
+
+        async def update():
+            async with self.db.causal_session(write=True) as session:
+                guild = await collection.find_one_and_update(
+                    {"rules": {"$elemMatch": rule_match}},
+                    {"$set": update_fields, "$inc": {"rules.$.version": 1, "rules_version": 1}},
+                    projection={"_id": 1},
+                    session=session
+                )
+                if guild is not None:
+                    self.db.record_causal_write(guild["_id"], session)
+            return guild
+
+        return await self.db.execute_with_retry(update, "update_rule") is not None
+
+    async def delete_rule(self, guild_id: str, rule_id: str) -> bool:
+        collection = self._collection("guild_settings")
+
+        async def pull():
+            async with self.db.causal_session(guild_id, write=True) as session:
+                return await collection.update_one(
+                    {"_id": guild_id, "rules.rule_id": rule_id},
+                    {"$pull": {"rules": {"rule_id": rule_id}}, "$inc": {"rules_version": 1}},
+                    session=session
+                )
+
+        result = await self.db.execute_with_retry(pull, "delete_rule")
+        return result.modified_count > 0
+
+    # Message logs
+
+    async def insert_message_log(self, log_data: Dict[str, Any]):
+        collection = self._collection("message_logs")
+        document = log_schema.encode_log(log_data) if self.compact_logs else log_data
+        await self.db.execute_with_retry(
+            lambda: collection.insert_one(document), "log_forwarded_message", idempotent=False)
+
+    async def count_messages(self, guild_id: str, since: datetime) -> int:
+        collection = self._collection("message_logs")
+        return await self.db.execute_with_retry(
+            lambda: collection.count_documents(log_schema.guild_since_filter(guild_id, since, successful_only=True)),
+            "get_daily_message_count"
+        )
+
+    async def forwarding_stats(self, guild_id: str, since: datetime, rule_id: Optional[str]) -> Dict[str, List[Dict]]:
+        """
+        One $facet aggregation serves every facet; each document shape is matched through its
+        own (guild, time) index. Ids are normalized to strings and the rows of both shapes merged.
+        """
+        counters = {
+            "total": {"$sum": 1},
+            "failed": {"$sum": {"$cond": [log_schema.FAILED_EXPR, 1, 0]}},
+        }
+        pipeline = [
+            {"$match": log_schema.guild_since_filter(guild_id, since, rule_id)},
+            {"$project": {
+                "rule_id": log_schema.RULE_ID_EXPR,
+                "destination_channel_id": log_schema.DESTINATION_EXPR,
+                "forwarded_at": log_schema.FORWARDED_AT_EXPR,
+                "success": 1,
+                "e": 1
+            }},
+            {"$facet": {
+                "totals": [{"$group": {"_id": None, **counters}}],
+                "by_rule": [{"$group": {"_id": "$rule_id", **counters}}],
+                "by_destination": [{"$group": {"_id": "$destination_channel_id", **counters}}],
+                "hourly": [
+                    {"$group": {
+                        "_id": {
+                            "rule_id": "$rule_id",
+                            "hour": {"$dateToString": {"format": "%Y-%m-%dT%H:00Z", "date": "$forwarded_at"}}
+                        },
+                        **counters
+                    }},
+                ],
+            }},
+        ]
+
+        collection = self.db.get_read_collection(DATABASE_NAME, "message_logs", "forwarding_stats")
+        result = await self.db.execute_with_retry(
+            lambda: collection.aggregate(pipeline).to_list(length=1), "forwarding_stats")
+        facets = result[0] if result else {}
+
+        def merge(rows: List[Dict], key) -> List[Dict]:
+            merged: Dict[Any, Dict] = {}
+            for row in rows:
+                _id = key(row["_id"])
+                merge_key = tuple(_id.items()) if isinstance(_id, dict) else _id
+                entry = merged.setdefault(merge_key, {"_id": _id, "total": 0, "failed": 0})
+                entry["total"] += row["total"]
+                entry["failed"] += row["failed"]
+            return list(merged.values())
+
+        return {
+            "totals": facets.get("totals", []),
+            "by_rule": sorted(merge(facets.get("by_rule", []), log_schema.id_str), key=lambda row: -row["total"]),
+            "by_destination": sorted(merge(facets.get("by_destination", []), log_schema.id_str), key=lambda row: -row["total"]),
+            "hourly": sorted(
+                merge(facets.get("hourly", []),
+                      lambda _id: {"rule_id": log_schema.id_str(_id.get("rule_id")), "hour": _id["hour"]}),
+                key=lambda row: row["_id"]["hour"]
+            ),
+        }
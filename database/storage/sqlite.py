@@ -0,0 +1,467 @@
+"""
+Embedded SQLite storage backend for tests, benchmarks and small self-hosted deployments.
+
+The database runs in WAL mode so readers never block the writer. All statements are
+constant, parameterised SQL, so sqlite3's statement cache prepares each one only once.
+Message logs carry a covering index, so daily counts and statistics are answered from the
+index alone. A single worker thread owns the connection, which keeps the event loop free
+and serialises access without extra locking. Multi-statement writes run in
+BEGIN IMMEDIATE transactions, so they stay atomic when another process shares the file.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import partial
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .base import StorageBackend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bot_settings (
+    id TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id TEXT PRIMARY KEY,
+    rules_version INTEGER NOT NULL DEFAULT 0,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rules (
+    rule_id TEXT PRIMARY KEY,
+    guild_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rules_by_guild ON rules (guild_id, position);
+CREATE TABLE IF NOT EXISTS premium_subscriptions (
+    guild_id TEXT PRIMARY KEY,
+    is_active INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS premium_active ON premium_subscriptions (is_active, expires_at, guild_id);
+CREATE TABLE IF NOT EXISTS message_logs (
+    id INTEGER PRIMARY KEY,
+    guild_id TEXT NOT NULL,
+    forwarded_at REAL NOT NULL,
+    success INTEGER NOT NULL,
+    rule_id TEXT,
+    destination_channel_id TEXT,
+    doc TEXT NOT NULL
+);
+-- Covers the daily count and every statistics query
+CREATE INDEX IF NOT EXISTS message_logs_covering
+    ON message_logs (guild_id, forwarded_at, success, rule_id, destination_channel_id);
+"""
+
+SELECT_BOT_SETTINGS = "SELECT doc FROM bot_settings WHERE id = 'global_config'"
+INSERT_BOT_SETTINGS = "INSERT INTO bot_settings (id, doc) VALUES ('global_config', ?)"
+UPDATE_BOT_SETTINGS = "UPDATE bot_settings SET doc = ? WHERE id = 'global_config'"
+
+UPSERT_PREMIUM = """
+INSERT INTO premium_subscriptions (guild_id, is_active, expires_at, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (guild_id) DO UPDATE SET
+    is_active = excluded.is_active, expires_at = excluded.expires_at, updated_at = excluded.updated_at
+"""
+SELECT_PREMIUM = "SELECT 1 FROM premium_subscriptions WHERE guild_id = ? AND is_active = 1 AND expires_at > ?"
+SELECT_ACTIVE_PREMIUM = "SELECT guild_id, expires_at FROM premium_subscriptions WHERE is_active = 1 AND expires_at > ?"
+
+SELECT_GUILD = "SELECT doc, rules_version FROM guild_settings WHERE guild_id = ?"
+SELECT_GUILDS = "SELECT guild_id, doc, rules_version FROM guild_settings"
+COUNT_GUILDS = "SELECT COUNT(*) FROM guild_settings"
+INSERT_GUILD = "INSERT INTO guild_settings (guild_id, rules_version, doc) VALUES (?, ?, ?)"
+UPDATE_GUILD = "UPDATE guild_settings SET doc = ? WHERE guild_id = ?"
+BUMP_RULES_VERSION = "UPDATE guild_settings SET rules_version = rules_version + 1, doc = ? WHERE guild_id = ?"
+SELECT_KNOWN_GUILD_IDS = "SELECT guild_id FROM guild_settings UNION SELECT DISTINCT guild_id FROM message_logs"
+
+SELECT_GUILD_RULES = "SELECT doc, version FROM rules WHERE guild_id = ? ORDER BY position"
+SELECT_ALL_RULES = "SELECT guild_id, doc, version FROM rules ORDER BY guild_id, position"
+SELECT_RULE = "SELECT guild_id, doc, version FROM rules WHERE rule_id = ?"
+RULE_SLOTS = "SELECT COUNT(*), COALESCE(MAX(position), -1) FROM rules WHERE guild_id = ?"
+INSERT_RULE = "INSERT INTO rules (rule_id, guild_id, position, version, doc) VALUES (?, ?, ?, ?, ?)"
+UPDATE_RULE = "UPDATE rules SET doc = ?, version = version + 1 WHERE rule_id = ?"
+DELETE_RULE = "DELETE FROM rules WHERE guild_id = ? AND rule_id = ?"
+
+INSERT_MESSAGE_LOG = """
+INSERT INTO message_logs (guild_id, forwarded_at, success, rule_id, destination_channel_id, doc)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+COUNT_MESSAGES = """
+SELECT COUNT(*) FROM message_logs WHERE guild_id = ? AND forwarded_at >= ? AND success = 1
+"""
+# :rule_id IS NULL keeps a single prepared statement for both the filtered and unfiltered forms
+STATS_FILTER = "guild_id = :guild_id AND forwarded_at >= :since AND (:rule_id IS NULL OR rule_id = :rule_id)"
+STATS_TOTALS = f"SELECT NULL, COUNT(*), COALESCE(SUM(success = 0), 0) FROM message_logs WHERE {STATS_FILTER}"
+STATS_BY_RULE = f"""
+SELECT rule_id, COUNT(*) AS total, SUM(success = 0) FROM message_logs WHERE {STATS_FILTER}
+GROUP BY rule_id ORDER BY total DESC
+"""
+STATS_BY_DESTINATION = f"""
+SELECT destination_channel_id, COUNT(*) AS total, SUM(success = 0) FROM message_logs WHERE {STATS_FILTER}
+GROUP BY destination_channel_id ORDER BY total DESC
+"""
+STATS_HOURLY = f"""
+SELECT rule_id, strftime('%Y-%m-%dT%H:00Z', forwarded_at, 'unixepoch') AS hour, COUNT(*), SUM(success = 0)
+FROM message_logs WHERE {STATS_FILTER}
+GROUP BY rule_id, hour ORDER BY hour
+"""
+
+PURGE_STATEMENTS = {
+    "guild_settings": "DELETE FROM guild_settings WHERE guild_id = ?",
+    "rules": "DELETE FROM rules WHERE guild_id = ?",
+    "premium_subscriptions": "DELETE FROM premium_subscriptions WHERE guild_id = ?",
+}
+PURGE_MESSAGE_LOG_BATCH = """
+DELETE FROM message_logs WHERE id IN (SELECT id FROM message_logs WHERE guild_id = ? LIMIT ?)
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    """Storage backend for a local SQLite database file."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = "data/stygian.db", purge_batch_size: int = 1000, purge_batch_pause: float = 0.01):
+        self.path = path
+        self.purge_batch_size = purge_batch_size  # message_logs rows deleted per batch
+        self.purge_batch_pause = purge_batch_pause  # Seconds to yield between batches
+        self._connection: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None  # Started on first use, again after close()
+
+    async def _run(self, function, *args):
+        """Run a blocking function on the connection's worker thread."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-storage")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(function, *args))
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT, rolling back on error."""
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    # Lifecycle
+
+    async def initialize(self) -> bool:
+        await self._run(self._open)
+        return True
+
+    def _open(self):
+        if self._connection is not None:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Autocommit mode; multi-statement writes use explicit transactions
+        connection = sqlite3.connect(self.path, isolation_level=None, cached_statements=128)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA busy_timeout=5000")
+        connection.executescript(SCHEMA)
+        self._connection = connection
+
+    async def close(self):
+        await self._run(self._close)
+        # A later initialize() (e.g. a reconnect) starts a fresh worker thread
+        executor, self._executor = self._executor, None
+        executor.shutdown(wait=True)
+
+    def _close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def is_healthy(self) -> bool:
+        return self._connection is not None
+
+    # Global bot settings
+
+    async def get_bot_settings(self) -> Optional[Dict[str, Any]]:
+        return await self._run(self._fetch_doc, SELECT_BOT_SETTINGS, ())
+
+    async def create_bot_settings(self, settings: Dict[str, Any]):
+        await self._run(self._execute, INSERT_BOT_SETTINGS, (_dumps(settings),))
+
+    async def update_bot_settings(self, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await self._run(self._update_bot_settings, updates)
+
+    def _update_bot_settings(self, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._transaction() as connection:
+            row = connection.execute(SELECT_BOT_SETTINGS).fetchone()
+            if row is None:
+                return None
+            settings = _apply_updates(_loads(row[0]), updates)
+            connection.execute(UPDATE_BOT_SETTINGS, (_dumps(settings),))
+            return settings
+
+    # Premium subscriptions
+
+    async def set_premium_subscription(self, guild_id: str, expires_at: datetime, is_active: bool):
+        await self._run(self._execute, UPSERT_PREMIUM, (
+            guild_id, int(is_active), _timestamp(expires_at), _timestamp(datetime.now(timezone.utc))))
+
+    async def has_active_premium(self, guild_id: str, now: datetime) -> bool:
+        row = await self._run(self._fetch_one, SELECT_PREMIUM, (guild_id, _timestamp(now)))
+        return row is not None
+
+    async def list_active_premium(self, now: datetime) -> List[Tuple[str, datetime]]:
+        rows = await self._run(self._fetch_all, SELECT_ACTIVE_PREMIUM, (_timestamp(now),))
+        return [(guild_id, datetime.fromtimestamp(expires_at, tz=timezone.utc)) for guild_id, expires_at in rows]
+
+    # Guild settings
+
+    async def get_guild(self, guild_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self._get_guild, guild_id)
+
+    def _get_guild(self, guild_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection.execute(SELECT_GUILD, (guild_id,)).fetchone()
+        if row is None:
+            return None
+
+        guild = _loads(row[0])
+        guild["rules_version"] = row[1]
+        guild["rules"] = [_rule(doc, version) for doc, version in
+                          self._connection.execute(SELECT_GUILD_RULES, (guild_id,))]
+        return guild
+
+    async def create_guild(self, settings: Dict[str, Any]):
+        await self._run(self._create_guild, settings)
+
+    def _create_guild(self, settings: Dict[str, Any]):
+        guild = {key: value for key, value in settings.items() if key not in ("rules", "rules_version")}
+        with self._transaction() as connection:
+            connection.execute(INSERT_GUILD, (settings["_id"], settings.get("rules_version", 0), _dumps(guild)))
+            for position, rule in enumerate(settings.get("rules", [])):
+                connection.execute(INSERT_RULE, (rule["rule_id"], settings["_id"], position,
+                                                 rule.get("version", 0), _dumps(_rule_body(rule))))
+
+    async def update_guild(self, guild_id: str, updates: Dict[str, Any]) -> bool:
+        return await self._run(self._update_guild, guild_id, updates) is not None
+
+    async def update_guild_and_fetch(self, guild_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if await self._run(self._update_guild, guild_id, updates) is None:
+            return None
+        return await self.get_guild(guild_id)
+
+    def _update_guild(self, guild_id: str, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._transaction() as connection:
+            row = connection.execute(SELECT_GUILD, (guild_id,)).fetchone()
+            if row is None:
+                return None
+            guild = _apply_updates(_loads(row[0]), updates)
+            connection.execute(UPDATE_GUILD, (_dumps(guild), guild_id))
+            return guild
+
+    async def list_guilds(self) -> List[Dict[str, Any]]:
+        return await self._run(self._list_guilds)
+
+    def _list_guilds(self) -> List[Dict[str, Any]]:
+        guilds = {}
+        for guild_id, doc, rules_version in self._connection.execute(SELECT_GUILDS):
+            guild = _loads(doc)
+            guild["rules_version"] = rules_version
+            guild["rules"] = []
+            guilds[guild_id] = guild
+
+        for guild_id, doc, version in self._connection.execute(SELECT_ALL_RULES):
+            if guild_id in guilds:
+                guilds[guild_id]["rules"].append(_rule(doc, version))
+        return list(guilds.values())
+
+    async def count_guilds(self) -> int:
+        return (await self._run(self._fetch_one, COUNT_GUILDS, ()))[0]
+
+    async def list_known_guild_ids(self) -> Set[str]:
+        return {row[0] for row in await self._run(self._fetch_all, SELECT_KNOWN_GUILD_IDS, ())}
+
+    async def purge_guild(self, guild_id: str, progress: Dict[str, Any]):
+        for table, statement in PURGE_STATEMENTS.items():
+            progress["deleted"][table] = await self._run(self._execute, statement, (guild_id,))
+
+        # Small batches keep each write transaction (and the WAL) short
+        deleted = 0
+        while True:
+            batch = await self._run(self._execute, PURGE_MESSAGE_LOG_BATCH, (guild_id, self.purge_batch_size))
+            deleted += batch
+            progress["deleted"]["message_logs"] = deleted
+            if batch < self.purge_batch_size:
+                break
+            await asyncio.sleep(self.purge_batch_pause)
+
+    # Rules
+
+    async def list_rules(self, guild_id: str) -> List[Dict[str, Any]]:
+        rows = await self._run(self._fetch_all, SELECT_GUILD_RULES, (guild_id,))
+        return [_rule(doc, version) for doc, version in rows]
+
+    async def get_rule(self, rule_id: str) -> Optional[Dict[str, Any]]:
+        row = await self._run(self._fetch_one, SELECT_RULE, (rule_id,))
+        return _rule(row[1], row[2]) if row else None
+
+    async def add_rule(self, guild_id: str, rule: Dict[str, Any], default_limit: int, min_limit: int) -> bool:
+        return await self._run(self._add_rule, guild_id, rule, default_limit, min_limit)
+
+    def _add_rule(self, guild_id: str, rule: Dict[str, Any], default_limit: int, min_limit: int) -> bool:
+        with self._transaction() as connection:
+            row = connection.execute(SELECT_GUILD, (guild_id,)).fetchone()
+            if row is None or connection.execute(SELECT_RULE, (rule["rule_id"],)).fetchone():
+                return False
+
+            guild = _loads(row[0])
+            limit = max(guild.get("limits", {}).get("max_rules", default_limit), min_limit)
+            count, last_position = connection.execute(RULE_SLOTS, (guild_id,)).fetchone()
+            if count >= limit:
+                return False
+
+            connection.execute(INSERT_RULE, (rule["rule_id"], guild_id, last_position + 1,
+                                             rule.get("version", 0), _dumps(_rule_body(rule))))
+            guild["updated_at"] = datetime.now(timezone.utc)
+            connection.execute(BUMP_RULES_VERSION, (_dumps(guild), guild_id))
+            return True
+
+    async def update_rule(self, rule_id: str, updates: Dict[str, Any], expected_version: Optional[int]) -> bool:
+        return await self._run(self._update_rule, rule_id, updates, expected_version)
+
+    def _update_rule(self, rule_id: str, updates: Dict[str, Any], expected_version: Optional[int]) -> bool:
+        with self._transaction() as connection:
+            row = connection.execute(SELECT_RULE, (rule_id,)).fetchone()
+            if row is None:
+                return False
+
+            guild_id, doc, version = row
+            if expected_version is not None and version != expected_version:
+                return False
+
+            connection.execute(UPDATE_RULE, (_dumps(_apply_updates(_loads(doc), updates)), rule_id))
+            self._bump_rules_version(connection, guild_id)
+            return True
+
+    async def delete_rule(self, guild_id: str, rule_id: str) -> bool:
+        return await self._run(self._delete_rule, guild_id, rule_id)
+
+    def _delete_rule(self, guild_id: str, rule_id: str) -> bool:
+        with self._transaction() as connection:
+            if connection.execute(DELETE_RULE, (guild_id, rule_id)).rowcount == 0:
+                return False
+            self._bump_rules_version(connection, guild_id)
+            return True
+
+    @staticmethod
+    def _bump_rules_version(connection: sqlite3.Connection, guild_id: str):
+        row = connection.execute(SELECT_GUILD, (guild_id,)).fetchone()
+        if row is not None:
+            guild = _loads(row[0])
+            guild["updated_at"] = datetime.now(timezone.utc)
+            connection.execute(BUMP_RULES_VERSION, (_dumps(guild), guild_id))
+
+    # Message logs
+
+    async def insert_message_log(self, log_data: Dict[str, Any]):
+        await self._run(self._execute, INSERT_MESSAGE_LOG, (
+            str(log_data["guild_id"]),
+            _timestamp(log_data["forwarded_at"]),
+            int(log_data.get("success", True)),
+            log_data.get("rule_id"),
+            log_data.get("destination_channel_id"),
+            _dumps(log_data),
+        ))
+
+    async def count_messages(self, guild_id: str, since: datetime) -> int:
+        return (await self._run(self._fetch_one, COUNT_MESSAGES, (guild_id, _timestamp(since))))[0]
+
+    async def forwarding_stats(self, guild_id: str, since: datetime, rule_id: Optional[str]) -> Dict[str, List[Dict]]:
+        return await self._run(self._forwarding_stats, guild_id, since, rule_id)
+
+    def _forwarding_stats(self, guild_id: str, since: datetime, rule_id: Optional[str]) -> Dict[str, List[Dict]]:
+        params = {"guild_id": guild_id, "since": _timestamp(since), "rule_id": rule_id}
+        connection = self._connection
+
+        def rows(statement: str) -> List[Dict[str, Any]]:
+            return [{"_id": key, "total": total, "failed": failed or 0}
+                    for key, total, failed in connection.execute(statement, params)]
+
+        totals = rows(STATS_TOTALS)
+        return {
+            "totals": totals if totals and totals[0]["total"] else [],
+            "by_rule": rows(STATS_BY_RULE),
+            "by_destination": rows(STATS_BY_DESTINATION),
+            "hourly": [{"_id": {"rule_id": rule, "hour": hour}, "total": total, "failed": failed or 0}
+                       for rule, hour, total, failed in connection.execute(STATS_HOURLY, params)],
+        }
+
+    # Helpers (worker thread)
+
+    def _execute(self, statement: str, params: tuple) -> int:
+        return self._connection.execute(statement, params).rowcount
+
+    def _fetch_one(self, statement: str, params: tuple) -> Optional[tuple]:
+        return self._connection.execute(statement, params).fetchone()
+
+    def _fetch_all(self, statement: str, params: tuple) -> List[tuple]:
+        return self._connection.execute(statement, params).fetchall()
+
+    def _fetch_doc(self, statement: str, params: tuple) -> Optional[Dict[str, Any]]:
+        row = self._connection.execute(statement, params).fetchone()
+        return _loads(row[0]) if row else None
+
+
+def _timestamp(value: datetime) -> float:
+    """UTC epoch seconds; naive datetimes are taken to be UTC like MongoDB's."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": _timestamp(value)}
+    return str(value)
+
+
+def _json_object_hook(value: Dict[str, Any]) -> Any:
+    if len(value) == 1 and "$date" in value:
+        return datetime.fromtimestamp(value["$date"], tz=timezone.utc)
+    return value
+
+
+def _dumps(document: Dict[str, Any]) -> str:
+    return json.dumps(document, default=_json_default, separators=(",", ":"))
+
+
+def _loads(text: str) -> Dict[str, Any]:
+    return json.loads(text, object_hook=_json_object_hook)
+
+
+def _rule_body(rule: Dict[str, Any]) -> Dict[str, Any]:
+    """Rule document without the version, which lives in its own column."""
+    return {key: value for key, value in rule.items() if key != "version"}
+
+
+def _rule(doc: str, version: int) -> Dict[str, Any]:
+    rule = _loads(doc)
+    rule["version"] = version
+    return rule
+
+
+def _apply_updates(document: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply $set-style updates, including dotted paths, to a document."""
+    for path, value in updates.items():
+        target = document
+        *parents, leaf = path.split(".")
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = value
+    return document
@@ -2,12 +2,17 @@ import asyncio
 import discord
 from discord.ext import commands
 from discord import app_commands, ui
-from database import guild_manager
+from database import guild_manager, GuildRuleIndex
 from logger.logger_setup import get_logger
+from logger.tracing import trace_context, span, discard_trace
 
 logger = get_logger(__name__, level=20)
 
 
+class ForwardFallbackError(Exception):
+    """The message couldn't be sent as-is; a reduced fallback version was sent instead."""
+
+
 class ForwardOptionsView(ui.View):
     """
     A view that provides options for manually forwarding a message.
@@ -91,8 +96,12 @@ class ForwardOptionsView(ui.View):
         }
 
         try:
-            await self.cog_instance.forward_message(default_formatting, self.original_message, self.destination_channel)
-            await interaction.followup.send(f"Message forwarded to {self.destination_channel.mention}!", ephemeral=True)
+            try:
+                await self.cog_instance.forward_message(default_formatting, self.original_message, self.destination_channel)
+                reply = f"Message forwarded to {self.destination_channel.mention}!"
+            except ForwardFallbackError:
+                reply = f"Message forwarded to {self.destination_channel.mention}, but some content had to be omitted."
+            await interaction.followup.send(reply, ephemeral=True)
 
             # Disable the view after successful forwarding.
             for item in self.children:
@@ -143,55 +152,88 @@ class Forwarding(commands.Cog):
         if message.author.bot or not message.guild:
             return
 
+        # Everything logged or timed while handling this message carries its correlation id
+        with trace_context("message", f"m{message.id}", guild_id=message.guild.id, channel_id=message.channel.id):
+            await self._handle_message(message)
+
+    async def _handle_message(self, message: discord.Message):
+        """Forwards one guild message according to the rules of its channel."""
         # Enhanced URL embed detection and waiting
         if self._contains_embeddable_url(message.content) and not message.embeds:
             # Wait longer for embeds to load, with multiple checks
-            for attempt in range(3):
-                await asyncio.sleep(2 + attempt)  # 2s, 3s, 4s
-                try:
-                    message = await message.channel.fetch_message(message.id)
-                    if message.embeds:
-                        break
-                except (discord.NotFound, discord.Forbidden):
-                    return
+            with span("embed_wait"):
+                for attempt in range(3):
+                    await asyncio.sleep(2 + attempt)  # 2s, 3s, 4s
+                    try:
+                        message = await message.channel.fetch_message(message.id)
+                        if message.embeds:
+                            break
+                    except (discord.NotFound, discord.Forbidden):
+                        return
 
         try:
-            # Retrieve guild-specific settings from the database.
-            guild_settings = await guild_manager.get_guild_settings(str(message.guild.id))
+            # The guild's compiled rule index: cached in memory, so this is normally no database round trip.
+            with span("settings"):
+                rule_index = await guild_manager.get_rule_index(message.guild.id)
 
             # Check if the forwarding feature is enabled for this guild.
-            if not guild_settings.get("features", {}).get("forwarding_enabled", False):
+            if not rule_index.features.get("forwarding_enabled", False):
+                discard_trace()
                 return
 
-            rules = guild_settings.get("rules", [])
+            # Only the active rules for this source channel; rule channel ids are int snowflakes like discord.py's.
+            channel_id = message.channel.id
+            rules = rule_index.rules_for(channel_id)
             if not rules:
+                discard_trace()
                 return
 
-            # Iterate through all rules for the guild.
-            for rule in rules:
-                # A rule is processed only if it's active and for the correct source channel.
-                if not rule.get("is_active") or str(rule.get("source_channel_id")) != str(message.channel.id):
-                    continue
+            # Premium guilds get the premium tier limit; everyone else keeps their per-guild limit.
+            # Served from the entitlement cache, so this costs no database round trip.
+            with span("settings"):
+                guild_limits = await guild_manager.get_guild_limits(message.guild.id)
+            if guild_limits["is_premium"]:
+                daily_limit = guild_limits["daily_limit"]
+            else:
+                daily_limit = rule_index.limits.get("daily_messages", guild_limits["daily_limit"])
 
-                # Enforce the daily message forwarding limit for the guild.
-                daily_limit = guild_settings.get("limits", {}).get("daily_messages", 100)
-                daily_count = await guild_manager.get_daily_message_count(str(message.guild.id))
+            for rule in rules:
+                # Enforce the daily message forwarding limit; the count is kept in memory between recounts.
+                with span("limit"):
+                    daily_count = await guild_manager.get_daily_message_count(message.guild.id)
                 if daily_count >= daily_limit:
-                    if guild_settings.get("features", {}).get("notify_on_error", True):
+                    if rule_index.features.get("notify_on_error", True):
                         await message.channel.send(f"Daily message forwarding limit of {daily_limit} reached.", delete_after=60)
                     continue  # Stop processing this rule and any subsequent ones for this message.
 
                 # If the rule matches, process it and log the result.
-                if await self.process_rule(rule, message, guild_settings):
+                # Failed forwards are logged too so statistics can report failure rates.
+                # A degraded forward was still delivered, so it succeeded and counts toward the limit.
+                error = degraded = None
+                try:
+                    forwarded = await self.process_rule(rule, message, rule_index)
+                except ForwardFallbackError as e:
+                    forwarded, degraded = True, str(e)  # Already logged by the send helper
+                except Exception as e:
+                    logger.error(f"Error forwarding message {message.id} with rule {rule.get('rule_id')}: {e}",
+                                 exc_info=True)
+                    forwarded, error = True, str(e)
+
+                if forwarded:
                     log_data = {
-                        "guild_id": str(message.guild.id),
+                        "guild_id": message.guild.id,
                         "rule_id": rule.get("rule_id"),
-                        "source_channel_id": str(message.channel.id),
-                        "destination_channel_id": str(rule.get("destination_channel_id")),
-                        "original_message_id": str(message.id),
-                        "success": True
+                        "source_channel_id": channel_id,
+                        "destination_channel_id": rule.get("destination_channel_id"),
+                        "original_message_id": message.id,
+                        "success": error is None
                     }
-                    await guild_manager.log_forwarded_message(log_data)
+                    if error:
+                        log_data["error"] = error[:500]
+                    if degraded:
+                        log_data["degraded"] = degraded[:500]
+                    with span("log"):
+                        await guild_manager.log_forwarded_message(log_data)
 
         except Exception as e:
             logger.error(f"Error in on_message for guild {message.guild.id}: {e}", exc_info=True)
@@ -222,7 +264,7 @@ class Forwarding(commands.Cog):
                 return True
         return False
 
-    async def process_rule(self, rule: dict, message: discord.Message, guild_settings: dict) -> bool:
+    async def process_rule(self, rule: dict, message: discord.Message, rule_index: GuildRuleIndex) -> bool:
         """
         Process a single rule against a message.
         This method checks the message type and filters, and if they match,
@@ -230,14 +272,15 @@ class Forwarding(commands.Cog):
         Returns True if forwarded, False otherwise.
         """
         settings = rule.get("settings", {})
-        if not self.check_message_type(settings.get("message_types", {}), message):
-            return False
+        with span("filter"):
+            if not self.check_message_type(settings.get("message_types", {}), message):
+                return False
 
-        if not self.check_filters(settings.get("filters", {}), message, settings.get("advanced_options", {})):
-            return False
+            if not self.check_filters(settings.get("filters", {}), message, settings.get("advanced_options", {})):
+                return False
 
         destination_channel_id = rule.get("destination_channel_id")
-        destination_channel = self.bot.get_channel(int(destination_channel_id))
+        destination_channel = self.bot.get_channel(destination_channel_id)
 
         if not destination_channel:
             logger.warning(f"Destination channel {destination_channel_id} not found for rule {rule.get('rule_id')}")
@@ -369,7 +412,8 @@ class Forwarding(commands.Cog):
                     if allowed_types and not any(attachment.filename.lower().endswith(ext) for ext in allowed_types):
                         continue
 
-                    f = await attachment.to_file(spoiler=attachment.is_spoiler())
+                    with span("download"):
+                        f = await attachment.to_file(spoiler=attachment.is_spoiler())
                     files_to_send.append(f)
                 except discord.HTTPException as e:
                     logger.warning(f"Failed to forward attachment {attachment.filename}: {e}")
@@ -467,7 +511,8 @@ class Forwarding(commands.Cog):
                     if allowed_types and not any(attachment.filename.lower().endswith(ext) for ext in allowed_types):
                         continue
 
-                    f = await attachment.to_file(spoiler=attachment.is_spoiler())
+                    with span("download"):
+                        f = await attachment.to_file(spoiler=attachment.is_spoiler())
                     files_to_send.append(f)
                 except discord.HTTPException as e:
                     logger.warning(f"Failed to forward attachment {attachment.filename}: {e}")
@@ -543,7 +588,8 @@ class Forwarding(commands.Cog):
             # Prepare all attachments to be sent as files first.
             for attachment in message.attachments:
                 try:
-                    f = await attachment.to_file(spoiler=attachment.is_spoiler())
+                    with span("download"):
+                        f = await attachment.to_file(spoiler=attachment.is_spoiler())
                     files_to_send.append(f)
                 except discord.HTTPException as e:
                     logger.warning(f"Failed to prepare attachment {attachment.filename}: {e}")
@@ -680,7 +726,8 @@ class Forwarding(commands.Cog):
                 media_gallery = ui.MediaGallery()
                 for attachment in media_attachments:
                     try:
-                        f = await attachment.to_file(spoiler=attachment.is_spoiler())
+                        with span("download"):
+                            f = await attachment.to_file(spoiler=attachment.is_spoiler())
                         files_to_send.append(f)
                         media_gallery.add_item(media=f"attachment://{'SPOILER_' if attachment.is_spoiler() else ''}{attachment.filename}")
                     except discord.HTTPException as e:
@@ -693,7 +740,8 @@ class Forwarding(commands.Cog):
             if other_attachments:
                 for attachment in other_attachments:
                     try:
-                        f = await attachment.to_file(spoiler=attachment.is_spoiler())
+                        with span("download"):
+                            f = await attachment.to_file(spoiler=attachment.is_spoiler())
                         files_to_send.append(f)
                     except discord.HTTPException as e:
                         logger.warning(f"Failed to forward file {attachment.filename}: {e}")
@@ -706,7 +754,8 @@ class Forwarding(commands.Cog):
                 file_container.add_item(ui.TextDisplay(f"## Files ({len(other_attachments)})"))
                 for attachment in other_attachments:
                     try:
-                        f = await attachment.to_file(spoiler=attachment.is_spoiler())
+                        with span("download"):
+                            f = await attachment.to_file(spoiler=attachment.is_spoiler())
                         files_to_send.append(f)
                         file_container.add_item(
                             ui.TextDisplay(f"📎 {attachment.filename} ({attachment.size // 1024}KB)")
@@ -887,6 +936,7 @@ class Forwarding(commands.Cog):
         """
         Wrapper for `destination.send` that includes advanced error handling,
         such as message chunking and smart retries for oversized content.
+        Raises ForwardFallbackError when the message went out with content left out.
         """
         formatting = send_kwargs.pop('formatting', {})
 
@@ -895,22 +945,26 @@ class Forwarding(commands.Cog):
             send_kwargs["reference"] = message
             send_kwargs["mention_author"] = formatting.get("mention_author", False)
 
-        try:
-            await destination.send(**send_kwargs)
-        except discord.HTTPException as e:
-            logger.error(f"Failed to send forwarded message: {e}")
-
-            # If the message is too long, try to handle it gracefully.
-            if "message content too long" in str(e).lower():
-                await self._handle_oversized_message(destination, message, send_kwargs, formatting)
-            else:
-                # For other errors, try sending a minimal version.
-                send_kwargs.pop('reference', None)
-                send_kwargs.pop('files', None)
-                await destination.send(
-                    content="📨 *Message forwarded (some content omitted due to size limits)*",
-                    embeds=send_kwargs.get('embeds', [])[:1]
-                )
+        with span("send"):
+            try:
+                await destination.send(**send_kwargs)
+            except discord.HTTPException as e:
+                logger.error(f"Failed to send forwarded message: {e}")
+
+                # If the message is too long, try to handle it gracefully.
+                if "message content too long" in str(e).lower():
+                    complete = await self._handle_oversized_message(destination, message, send_kwargs, formatting)
+                else:
+                    # For other errors, try sending a minimal version.
+                    send_kwargs.pop('reference', None)
+                    send_kwargs.pop('files', None)
+                    await destination.send(
+                        content="📨 *Message forwarded (some content omitted due to size limits)*",
+                        embeds=send_kwargs.get('embeds', [])[:1]
+                    )
+                    complete = False
+                if not complete:
+                    raise ForwardFallbackError(f"Fallback used: {e}") from e
 
 
     async def _handle_oversized_message(self, destination: discord.TextChannel, message: discord.Message,
@@ -921,24 +975,25 @@ class Forwarding(commands.Cog):
         2. Reduce the number of embeds.
         3. Send a summary of files instead of the files themselves.
         4. As a last resort, send a minimal text-only version.
+        Returns True only if everything was delivered, i.e. the content was just split up.
         """
         content = send_kwargs.get('content', '')
         embeds = send_kwargs.get('embeds', [])
         files = send_kwargs.get('files', [])
 
         if content and len(content) > 2000:
-            await self._send_chunked_content(destination, message, content, embeds, files, formatting)
-            return
+            return await self._send_chunked_content(destination, message, content, embeds, files, formatting)
 
         if embeds and len(embeds) > 10:
             await self._send_reduced_embeds(destination, message, content, embeds, files, formatting)
-            return
+            return False
 
         if files and sum(f.size for f in files) > 25 * 1024 * 1024:  # 25MB total
             await self._send_compressed_files(destination, message, content, embeds, files, formatting)
-            return
+            return False
 
         await self._send_minimal_version(destination, message, formatting)
+        return False
 
 
     async def _send_chunked_content(self, destination: discord.TextChannel, message: discord.Message,
@@ -946,8 +1001,12 @@ class Forwarding(commands.Cog):
         """
         Splits large content into multiple messages, sent as replies.
         This method is used when the message content exceeds the 2000 character limit.
+        Returns True if all of the content, embeds and files were delivered.
         """
         chunks = self._split_content(content, max_length=1900)
+        # Only the first embed and file go with the first part, and at most 9 more with the last
+        complete = (len(embeds) <= 10 and len(files) <= 10
+                    and (len(chunks) > 1 or (len(embeds) <= 1 and len(files) <= 1)))
 
         first_chunk = chunks[0]
         if len(chunks) > 1:
@@ -962,7 +1021,7 @@ class Forwarding(commands.Cog):
             )
         except discord.HTTPException:
             await self._send_ultra_minimal(destination, message, formatting)
-            return
+            return False
 
         # Send subsequent parts as replies to the first message.
         for i, chunk in enumerate(chunks[1:], 2):
@@ -984,11 +1043,13 @@ class Forwarding(commands.Cog):
                         embeds=remaining_embeds,
                         mention_author=False
                     )
+                    complete = complete and not remaining_files
             else:
                 await first_message.reply(
                     content=chunk_content,
                     mention_author=False
                 )
+        return complete
 
 
     async def _send_reduced_embeds(self, destination: discord.TextChannel, message: discord.Message,
@@ -9,6 +9,7 @@ from discord.ext import commands
 from discord import app_commands
 
 from logger.logger_setup import get_logger
+from logger.tracing import trace_context
 from .setup_helpers.state_manager import state_manager
 from .setup_helpers.button_manager import button_manager
 from .setup_helpers.permission_check import permission_checker
@@ -16,7 +17,7 @@ from .setup_helpers.channel_select import channel_selector
 from .setup_helpers.rule_setup import rule_setup_helper
 from .setup_helpers.rule_creation_flow import RuleCreationFlow
 from .models.setup_state import SetupState
-from database import guild_manager
+from database import guild_manager, RuleLimitExceededError, ConcurrentModificationError
 
 logger = get_logger("setup")
 
@@ -299,11 +300,11 @@ class RuleSelectView(discord.ui.View):
             await interaction.followup.send("❌ Could not find the selected rule.", ephemeral=True)
             return
 
-        session = await state_manager.create_session(str(interaction.guild_id), interaction.user.id)
+        session = await state_manager.create_session(interaction.guild_id, interaction.user.id)
         session.current_rule = selected_rule
         session.is_editing = True
 
-        await state_manager.update_session(str(interaction.guild_id), {
+        await state_manager.update_session(interaction.guild_id, {
             "current_rule": session.current_rule,
             "is_editing": True,
             "step": "rule_preview"
@@ -362,7 +363,7 @@ class FormattingSettingsView(discord.ui.View):
         formatting_settings = settings.setdefault("formatting", {})
         formatting_settings["forward_style"] = select
 
-        await state_manager.update_session(str(interaction.guild_id), {
+        await state_manager.update_session(interaction.guild_id, {
             "current_rule": self.session.current_rule
         })
 
@@ -441,7 +442,7 @@ class EditChannelsView(discord.ui.View):
             return
 
         self.session.current_rule["source_channel_id"] = channel_id
-        await state_manager.update_session(str(interaction.guild_id), {"current_rule": self.session.current_rule})
+        await state_manager.update_session(interaction.guild_id, {"current_rule": self.session.current_rule})
         
         view = EditChannelsView(self.session, self.cog)
         embed = view.create_embed(interaction.guild)
@@ -460,7 +461,7 @@ class EditChannelsView(discord.ui.View):
             return
 
         self.session.current_rule["destination_channel_id"] = channel_id
-        await state_manager.update_session(str(interaction.guild_id), {"current_rule": self.session.current_rule})
+        await state_manager.update_session(interaction.guild_id, {"current_rule": self.session.current_rule})
 
         view = EditChannelsView(self.session, self.cog)
         embed = view.create_embed(interaction.guild)
@@ -555,7 +556,7 @@ class RuleSettingsView(discord.ui.View):
         
         async def modal_callback(modal_interaction: discord.Interaction, name: str):
             self.session.current_rule["rule_name"] = name
-            await state_manager.update_session(str(modal_interaction.guild_id), {"current_rule": self.session.current_rule})
+            await state_manager.update_session(modal_interaction.guild_id, {"current_rule": self.session.current_rule})
             
             view = RuleSettingsView(self.session, self.cog)
             embed = await view.create_settings_embed(modal_interaction.guild)
@@ -579,7 +580,7 @@ class RuleSettingsView(discord.ui.View):
         """
         current_status = self.session.current_rule.get("is_active", True)
         self.session.current_rule["is_active"] = not current_status
-        await state_manager.update_session(str(interaction.guild_id), {"current_rule": self.session.current_rule})
+        await state_manager.update_session(interaction.guild_id, {"current_rule": self.session.current_rule})
 
         new_view = RuleSettingsView(self.session, self.cog)
         embed = await new_view.create_settings_embed(interaction.guild)
@@ -644,7 +645,7 @@ class ForwardCog(commands.Cog):
         This command is the entry point for editing rules.
         """
         try:
-            rules = await self.guild_manager.get_all_rules(str(interaction.guild_id))
+            rules = await self.guild_manager.get_all_rules(interaction.guild_id)
 
             if not rules:
                 await interaction.response.send_message( # Type: Ignore
@@ -682,15 +683,15 @@ class ForwardCog(commands.Cog):
                 )
                 return
 
-            session = await state_manager.create_session(str(interaction.guild_id), interaction.user.id)
+            session = await state_manager.create_session(interaction.guild_id, interaction.user.id)
             
             # Pre-fill existing settings
-            guild_settings = await self.guild_manager.get_guild_settings(str(interaction.guild_id))
+            guild_settings = await self.guild_manager.get_guild_settings(interaction.guild_id)
             if guild_settings:
                 log_channel_id = guild_settings.get("master_log_channel_id")
                 if log_channel_id:
                     session.master_log_channel = log_channel_id
-                    await state_manager.update_session(str(interaction.guild_id), {"master_log_channel_id": log_channel_id})
+                    await state_manager.update_session(interaction.guild_id, {"master_log_channel_id": log_channel_id})
 
             await self.show_welcome_step(interaction, session)
 
@@ -774,6 +775,12 @@ class ForwardCog(commands.Cog):
             else:
                 await interaction.followup.send("❌ Failed to save the rule to the database. Please try again.",
                                                 ephemeral=True)
+        except RuleLimitExceededError as e:
+            await interaction.followup.send(
+                f"❌ This server already has the maximum of {e.max_rules} forwarding rules. "
+                "Delete a rule or upgrade to premium to add more.",
+                ephemeral=True
+            )
         except Exception as e:
             self.logger.error(f"Error creating rule directly: {e}", exc_info=True)
             await interaction.followup.send("❌ An unexpected error occurred. Please try again.", ephemeral=True)
@@ -834,8 +841,7 @@ class ForwardCog(commands.Cog):
 
         try:
             # Get all rules for this guild
-            guild_settings = await guild_manager.get_guild_settings(str(interaction.guild.id))
-            rules = guild_settings.get("rules", [])
+            rules = await guild_manager.list_rules(interaction.guild.id)
 
             if not rules:
                 await interaction.followup.send(
@@ -883,9 +889,8 @@ class ForwardCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
 
         try:
-            # Get guild settings and rules
-            guild_settings = await guild_manager.get_guild_settings(str(interaction.guild.id))
-            rules = guild_settings.get("rules", [])
+            # Get the guild's rules (secondary-eligible, but consistent with recent edits)
+            rules = await guild_manager.list_rules(interaction.guild.id)
 
             if not rules:
                 await interaction.followup.send(
@@ -933,6 +938,76 @@ class ForwardCog(commands.Cog):
                 ephemeral=True
             )
 
+    @forward.command(name="stats", description="Show forwarding statistics for this server")
+    @app_commands.describe(
+        days="How many days to include (1-30, default 7).",
+        rule_id="Only include a single rule."
+    )
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def stats(self, interaction: discord.Interaction,
+                    days: app_commands.Range[int, 1, 30] = 7,
+                    rule_id: str = None):
+        """Slash command to show per-rule and per-destination forwarding counts and failure rates."""
+        await interaction.response.defer(ephemeral=True)
+
+        try:
+            guild_id = str(interaction.guild.id)
+            stats = await guild_manager.get_forwarding_stats(guild_id, days=days, rule_id=rule_id)
+
+            if not stats["total"]:
+                await interaction.followup.send(
+                    f"📊 No messages were forwarded in the last {days} day(s).",
+                    ephemeral=True
+                )
+                return
+
+            rule_names = {rule.get("rule_id"): rule.get("rule_name") for rule in await guild_manager.list_rules(guild_id)}
+
+            embed = discord.Embed(
+                title="📊 Forwarding Statistics",
+                description=(f"Last {days} day(s): **{stats['total']}** forwarded, "
+                             f"**{stats['failed']}** failed ({stats['failure_rate']:.1%})"),
+                color=discord.Color.blue(),
+                timestamp=discord.utils.utcnow()
+            )
+
+            rule_lines = [
+                f"`{rule_names.get(row['rule_id']) or row['rule_id']}` — {row['total']} "
+                f"({row['failure_rate']:.1%} failed)"
+                for row in stats["by_rule"][:5]
+            ]
+            embed.add_field(name="Top Rules", value="\n".join(rule_lines) or "—", inline=False)
+
+            destination_lines = [
+                f"<#{row['destination_channel_id']}> — {row['total']} ({row['failure_rate']:.1%} failed)"
+                for row in stats["by_destination"][:5]
+            ]
+            embed.add_field(name="Top Destinations", value="\n".join(destination_lines) or "—", inline=False)
+
+            # Hourly counts for the most recent 24 hours that saw traffic, summed across rules
+            hourly = {}
+            for row in stats["hourly"]:
+                hourly[row["hour"]] = hourly.get(row["hour"], 0) + row["total"]
+            recent = sorted(hourly.items())[-24:]
+            peak = max(count for _, count in recent)
+            bars = "▁▂▃▄▅▆▇█"
+            sparkline = "".join(bars[min(len(bars) - 1, count * len(bars) // (peak + 1))] for _, count in recent)
+            embed.add_field(
+                name="Hourly Activity",
+                value=f"`{sparkline}`\n{recent[0][0]} → {recent[-1][0]} (peak {peak}/hour)",
+                inline=False
+            )
+
+            embed.set_footer(text="Statistics are refreshed at most once a minute")
+            await interaction.followup.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            logger.error(f"Error showing forwarding stats in guild {interaction.guild.id}: {e}", exc_info=True)
+            await interaction.followup.send(
+                "❌ An error occurred while retrieving forwarding statistics. Please try again later.",
+                ephemeral=True
+            )
+
     async def cog_unload(self):
         """
         Called when the cog is unloaded.
@@ -988,7 +1063,7 @@ class ForwardCog(commands.Cog):
             else:
                 raise e
 
-        await state_manager.update_session(str(interaction.guild_id), {
+        await state_manager.update_session(interaction.guild_id, {
             "step": "welcome",
             "setup_message_id": None,  # Will be set if we can get message ID
             "setup_channel_id": interaction.channel_id
@@ -1039,7 +1114,7 @@ class ForwardCog(commands.Cog):
             else:
                 raise e
 
-        await state_manager.update_session(str(interaction.guild_id), {
+        await state_manager.update_session(interaction.guild_id, {
             "step": "permissions"
         })
 
@@ -1213,7 +1288,7 @@ class ForwardCog(commands.Cog):
             else:
                 raise e
 
-        await state_manager.update_session(str(interaction.guild_id), {
+        await state_manager.update_session(interaction.guild_id, {
             "step": "log_channel"
         })
 
@@ -1231,7 +1306,7 @@ class ForwardCog(commands.Cog):
                 # If already acknowledged, we can't defer, so just proceed
                 self.logger.debug("Interaction already acknowledged, proceeding without defer")
 
-            session = await state_manager.get_session(str(interaction.guild_id))
+            session = await state_manager.get_session(interaction.guild_id)
             if not session:
                 await interaction.followup.send("Session expired. Please run `/setup` again.", ephemeral=True)
                 return
@@ -1251,10 +1326,10 @@ class ForwardCog(commands.Cog):
 
             # Update session
             session.master_log_channel = channel_id
-            await state_manager.update_session(str(interaction.guild_id), {"master_log_channel_id": channel_id})
+            await state_manager.update_session(interaction.guild_id, {"master_log_channel_id": channel_id})
 
             # Persist to database
-            await self.guild_manager.update_guild_settings(str(interaction.guild_id),
+            await self.guild_manager.update_guild_settings(interaction.guild_id,
                                                            {"master_log_channel_id": channel_id})
 
             # Send confirmation message
@@ -1275,7 +1350,7 @@ class ForwardCog(commands.Cog):
         try:
             await interaction.response.defer(ephemeral=True) # Type: Ignore
 
-            session = await state_manager.get_session(str(interaction.guild_id))
+            session = await state_manager.get_session(interaction.guild_id)
             if not session:
                 await interaction.followup.send("Session expired. Please run `/setup` again.", ephemeral=True)
                 return
@@ -1358,7 +1433,7 @@ class ForwardCog(commands.Cog):
             else:
                 raise e
 
-        await state_manager.update_session(str(interaction.guild_id), {
+        await state_manager.update_session(interaction.guild_id, {
             "step": "first_rule"
         })
 
@@ -1420,7 +1495,7 @@ class ForwardCog(commands.Cog):
                 session.current_rule["rule_name"] = name
                 session.current_rule["step"] = "rule_preview"
 
-                await state_manager.update_session(str(modal_interaction.guild_id), {
+                await state_manager.update_session(modal_interaction.guild_id, {
                     "current_rule": session.current_rule
                 })
                 self.logger.debug(f"Session updated with rule name: {name}")
@@ -1464,7 +1539,7 @@ class ForwardCog(commands.Cog):
             if not interaction.response.is_done(): # Type: Ignore
                 await interaction.response.defer(ephemeral=True) # Type: Ignore
 
-            session = await state_manager.get_session(str(interaction.guild_id))
+            session = await state_manager.get_session(interaction.guild_id)
             if not session:
                 await interaction.followup.send("Session expired. Please run `/setup` again.", ephemeral=True)
                 return
@@ -1493,7 +1568,7 @@ class ForwardCog(commands.Cog):
             return
 
         try:
-            session = await state_manager.get_session(str(interaction.guild_id))
+            session = await state_manager.get_session(interaction.guild_id)
             if not session:
                 self.logger.warning(f"No session found for guild {interaction.guild_id}")
                 # If no session, we can't defer, so send ephemeral message directly
@@ -1583,9 +1658,9 @@ class ForwardCog(commands.Cog):
                 await self.show_rule_edit_step(interaction, session)
             elif custom_id == "rule_start_over":
                 self.logger.info(f"Restarting rule creation for guild {interaction.guild_id}")
-                await state_manager.cleanup_session(str(interaction.guild_id))
+                await state_manager.cleanup_session(interaction.guild_id)
                 session.current_rule = None
-                await state_manager.update_session(str(interaction.guild_id), {"current_rule": None})
+                await state_manager.update_session(interaction.guild_id, {"current_rule": None})
                 await self.rule_creation_flow.start_rule_creation(interaction)
 
             # --- Navigation (Back/Cancel) ---
@@ -1638,7 +1713,7 @@ class ForwardCog(commands.Cog):
             if not interaction.response.is_done(): # Type: Ignore
                 await interaction.response.defer(ephemeral=True) # Type: Ignore
 
-            session = await state_manager.get_session(str(interaction.guild_id))
+            session = await state_manager.get_session(interaction.guild_id)
             if not session:
                 await interaction.followup.send("Setup session expired. Please run `/setup` again.", ephemeral=True)
                 return
@@ -1691,7 +1766,7 @@ class ForwardCog(commands.Cog):
         rule_id = updated_rule["rule_id"]
 
         # Fetch all rules and find the original one for logging
-        all_rules = await self.guild_manager.get_all_rules(str(interaction.guild_id))
+        all_rules = await self.guild_manager.get_all_rules(interaction.guild_id)
         original_rule = None
         if all_rules:
             for r in all_rules:
@@ -1713,8 +1788,14 @@ class ForwardCog(commands.Cog):
         else:
             self.logger.warning(f"Could not find original rule {rule_id} in DB for diff logging.")
 
-        # The entire rule dictionary is passed as the update payload.
-        success = await self.guild_manager.update_rule(rule_id, updated_rule)
+        # The entire rule dictionary is passed as the update payload. The version the user
+        # started editing from makes the save a compare-and-swap against concurrent edits.
+        try:
+            success = await self.guild_manager.update_rule(
+                rule_id, updated_rule, expected_version=updated_rule.get("version", 0))
+        except ConcurrentModificationError:
+            self.logger.warning(f"Rule {rule_id} was changed by someone else during editing.")
+            return False, "This rule was changed by someone else while you were editing it. Please reopen it and try again."
 
         if success:
             self.logger.info(f"Successfully updated rule {rule_id} in database.")
@@ -1737,7 +1818,7 @@ class ForwardCog(commands.Cog):
             description=description,
             color=discord.Color.green()
         )
-        await state_manager.cleanup_session(str(interaction.guild_id))
+        await state_manager.cleanup_session(interaction.guild_id)
 
         try:
             await interaction.edit_original_response(embed=embed, view=None)
@@ -1769,7 +1850,7 @@ class ForwardCog(commands.Cog):
         This method is called when the user clicks a cancel button in the setup
         wizard.
         """
-        await state_manager.cleanup_session(str(interaction.guild_id))
+        await state_manager.cleanup_session(interaction.guild_id)
 
         embed = discord.Embed(
             title="❌ Setup Cancelled",
@@ -1794,6 +1875,13 @@ class ForwardCog(commands.Cog):
         This acts as the main entry point for component interactions within this cog,
         delegating them to the appropriate handlers based on their `custom_id`.
         """
+        # Logs of this interaction carry its correlation id
+        with trace_context("interaction", f"i{interaction.id}", guild_id=interaction.guild_id,
+                           custom_id=(interaction.data or {}).get('custom_id')):
+            await self._dispatch_interaction(interaction)
+
+    async def _dispatch_interaction(self, interaction: discord.Interaction):
+        """Routes a component interaction to its handler by `custom_id`."""
         if interaction.type == discord.InteractionType.component:
             custom_id = interaction.data.get('custom_id', '')
 
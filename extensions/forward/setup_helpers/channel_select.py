@@ -28,7 +28,7 @@ class ChannelSelector:
         Returns:
             discord.ui.View with channel selection
         """
-        self.logger.debug(f"Creating channel select menu for guild {guild.id}, type: {channel_type}")
+        self.logger.debug("Creating channel select menu for guild %s, type: %s", guild.id, channel_type)
         view = discord.ui.View(timeout=1800)
 
         # Get appropriate channels based on type
@@ -44,7 +44,7 @@ class ChannelSelector:
                 custom_id=custom_id
             )
         else:
-            self.logger.info(f"Found {len(channels)} channels for guild {guild.id}")
+            self.logger.info("Found %s channels for guild %s", len(channels), guild.id)
             # Create select options from channels
             options = []
             for channel in channels[:25]:  # Discord limit of 25 options
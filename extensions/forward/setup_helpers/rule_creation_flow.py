@@ -315,7 +315,7 @@ class RuleCreationFlow:
             session.forwarding_rules.append(rule)
             await state_manager.update_session(interaction.guild_id, {"rules": session.forwarding_rules})
 
-            from database import guild_manager
+            from database import guild_manager, RuleLimitExceededError
             rule_data = {
                 "rule_name": rule.get("name"),
                 "source_channel_id": rule.get("source_channel_id"),
@@ -329,7 +329,12 @@ class RuleCreationFlow:
                 }
             }
 
-            save_result = await guild_manager.add_rule(guild_id=interaction.guild_id, **rule_data)
+            try:
+                save_result = await guild_manager.add_rule(guild_id=interaction.guild_id, **rule_data)
+            except RuleLimitExceededError as e:
+                self.logger.info(f"Rule limit reached for guild {interaction.guild_id}: {e}")
+                return False, (f"This server already has the maximum of {e.max_rules} forwarding rules. "
+                               "Delete a rule or upgrade to premium to add more.")
 
             if save_result:
                 self.logger.info(f"✅ Rule '{rule_data['rule_name']}' saved successfully for guild {interaction.guild_id}")
@@ -2,25 +2,39 @@ import asyncio
 from typing import Dict, Optional
 from datetime import datetime, timedelta, timezone
 
-from database import db_core
+from pymongo import UpdateOne
+
+from database import db_core, storage
+from database.bulk import BulkWrite
+from database.snowflake import to_snowflake
+from logger.logger_setup import get_logger
 from ..models.setup_state import SetupState
 
+logger = get_logger(__name__, level=20)
+
 
 class SetupStateManager:
-    """Manages active setup sessions across the bot."""
+    """
+    Manages active setup sessions across the bot.
+    Sessions are persisted to the setup_sessions collection so they survive restarts; with a
+    storage backend other than MongoDB they are kept in memory only.
+    """
 
     def __init__(self):
         self.active_sessions: Dict[int, SetupState] = {}  # guild_id -> SetupState
         self._lock = asyncio.Lock()
+        self.persistent = storage.name == "mongo"
+        self._collection_ready = False
 
     # ... existing code ...
 
     async def ensure_collection_exists(self):
         """
-        Ensure the setup_sessions collection exists.
-        This method is called before any database operation to ensure that the
-        collection exists.
+        Ensure the setup_sessions collection and its indexes exist.
+        Runs once per process; later calls return immediately.
         """
+        if not self.persistent or self._collection_ready:
+            return
         try:
             # Check if collection exists, if not create it
             collection = db_core.get_collection("discord_forwarding_bot", "setup_sessions")
@@ -29,15 +43,17 @@ class SetupStateManager:
             await collection.create_index("guild_id")
             await collection.create_index("expires_at")
 
-            print("✅ Setup sessions collection initialized")
+            self._collection_ready = True
+            logger.info("✅ Setup sessions collection initialized")
         except Exception as e:
-            print(f"❌ Failed to initialize setup_sessions collection: {e}")
+            logger.error(f"❌ Failed to initialize setup_sessions collection: {e}")
 
     async def create_session(self, guild_id: int, user_id: int) -> SetupState:
         """
         Create a new setup session for a guild.
         This method is called when a user starts the setup wizard.
         """
+        guild_id = to_snowflake(guild_id)
         async with self._lock:
             # Check for existing session
             if guild_id in self.active_sessions:
@@ -67,6 +83,7 @@ class SetupStateManager:
         Get an active setup session for a guild.
         This method is called to retrieve the current setup session for a guild.
         """
+        guild_id = to_snowflake(guild_id)
         async with self._lock:
             # Ensure collection exists before accessing
             await self.ensure_collection_exists()
@@ -90,6 +107,7 @@ class SetupStateManager:
         Update a setup session with new data.
         This method is called to update the setup session with new data.
         """
+        guild_id = to_snowflake(guild_id)
         async with self._lock:
             session = self.active_sessions.get(guild_id)
             if not session:
@@ -113,6 +131,7 @@ class SetupStateManager:
         This method is called to clean up a setup session after it has been
         completed or cancelled.
         """
+        guild_id = to_snowflake(guild_id)
         async with self._lock:
             if guild_id in self.active_sessions:
                 # Save final state to database before cleanup
@@ -133,19 +152,28 @@ class SetupStateManager:
         This method is called periodically to clean up expired sessions.
         """
         async with self._lock:
-            expired_guilds = []
-            for guild_id, session in self.active_sessions.items():
-                if session.is_expired():
-                    expired_guilds.append(guild_id)
-
-            for guild_id in expired_guilds:
-                # Save expired session state for potential resume
-                session = self.active_sessions[guild_id]
-                await self._save_session_to_db(session, mark_expired=True)
-                del self.active_sessions[guild_id]
-
-            if expired_guilds:
-                print(f"Cleaned up {len(expired_guilds)} expired setup sessions")
+            expired_guilds = [guild_id for guild_id, session in self.active_sessions.items() if session.is_expired()]
+            expired = [self.active_sessions.pop(guild_id) for guild_id in expired_guilds]
+
+        if not expired:
+            return
+        if not self.persistent:
+            logger.info("Cleaned up %s expired setup sessions", len(expired))
+            return
+
+        # Save expired session state for potential resume, as one bulk write
+        results = await db_core.run_bulk(
+            [BulkWrite("setup_sessions", UpdateOne(_guild_match(session.guild_id),
+                                                   {"$set": self._session_document(session, mark_expired=True)},
+                                                   upsert=True))
+             for session in expired],
+            "cleanup_expired_sessions"
+        )
+        for session, result in zip(expired, results):
+            if not result.ok:
+                logger.error(f"Error saving session to database for guild {session.guild_id}: {result.error}")
+
+        logger.info("Cleaned up %s expired setup sessions", len(expired))
 
     async def get_session_count(self) -> int:
         """Get number of active setup sessions."""
@@ -158,6 +186,8 @@ class SetupStateManager:
         This method is called when the bot starts up to resume any active
         sessions that were interrupted.
         """
+        if not self.persistent:
+            return
         try:
             collection = db_core.get_collection("discord_forwarding_bot", "setup_sessions")
 
@@ -181,15 +211,15 @@ class SetupStateManager:
                         resumed_count += 1
 
                 except Exception as e:
-                    print(f"Failed to resume session for guild {session_data.get('guild_id')}: {e}")
+                    logger.warning(f"Failed to resume session for guild {session_data.get('guild_id')}: {e}")
                     # Clean up corrupted session data
                     await collection.delete_one({"_id": session_data.get("_id")})
 
             if resumed_count > 0:
-                print(f"Resumed {resumed_count} setup sessions from database")
+                logger.info("Resumed %s setup sessions from database", resumed_count)
 
         except Exception as e:
-            print(f"Error resuming sessions from database: {e}")
+            logger.error(f"Error resuming sessions from database: {e}")
 
     # Database persistence methods implementation
     async def _save_session_to_db(self, session: SetupState, mark_expired: bool = False):
@@ -198,42 +228,50 @@ class SetupStateManager:
         This method is called to save the current state of a setup session to
         the database.
         """
+        if not self.persistent:
+            return
         try:
             collection = db_core.get_collection("discord_forwarding_bot", "setup_sessions")
 
-            session_data = self._serialize_session(session)
-
-            if mark_expired:
-                session_data["is_expired"] = True
-                session_data["expired_at"] = datetime.now(timezone.utc)
-
-            # Update existing or insert new
+            # Update existing or insert new; a legacy string-keyed document is rewritten with the int id
             await collection.update_one(
-                {"guild_id": session.guild_id},
-                {"$set": session_data},
+                _guild_match(session.guild_id),
+                {"$set": self._session_document(session, mark_expired)},
                 upsert=True
             )
 
         except Exception as e:
-            print(f"Error saving session to database for guild {session.guild_id}: {e}")
+            logger.error(f"Error saving session to database for guild {session.guild_id}: {e}")
+
+    def _session_document(self, session: SetupState, mark_expired: bool = False) -> Dict:
+        """Stored state of a session, optionally marked as expired."""
+        session_data = self._serialize_session(session)
+
+        if mark_expired:
+            session_data["is_expired"] = True
+            session_data["expired_at"] = datetime.now(timezone.utc)
+
+        return session_data
 
     async def _load_session_from_db(self, guild_id: int) -> Optional[SetupState]:
         """
         Load session from database.
         This method is called to load a setup session from the database.
         """
+        if not self.persistent:
+            return None
         try:
             collection = db_core.get_collection("discord_forwarding_bot", "setup_sessions")
 
             # Find active session for this guild
             session_data = await collection.find_one({
-                "guild_id": str(guild_id),
+                **_guild_match(guild_id),
                 "expires_at": {"$gt": datetime.utcnow()}
             })
 
             if session_data:
                 # Convert back to SetupState object
-                return SetupState.from_dict(session_data)
+                return self._deserialize_session(session_data)
 
             return None
 
@@ -243,7 +281,7 @@ class SetupStateManager:
                 await self.ensure_collection_exists()
                 return None
             else:
-                print(f"Error loading session from database: {e}")
+                logger.error(f"Error loading session from database: {e}")
                 return None
 
     async def _remove_session_from_db(self, guild_id: int):
@@ -252,12 +290,14 @@ class SetupStateManager:
         This method is called to remove a setup session from the database after
         it has been completed or cancelled.
         """
+        if not self.persistent:
+            return
         try:
             collection = db_core.get_collection("discord_forwarding_bot", "setup_sessions")
-            await collection.delete_one({"guild_id": guild_id})
+            await collection.delete_many(_guild_match(guild_id))
 
         except Exception as e:
-            print(f"Error removing session from database for guild {guild_id}: {e}")
+            logger.error(f"Error removing session from database for guild {guild_id}: {e}")
 
     def _serialize_session(self, session: SetupState) -> Dict:
         """
@@ -271,7 +311,7 @@ class SetupStateManager:
             session_data["is_expired"] = False
             return session_data
         except Exception as e:
-            print(f"Error serializing session: {e}")
+            logger.error(f"Error serializing session: {e}")
             return {}
 
     def _deserialize_session(self, session_data: Dict) -> Optional[SetupState]:
@@ -281,9 +321,12 @@ class SetupStateManager:
         loaded from the database.
         """
         try:
-            return SetupState.from_dict(session_data)
+            session = SetupState.from_dict(session_data)
+            # Legacy documents store the guild id as a string; sessions are keyed by int
+            session.guild_id = to_snowflake(session.guild_id)
+            return session
         except Exception as e:
-            print(f"Error deserializing session data: {e}")
+            logger.error(f"Error deserializing session data: {e}")
             return None
 
     async def cleanup_old_sessions(self, days_old: int = 7):
@@ -292,6 +335,8 @@ class SetupStateManager:
         This method is called periodically to clean up old expired sessions
         from the database.
         """
+        if not self.persistent:
+            return
         try:
             collection = db_core.get_collection("discord_forwarding_bot", "setup_sessions")
 
@@ -305,10 +350,10 @@ class SetupStateManager:
             })
 
             if result.deleted_count > 0:
-                print(f"Cleaned up {result.deleted_count} old setup sessions from database")
+                logger.info("Cleaned up %s old setup sessions from database", result.deleted_count)
 
         except Exception as e:
-            print(f"Error cleaning up old sessions: {e}")
+            logger.error(f"Error cleaning up old sessions: {e}")
 
     async def get_database_session_count(self) -> int:
         """
@@ -316,13 +361,20 @@ class SetupStateManager:
         This method is used to get the number of active setup sessions stored
         in the database.
         """
+        if not self.persistent:
+            return 0
         try:
             collection = db_core.get_collection("discord_forwarding_bot", "setup_sessions")
             return await collection.count_documents({"is_expired": {"$ne": True}})
         except Exception as e:
-            print(f"Error getting database session count: {e}")
+            logger.error(f"Error getting database session count: {e}")
             return 0
 
 
+def _guild_match(guild_id: int) -> Dict:
+    """Filter for a guild's session; sessions saved before ids were normalized store the id as a string."""
+    return {"guild_id": {"$in": [guild_id, str(guild_id)]}}
+
+
 # Global state manager instance
 state_manager = SetupStateManager()
\ No newline at end of file
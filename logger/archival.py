@@ -0,0 +1,306 @@
+"""
+Log archival.
+
+Rotating file handlers created by get_logger hand their rotated files to LogArchiver. The
+archiver renames each one to a timestamped archive name, which is fast and happens on the
+logging thread. It then compresses the file on its own worker thread (gzip, or zstd when
+the `zstandard` package is installed), so a rollover never waits on compression.
+
+Retention runs after every archive and on a schedule:
+  - each log keeps at most its handler's backup_count archives
+  - files older than max_age_days are removed
+  - a global disk budget covers every managed log directory, evicting the oldest files first
+
+Files a handler is currently writing to are never removed.
+
+Environment:
+    LOG_COMPRESSION       gzip (default), zstd or none
+    LOG_DISK_BUDGET_MB    total size of all log files and archives, 0 for no limit (default 500)
+    LOG_MAX_AGE_DAYS      age after which rotated files are deleted, 0 to keep (default 30)
+"""
+import atexit
+import gzip
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import BaseRotatingHandler
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+try:
+    import zstandard
+except ImportError:  # Optional: zstd compression falls back to gzip
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+
+
+class LogArchiver:
+    """
+    Compresses rotated log files in the background and keeps log directories within a
+    size and age budget.
+    """
+
+    def __init__(self, compression: str = "gzip", disk_budget_mb: float = 500.0, max_age_days: float = 30.0):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown log compression '{compression}'")
+        if compression == "zstd" and zstandard is None:
+            print("⚠️ LOG_COMPRESSION=zstd but the zstandard package is not installed; using gzip", file=sys.stderr)
+            compression = "gzip"
+
+        self.compression = compression
+        self.disk_budget_bytes = int(disk_budget_mb * 1024 * 1024)
+        self.max_age_days = max_age_days
+
+        self.log_dirs: Set[str] = set()
+        self.backup_counts: Dict[str, int] = {}  # active log file -> archives to keep
+        self.metrics = {"rotations": 0, "compressed": 0, "compressed_bytes_saved": 0,
+                        "evicted": 0, "evicted_bytes": 0, "errors": 0}
+
+        self._jobs: "queue.Queue[str]" = queue.Queue()
+        self._pending: Set[str] = set()  # renamed but not yet compressed
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+        self._budget_warned = False
+
+        self._cleanup_thread: Optional[threading.Thread] = None
+        self._cleanup_stop = threading.Event()
+
+    # -- Rotation -------------------------------------------------------------
+
+    def attach(self, handler: BaseRotatingHandler, backup_count: int):
+        """Route a rotating file handler's rollovers through the archiver."""
+        path = os.path.abspath(handler.baseFilename)
+        with self._lock:
+            self.backup_counts[path] = backup_count
+            self.log_dirs.add(os.path.dirname(path))
+        handler.rotator = self.rotate
+
+    def rotate(self, source: str, dest: str):
+        """
+        Rotator for the handler: move the full log aside under a unique name and queue it
+        for compression. `dest` (the handler's .1 / dated name) is not used; archives are
+        named by rotation time instead, so they never need renumbering.
+        """
+        if not os.path.exists(source):
+            return
+        archive = f"{source}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        os.rename(source, archive)
+        self.metrics["rotations"] += 1
+        with self._lock:
+            self._pending.add(archive)
+        self._submit(archive)
+
+    def _submit(self, archive: str):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run_worker, name="log-archiver", daemon=True)
+            self._worker.start()
+        self._jobs.put(archive)
+
+    def _run_worker(self):
+        while True:
+            archive = self._jobs.get()
+            try:
+                self._compress(archive)
+                self.enforce_retention()
+            except Exception as e:
+                self.metrics["errors"] += 1
+                print(f"❌ Log archival failed for {archive}: {e}", file=sys.stderr)
+            finally:
+                with self._lock:
+                    self._pending.discard(archive)
+                self._jobs.task_done()
+
+    def _compress(self, path: str):
+        """Compress `path` next to itself and remove the original."""
+        if self.compression == "none" or not os.path.exists(path):
+            return
+
+        target = path + COMPRESSION_SUFFIXES[self.compression]
+        partial = target + ".tmp"  # Never seen by retention until complete
+        original_size = os.path.getsize(path)
+        with open(path, "rb") as source:
+            if self.compression == "zstd":
+                with open(partial, "wb") as raw, zstandard.ZstdCompressor(level=3).stream_writer(raw) as out:
+                    shutil.copyfileobj(source, out, 1024 * 1024)
+            else:
+                with gzip.open(partial, "wb", compresslevel=6) as out:
+                    shutil.copyfileobj(source, out, 1024 * 1024)
+
+        os.replace(partial, target)
+        shutil.copystat(path, target)  # Keep the rotation time as the archive's mtime
+        os.remove(path)
+        self.metrics["compressed"] += 1
+        self.metrics["compressed_bytes_saved"] += original_size - os.path.getsize(target)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait for queued compressions; returns False if they did not finish in time."""
+        deadline = time.monotonic() + timeout
+        while self._jobs.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    # -- Retention ------------------------------------------------------------
+
+    def _scan(self, log_dir: str) -> List[Tuple[str, int, float]]:
+        """(path, size, mtime) of every log file and archive in `log_dir`, skipping partial writes."""
+        files = []
+        try:
+            entries = list(os.scandir(log_dir))
+        except FileNotFoundError:
+            return files
+        for entry in entries:
+            if not entry.is_file() or entry.name.endswith(".tmp"):
+                continue
+            path = os.path.abspath(entry.path)
+            if ".log" not in entry.name and not any(path == log_path or path.startswith(log_path + ".")
+                                                    for log_path in self.backup_counts):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # Removed between listing and stat
+            files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _remove(self, path: str, size: int) -> bool:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            self.metrics["errors"] += 1
+            print(f"❌ Failed to remove log file {path}: {e}", file=sys.stderr)
+            return False
+        self.metrics["evicted"] += 1
+        self.metrics["evicted_bytes"] += size
+        return True
+
+    def enforce_retention(self) -> List[str]:
+        """Apply the per-log archive count, the age limit and the disk budget. Returns removed paths."""
+        removed = []
+        with self._lock:
+            files = [file for log_dir in self.log_dirs for file in self._scan(log_dir)]
+            active = set(self.backup_counts)
+            removable = [file for file in files if file[0] not in active and file[0] not in self._pending]
+
+            # Per-log archive count, newest kept
+            for log_path, backup_count in self.backup_counts.items():
+                archives = sorted((file for file in removable if file[0].startswith(log_path + ".")),
+                                  key=lambda file: file[2], reverse=True)
+                for path, size, _ in archives[backup_count:]:
+                    if self._remove(path, size):
+                        removed.append(path)
+
+            # Age limit
+            if self.max_age_days > 0:
+                cutoff = time.time() - self.max_age_days * 24 * 60 * 60
+                for path, size, mtime in removable:
+                    if mtime < cutoff and path not in removed and self._remove(path, size):
+                        removed.append(path)
+
+            # Disk budget across every managed directory, oldest first
+            if self.disk_budget_bytes > 0:
+                remaining = [file for file in files if file[0] not in removed]
+                total = sum(size for _, size, _ in remaining)
+                for path, size, _ in sorted((file for file in removable if file[0] not in removed),
+                                            key=lambda file: file[2]):
+                    if total <= self.disk_budget_bytes:
+                        break
+                    if self._remove(path, size):
+                        removed.append(path)
+                        total -= size
+
+                if total > self.disk_budget_bytes and not self._budget_warned:
+                    self._budget_warned = True
+                    print(f"⚠️ Active log files alone use {total / 1024 / 1024:.1f} MB, "
+                          f"over the {self.disk_budget_bytes / 1024 / 1024:.0f} MB log budget", file=sys.stderr)
+        return removed
+
+    def cleanup(self, log_dir: Optional[str] = None, days_to_keep: Optional[float] = None) -> List[str]:
+        """
+        Remove rotated files and stale logs older than `days_to_keep` from one directory (or
+        every managed one). Active log files are skipped.
+        """
+        days = self.max_age_days if days_to_keep is None else days_to_keep
+        if days <= 0:
+            return []
+        cutoff = time.time() - days * 24 * 60 * 60
+        dirs = [os.path.abspath(log_dir)] if log_dir else list(self.log_dirs)
+
+        removed = []
+        with self._lock:
+            for directory in dirs:
+                for path, size, mtime in self._scan(directory):
+                    if (mtime < cutoff and path not in self.backup_counts and path not in self._pending
+                            and self._remove(path, size)):
+                        removed.append(path)
+        return removed
+
+    def run_maintenance(self) -> List[str]:
+        """Compress rotated files left uncompressed (e.g. by a crash) and enforce retention."""
+        suffixes = tuple(suffix for suffix in COMPRESSION_SUFFIXES.values() if suffix)
+        if self.compression != "none":
+            with self._lock:
+                leftovers = [path for log_dir in self.log_dirs for path, _, _ in self._scan(log_dir)
+                             if path not in self.backup_counts and path not in self._pending
+                             and not path.endswith(suffixes)
+                             and any(path.startswith(log_path + ".") for log_path in self.backup_counts)]
+                self._pending.update(leftovers)
+            for path in leftovers:
+                self._submit(path)
+        return self.enforce_retention()
+
+    def start_scheduled_cleanup(self, interval: float = 3600.0):
+        """Run maintenance now and then every `interval` seconds, from a daemon thread."""
+        if self._cleanup_thread and self._cleanup_thread.is_alive():
+            return
+
+        self._cleanup_stop.clear()
+
+        def run():
+            while True:
+                try:
+                    self.run_maintenance()
+                except Exception as e:  # Never let maintenance kill the thread
+                    self.metrics["errors"] += 1
+                    print(f"❌ Log maintenance failed: {e}", file=sys.stderr)
+                if self._cleanup_stop.wait(interval):
+                    return
+
+        self._cleanup_thread = threading.Thread(target=run, name="log-cleanup", daemon=True)
+        self._cleanup_thread.start()
+
+    def stop_scheduled_cleanup(self):
+        """Stop the scheduled maintenance thread."""
+        self._cleanup_stop.set()
+        self._cleanup_thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Archival counters plus the current size of the managed log directories."""
+        with self._lock:
+            files = [file for log_dir in self.log_dirs for file in self._scan(log_dir)]
+            pending = len(self._pending)
+        return {
+            **self.metrics,
+            "compression": self.compression,
+            "pending": pending,
+            "files": len(files),
+            "disk_bytes": sum(size for _, size, _ in files),
+            "disk_budget_bytes": self.disk_budget_bytes,
+        }
+
+
+# Process-wide archiver used by get_logger
+log_archiver = LogArchiver(
+    compression=os.getenv("LOG_COMPRESSION", "gzip").lower(),
+    disk_budget_mb=float(os.getenv("LOG_DISK_BUDGET_MB", "500")),
+    max_age_days=float(os.getenv("LOG_MAX_AGE_DAYS", "30")),
+)
+# Finish compressing whatever was rotated before the process exits
+atexit.register(log_archiver.flush)
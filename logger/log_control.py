@@ -0,0 +1,226 @@
+"""
+Runtime log level control.
+
+Levels of managed loggers can be changed while the bot runs, per logger name or prefix,
+and revert on their own after a timeout. High-volume loggers can be sampled so only 1 in N
+records at or below a level gets through. Nothing is attached to a logger unless an
+override is active, so the feature costs nothing when unused.
+
+Two front ends share LogLevelController.execute():
+  - the owner-only `loglevel` bot command (bot.py)
+  - an optional local admin socket: set LOG_CONTROL_SOCKET to a filesystem path, then e.g.
+        echo "set Forward debug 5 sample 10" | nc -U /run/stygian/log.sock
+
+Commands:
+    set <target> <level> [minutes] [sample N]   minutes defaults to 5; 0 keeps it until reset
+    reset [target]                              revert one target, or everything
+    status                                      active overrides and current levels
+A target is an exact logger name, a dotted prefix ("database" also matches "database.core")
+or a pattern with * wildcards.
+"""
+import asyncio
+import fnmatch
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from .logger_setup import LoggerManager, get_logger
+
+logger = get_logger("LogControl", level=logging.INFO, json_format=False, colored_console=True)
+
+DEFAULT_OVERRIDE_MINUTES = 5.0
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through 1 in `every` records at or below `max_level`; higher levels always pass."""
+
+    def __init__(self, every: int, max_level: int = logging.DEBUG):
+        super().__init__()
+        self.every = every
+        self.max_level = max_level
+        self._counter = itertools.count()  # next() is atomic, so no lock is needed
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > self.max_level or next(self._counter) % self.every == 0
+
+
+def parse_level(value: str) -> int:
+    """DEBUG / debug / 10 -> 10."""
+    if value.isdigit():
+        return int(value)
+    level = logging.getLevelName(value.upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level '{value}'")
+    return level
+
+
+class LogLevelController:
+    """Temporary per-logger level overrides with automatic revert."""
+
+    def __init__(self, manager: Optional[LoggerManager] = None):
+        self.manager = manager or LoggerManager()
+        # logger name -> {"original_level", "level", "expires_at", "timer", "filter"}
+        self.overrides: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def match(self, target: str) -> List[str]:
+        """Names of the managed loggers a target refers to."""
+        names = self.manager.get_all_loggers()
+        if any(char in target for char in "*?["):
+            return sorted(name for name in names if fnmatch.fnmatchcase(name, target))
+        return sorted(name for name in names if name == target or name.startswith(target + "."))
+
+    def set_level(self, target: str, level: int, minutes: Optional[float] = DEFAULT_OVERRIDE_MINUTES,
+                  sample_every: int = 1) -> List[str]:
+        """
+        Set the level of every logger matching `target`, reverting after `minutes`
+        (None or 0: until reset). With `sample_every` > 1 only 1 in N records at or below
+        `level` are kept. Returns the names of the loggers changed.
+        """
+        names = self.match(target)
+        if not names:
+            raise ValueError(f"No managed logger matches '{target}'")
+
+        expires_at = time.time() + minutes * 60 if minutes else None
+        loggers = self.manager.get_all_loggers()
+        with self._lock:
+            for name in names:
+                target_logger = loggers[name]
+                previous = self.overrides.pop(name, None)
+                original_level = previous["original_level"] if previous else target_logger.level
+                if previous:
+                    self._detach(target_logger, previous)
+
+                override = {"original_level": original_level, "level": level,
+                            "expires_at": expires_at, "timer": None, "filter": None}
+                if sample_every > 1:
+                    override["filter"] = SamplingFilter(sample_every, max_level=level)
+                    target_logger.addFilter(override["filter"])
+                if expires_at:
+                    timer = threading.Timer(minutes * 60, self.reset, args=(name,))
+                    timer.daemon = True
+                    timer.start()
+                    override["timer"] = timer
+
+                target_logger.setLevel(level)
+                self.overrides[name] = override
+
+        logger.warning(f"🎚️ Log level of {', '.join(names)} set to {logging.getLevelName(level)}"
+                       + (f" for {minutes:g} minute(s)" if expires_at else " until reset")
+                       + (f", sampling 1 in {sample_every}" if sample_every > 1 else ""))
+        return names
+
+    def reset(self, target: Optional[str] = None) -> List[str]:
+        """Revert the overrides of `target` (a logger name or prefix), or all of them."""
+        with self._lock:
+            names = [name for name in self.overrides
+                     if target is None or name == target or name in self.match(target)]
+            loggers = self.manager.get_all_loggers()
+            for name in names:
+                override = self.overrides.pop(name)
+                target_logger = loggers.get(name)
+                if target_logger is not None:
+                    self._detach(target_logger, override)
+                    target_logger.setLevel(override["original_level"])
+
+        if names:
+            logger.warning(f"🎚️ Log level of {', '.join(names)} reverted")
+        return names
+
+    def _detach(self, target_logger: logging.Logger, override: Dict[str, Any]):
+        if override["timer"] is not None:
+            override["timer"].cancel()
+        if override["filter"] is not None:
+            target_logger.removeFilter(override["filter"])
+
+    def status(self) -> Dict[str, Any]:
+        """Active overrides and the effective level of every managed logger."""
+        now = time.time()
+        with self._lock:
+            overrides = {
+                name: {
+                    "level": logging.getLevelName(override["level"]),
+                    "original_level": logging.getLevelName(override["original_level"]),
+                    "remaining_seconds": round(override["expires_at"] - now) if override["expires_at"] else None,
+                    "sample_every": override["filter"].every if override["filter"] else 1,
+                }
+                for name, override in self.overrides.items()
+            }
+        levels = {name: logging.getLevelName(target_logger.getEffectiveLevel())
+                  for name, target_logger in sorted(self.manager.get_all_loggers().items())}
+        return {"overrides": overrides, "levels": levels}
+
+    def execute(self, args: List[str]) -> str:
+        """Run a control command (see the module docstring) and return a printable reply."""
+        if not args or args[0] == "status":
+            status = self.status()
+            lines = [f"{name}: {override['level']} (was {override['original_level']}, "
+                     + (f"{override['remaining_seconds']}s left" if override["remaining_seconds"] is not None
+                        else "until reset")
+                     + (f", 1 in {override['sample_every']}" if override["sample_every"] > 1 else "") + ")"
+                     for name, override in status["overrides"].items()]
+            lines = lines or ["No active overrides."]
+            lines.append("Levels: " + ", ".join(f"{name}={level}" for name, level in status["levels"].items()))
+            return "\n".join(lines)
+
+        command, rest = args[0].lower(), args[1:]
+        try:
+            if command == "reset":
+                names = self.reset(rest[0] if rest else None)
+                return f"Reverted: {', '.join(names)}" if names else "Nothing to revert."
+
+            if command == "set" and len(rest) >= 2:
+                target, level = rest[0], parse_level(rest[1])
+                minutes, sample_every = DEFAULT_OVERRIDE_MINUTES, 1
+                options = rest[2:]
+                if options and options[0] != "sample":
+                    minutes = float(options.pop(0))
+                if len(options) == 2 and options[0] == "sample":
+                    sample_every = int(options[1])
+                elif options:
+                    raise ValueError(f"Unexpected arguments: {' '.join(options)}")
+
+                names = self.set_level(target, level, minutes, sample_every)
+                return (f"{', '.join(names)} -> {logging.getLevelName(level)}"
+                        + (f" for {minutes:g} minute(s)" if minutes else " until reset")
+                        + (f", sampling 1 in {sample_every}" if sample_every > 1 else ""))
+        except ValueError as e:
+            return f"Error: {e}"
+
+        return "Usage: set <target> <level> [minutes] [sample N] | reset [target] | status"
+
+    async def start_admin_socket(self, path: str):
+        """Serve control commands, one per line, on a unix socket only the bot's user can open."""
+        if self._server is not None:
+            return
+        if os.path.exists(path):
+            os.remove(path)
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            try:
+                while line := await reader.readline():
+                    writer.write((self.execute(line.decode().split()) + "\n").encode())
+                    await writer.drain()
+            except (ConnectionError, UnicodeDecodeError):
+                pass
+            finally:
+                writer.close()
+
+        self._server = await asyncio.start_unix_server(handle, path=path)
+        os.chmod(path, 0o600)
+        logger.info(f"🎚️ Log control socket listening on {path}")
+
+    async def stop_admin_socket(self):
+        """Close the admin socket."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+# Process-wide controller used by the bot command and the admin socket
+log_control = LogLevelController()
@@ -15,6 +15,7 @@ import re
 import certifi
 import ssl
 import smtplib
+import threading
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
@@ -656,9 +657,11 @@ class EnhancedErrorNotifier:
         self.enable_attachments = enable_attachments
         self.severity_threshold = severity_threshold
 
-        # Error storage with rich context
+        # Error storage with rich context. log_error runs on the log hook thread, so the
+        # storage and pattern tracking are guarded by a lock
         self.errors: List[ErrorContext] = []
         self.error_counter = Counter()
+        self._lock = threading.Lock()
 
         # Rate limiting and spam prevention
         self.error_patterns = defaultdict(deque)  # Pattern detection
@@ -734,35 +737,62 @@ class EnhancedErrorNotifier:
             pattern_key = self._generate_pattern_key(error_context)
             current_time = datetime.now()
 
-            # Clean old patterns
-            self._clean_old_patterns(current_time)
+            with self._lock:
+                # Clean old patterns
+                self._clean_old_patterns(current_time)
 
-            # Add to pattern tracking
-            self.error_patterns[pattern_key].append(current_time)
+                # Add to pattern tracking
+                self.error_patterns[pattern_key].append(current_time)
 
-            # Check if this is a repeated pattern
-            recent_count = len([
-                t for t in self.error_patterns[pattern_key]
-                if current_time - t <= self.correlation_window
-            ])
+                # Check if this is a repeated pattern
+                recent_count = len([
+                    t for t in self.error_patterns[pattern_key]
+                    if current_time - t <= self.correlation_window
+                ])
 
-            if recent_count <= self.pattern_threshold:
-                # Add error if not spam
-                self.errors.append(error_context)
-                self.error_counter[f"{category.value}: {error}"] += 1
-                self.stats['total_processed'] += 1
+                accepted = recent_count <= self.pattern_threshold
+                if accepted:
+                    # Add error if not spam
+                    self.errors.append(error_context)
+                    self.error_counter[f"{category.value}: {error}"] += 1
+                    self.stats['total_processed'] += 1
 
+            if accepted:
                 print(f"📝 Logged {severity.value} error: {category.value}")
 
                 # Immediate send for critical errors
                 if severity == Severity.CRITICAL:
-                    asyncio.create_task(self._send_immediate_alert(error_context))
+                    self._schedule_immediate_alert(error_context)
             else:
                 print(f"🚫 Suppressed repeated error pattern (count: {recent_count})")
 
         except Exception as e:
             print(f"❌ Failed to log error: {e}")
 
+    def _schedule_immediate_alert(self, error_context: ErrorContext):
+        """
+        Start an immediate alert on the bot's event loop. log_error is usually called from the
+        log hook thread, where there is no running loop, so the task is handed over thread-safely.
+        """
+        try:
+            asyncio.get_running_loop().create_task(self._send_immediate_alert(error_context))
+            return
+        except RuntimeError:
+            pass  # Not on an event loop thread
+
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(
+                lambda: self.loop.create_task(self._send_immediate_alert(error_context)))
+        else:
+            print("⚠️ No running event loop for the critical error alert; it will go out with the next report")
+
+    def _take_errors(self) -> List[ErrorContext]:
+        """Atomically hand over the pending errors, leaving an empty list for new ones"""
+        with self._lock:
+            errors, self.errors = self.errors, []
+            self.error_counter = Counter()
+        return errors
+
     def _severity_order(self, severity: Severity) -> int:
         """Get numeric order for severity comparison"""
         order = {
@@ -925,17 +955,21 @@ class EnhancedErrorNotifier:
             print(f"❌ Failed to create log attachment: {e}")
             return None
 
-    def _send_email(self, subject: str, body: str, attachment_path: Optional[str] = None):
+    def _send_email(self, subject: str, body: str, attachment_path: Optional[str] = None,
+                    errors: Optional[List[ErrorContext]] = None):
         """Enhanced email sending with HTML support and attachments"""
         try:
             # Create message
             if self.enable_html and '<!DOCTYPE html>' in body:
                 msg = MIMEMultipart('alternative')
+                if errors is None:
+                    with self._lock:
+                        errors = list(self.errors)
 
                 # Create text version from HTML (simplified)
                 text_body = EmailTemplate.create_text_summary(
-                    self.errors[-10:] if self.errors else [],
-                    self._calculate_statistics(self.errors),
+                    errors[-10:],
+                    self._calculate_statistics(errors),
                     self.last_sent,
                     datetime.now()
                 )
@@ -1007,6 +1041,8 @@ class EnhancedErrorNotifier:
 
     async def start_loop(self, bot_instance: commands.Bot):
         """Enhanced background loop with comprehensive error processing"""
+        # The loop critical alerts are scheduled on from other threads
+        self.loop = asyncio.get_running_loop()
         self.task = asyncio.create_task(self._loop(bot_instance))
 
     async def _loop(self, bot_instance: commands.Bot):
@@ -1019,17 +1055,17 @@ class EnhancedErrorNotifier:
                 if not self.errors:
                     continue
 
-                print(f"📨 Processing {len(self.errors)} errors for email notification")
+                # Errors logged from now on go into the next report
+                errors = self._take_errors()
+                print(f"📨 Processing {len(errors)} errors for email notification")
 
                 # Skip if too many consecutive failures
                 if self.consecutive_failures >= self.max_failures:
                     print("⏭️ Skipping email send due to consecutive failures")
-                    self.errors.clear()
-                    self.error_counter.clear()
                     continue
 
                 # Prepare errors for email (limit quantity)
-                errors_to_send = self.errors[:self.max_errors_per_email]
+                errors_to_send = errors[:self.max_errors_per_email]
                 period_start = self.last_sent
                 period_end = datetime.now()
 
@@ -1064,21 +1100,16 @@ class EnhancedErrorNotifier:
 
                 # Create attachment if enabled
                 attachment_path = None
-                if self.enable_attachments and len(self.errors) > 10:
-                    attachment_path = self._create_log_attachment(self.errors)
+                if self.enable_attachments and len(errors) > 10:
+                    attachment_path = self._create_log_attachment(errors)
 
                 # Send email
-                await asyncio.to_thread(self._send_email, subject, body, attachment_path)
+                await asyncio.to_thread(self._send_email, subject, body, attachment_path, errors_to_send)
 
                 # Update tracking
                 self.last_sent = period_end
-                processed_count = len(self.errors)
-
-                # Clear processed errors
-                self.errors.clear()
-                self.error_counter.clear()
 
-                print(f"✅ Sent error report with {processed_count} errors")
+                print(f"✅ Sent error report with {len(errors)} errors")
 
                 # Print statistics
                 uptime = datetime.now() - self.stats['uptime_start']
@@ -1133,9 +1164,7 @@ class EnhancedErrorNotifier:
 
     def clear_errors(self):
         """Manually clear all pending errors"""
-        count = len(self.errors)
-        self.errors.clear()
-        self.error_counter.clear()
+        count = len(self._take_errors())
         print(f"🗑️ Cleared {count} pending errors")
 
     def set_severity_threshold(self, threshold: Severity):
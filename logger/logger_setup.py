@@ -1,14 +1,26 @@
 import asyncio
+import atexit
+import copy
 import os
 import json
 import logging
+import queue
 import threading
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List, Callable
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler, QueueHandler, QueueListener
 from functools import wraps
 from contextlib import contextmanager
 
+from .archival import log_archiver
+from .rate_limit import rate_limiter
+from .timing import TimingRegistry, timing_registry
+from .tracing import install_record_factory, record_span
+
+# Every record carries the correlation id of the message or interaction being handled
+install_record_factory()
+
 class ColoredConsoleFormatter(logging.Formatter):
     """
     Formatter that adds colors to console output based on log levels.
@@ -54,14 +66,55 @@ class IndentedFormatter(logging.Formatter):
         return formatted_message
 
 
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the stdlib json module
+    orjson = None
+
+# Attributes every LogRecord carries; anything else on a record is an `extra` field
+_RESERVED_RECORD_KEYS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message", "asctime", "taskName", "log_route", "correlation_id", "correlation_tag",
+}
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize values json/orjson don't know instead of failing the whole record."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return repr(value)
+
+
 class JSONFormatter(logging.Formatter):
     """
     Formatter that outputs log records as JSON objects.
+    Uses orjson when it is installed; values neither backend can encode are written as
+    their repr(). Timestamps are UTC ISO-8601 with millisecond precision, computed once
+    per millisecond.
     """
 
+    def __init__(self, *args, use_orjson: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.use_orjson = use_orjson and orjson is not None
+        self._timestamp = (-1, "")  # (created in ms, ISO string); one tuple so threads never see a torn pair
+        # json.dumps() builds a new encoder per call whenever options are passed; reuse one
+        self._encode = json.JSONEncoder(default=_json_default, ensure_ascii=False, separators=(",", ":")).encode
+
+    def _iso_timestamp(self, created: float) -> str:
+        created_ms = int(created * 1000)
+        cached_ms, timestamp = self._timestamp
+        if created_ms != cached_ms:
+            timestamp = datetime.fromtimestamp(created_ms / 1000, timezone.utc).isoformat(timespec="milliseconds")
+            timestamp = timestamp[:-6] + "Z"
+            self._timestamp = (created_ms, timestamp)
+        return timestamp
+
     def format(self, record):
         log_entry = {
-            'timestamp': datetime.fromtimestamp(record.created).isoformat() + 'Z',
+            'timestamp': self._iso_timestamp(record.created),
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
@@ -72,19 +125,26 @@ class JSONFormatter(logging.Formatter):
             'thread_name': record.threadName,
         }
 
-        # Add exception info if present
-        if record.exc_info:
-            log_entry['exception'] = self.formatException(record.exc_info)
+        if record.__dict__.get('correlation_id'):
+            log_entry['correlation_id'] = record.correlation_id
+
+        # Add exception info if present (records from the async queue carry only exc_text)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_entry['exception'] = record.exc_text
 
         # Add extra fields
-        for key, value in record.__dict__.items():
-            if key not in ['name', 'msg', 'args', 'levelname', 'levelno', 'pathname', 'filename',
-                           'module', 'exc_info', 'exc_text', 'stack_info', 'lineno', 'funcName',
-                           'created', 'msecs', 'relativeCreated', 'thread', 'threadName',
-                           'processName', 'process', 'message']:
-                log_entry[key] = value
+        for key in record.__dict__.keys() - _RESERVED_RECORD_KEYS:
+            if key[0] != "_":
+                log_entry[key] = record.__dict__[key]
 
-        return json.dumps(log_entry)
+        if self.use_orjson:
+            try:
+                return orjson.dumps(log_entry, default=_json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+            except TypeError:
+                pass  # e.g. integers beyond 64 bits; the stdlib encoder handles those
+        return self._encode(log_entry)
 
 
 class LogFilter:
@@ -114,23 +174,29 @@ class LogFilter:
 
 class PerformanceLogger:
     """
-    Context manager and decorator for measuring execution time.
+    Context manager measuring execution time into the timing registry.
+    Only samples above the registry's slow threshold are logged, as a warning.
     """
+    __slots__ = ("logger", "operation_name", "registry", "start_ns", "duration_ms")
 
-    def __init__(self, logger: logging.Logger, operation_name: str):
+    def __init__(self, logger: logging.Logger, operation_name: str, registry: Optional[TimingRegistry] = None):
         self.logger = logger
         self.operation_name = operation_name
-        self.start_time = None
+        self.registry = registry or timing_registry
+        self.start_ns = 0
+        self.duration_ms = 0.0
 
     def __enter__(self):
-        self.start_time = datetime.now()
-        self.logger.debug(f"Starting operation: {self.operation_name}")
+        self.start_ns = time.perf_counter_ns()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        end_time = datetime.now()
-        duration = (end_time - self.start_time).total_seconds()
-        self.logger.info(f"Operation '{self.operation_name}' completed in {duration:.4f}s")
+        duration_ns = time.perf_counter_ns() - self.start_ns
+        self.duration_ms = duration_ns / 1_000_000
+        record_span(f"perf.{self.operation_name}", duration_ns, exc_type is not None)
+        if self.registry.record(self.operation_name, duration_ns, failed=exc_type is not None):
+            self.logger.warning(f"🐢 Slow operation '{self.operation_name}': {self.duration_ms:.1f}ms "
+                                f"(threshold {self.registry.threshold_for(self.operation_name):g}ms)")
 
 
 class LoggerManager:
@@ -154,6 +220,10 @@ class LoggerManager:
             self.log_hooks: List[Callable] = []
             # Guard flag retained for compatibility with HookHandler attachment logic
             self._root_hook_attached: bool = False
+            # Set by enable_async_logging(): the listener thread that owns every real handler
+            self.async_listener: Optional["RoutingQueueListener"] = None
+            # Set by enable_consolidated_logging(): the one file sink shared by every logger
+            self.consolidated_sink: Optional["ConsolidatedSink"] = None
             self.initialized = True
 
     def add_hook(self, hook_func: Callable[[logging.LogRecord], None]):
@@ -169,32 +239,179 @@ class LoggerManager:
         """Get all managed loggers."""
         return self.loggers.copy()
 
+    def route_logger(self, logger: logging.Logger):
+        """
+        In async mode, hand a logger's handlers to the listener thread and give the logger
+        a queue handler in their place.
+        """
+        listener = self.async_listener
+        if listener is None or any(isinstance(h, BoundedQueueHandler) for h in logger.handlers):
+            return
+
+        route = logger.name
+        listener.routes[route] = list(logger.handlers)
+        logger.handlers = [BoundedQueueHandler(listener, route)]
+
+    def unroute_logger(self, logger: logging.Logger):
+        """Give a routed logger its real handlers back."""
+        listener = self.async_listener
+        if listener is None:
+            return
+        handlers = listener.routes.pop(logger.name, None)
+        if handlers is not None:
+            logger.handlers = handlers
+
+    def add_handler(self, logger: logging.Logger, handler: logging.Handler):
+        """Add a handler to a logger, or to its route when the logger is routed."""
+        listener = self.async_listener
+        if listener is not None and logger.name in listener.routes:
+            listener.routes[logger.name] = listener.routes[logger.name] + [handler]
+        else:
+            logger.addHandler(handler)
+
+    def replace_file_handlers(self, logger: logging.Logger, sink: logging.Handler):
+        """Swap a logger's own log file handlers for a shared sink, closing the files."""
+        listener = self.async_listener
+        routed = listener is not None and logger.name in listener.routes
+        handlers = listener.routes[logger.name] if routed else logger.handlers
+
+        kept = [h for h in handlers if not isinstance(h, logging.FileHandler)]
+        for handler in handlers:
+            if isinstance(handler, logging.FileHandler):
+                handler.close()
+        if sink not in kept:
+            kept.insert(0, sink)
+
+        if routed:
+            listener.routes[logger.name] = kept
+        else:
+            logger.handlers = kept
+
     def set_global_level(self, level: int):
         """Set logging level for all managed loggers."""
         for logger in self.loggers.values():
             logger.setLevel(level)
 
-    def cleanup_old_logs(self, log_dir: str = "logs", days_to_keep: int = 30):
-        """Remove log files older than specified days."""
-        if not os.path.exists(log_dir):
-            return
+    def cleanup_old_logs(self, log_dir: str = "logs", days_to_keep: int = 30) -> List[str]:
+        """
+        Remove rotated archives and stale log files older than specified days.
+        Files a handler is still writing to are kept. Returns the removed paths.
+        """
+        removed = log_archiver.cleanup(log_dir, days_to_keep)
+        for path in removed:
+            print(f"Removed old log file: {os.path.basename(path)}")
+        return removed
+
 
-        cutoff_time = datetime.now().timestamp() - (days_to_keep * 24 * 60 * 60)
+# Renders tracebacks on the logging thread before a record is handed to another thread
+_traceback_formatter = logging.Formatter()
 
-        for filename in os.listdir(log_dir):
-            filepath = os.path.join(log_dir, filename)
-            if os.path.isfile(filepath) and filename.endswith('.log'):
-                if os.path.getmtime(filepath) < cutoff_time:
-                    try:
-                        os.remove(filepath)
-                        print(f"Removed old log file: {filename}")
-                    except OSError as e:
-                        print(f"Failed to remove {filename}: {e}")
+
+def _detach_record(record: logging.LogRecord) -> logging.LogRecord:
+    """
+    Copy of a record that is safe to hand to another thread without formatting it.
+    The message is rendered now (its args may change after the call returns) and the
+    traceback is rendered to text, since exc_info holds frames that keep locals alive.
+    """
+    record = copy.copy(record)
+    record.msg = record.getMessage()
+    record.args = None
+    if record.exc_info:
+        record.exc_text = record.exc_text or _traceback_formatter.formatException(record.exc_info)
+        record.exc_info = None
+    return record
+
+
+class HookDispatcher:
+    """
+    Runs log hooks and the email error handler on one worker thread, fed by a bounded
+    queue, so a slow or failing hook never adds latency to the code that logged.
+    When the queue is full the newest job is dropped and counted.
+    Per-hook durations and failures are recorded in the timing registry as "log_hook.<name>".
+    """
+
+    def __init__(self, queue_size: int = 1000, registry: Optional[TimingRegistry] = None):
+        self.queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.registry = registry or timing_registry
+        self.metrics = {"dispatched": 0, "dropped": 0, "failures": 0}
+        self.hook_stats: Dict[str, Dict[str, float]] = {}
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, name: str, func: Callable[[logging.LogRecord], None], record: logging.LogRecord) -> bool:
+        """Queue `func(record)`; returns False if the job was dropped."""
+        if self._worker is None:
+            self._start()
+        try:
+            self.queue.put_nowait((name, func, record))
+            return True
+        except queue.Full:
+            self.metrics["dropped"] += 1
+            return False
+
+    def in_worker(self) -> bool:
+        """Whether the caller is the dispatcher thread (records logged by hooks themselves)."""
+        return threading.current_thread() is self._worker
+
+    def _start(self):
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="log-hooks", daemon=True)
+                self._worker.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            name, func, record = self.queue.get()
+            start_ns = time.perf_counter_ns()
+            failed = False
+            try:
+                func(record)
+            except Exception:
+                failed = True  # Don't let hook failures break logging
+            finally:
+                duration_ns = time.perf_counter_ns() - start_ns
+                stats = self.hook_stats.get(name)
+                if stats is None:
+                    stats = self.hook_stats[name] = {"calls": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0}
+                stats["calls"] += 1
+                stats["total_ms"] += duration_ns / 1_000_000
+                stats["max_ms"] = max(stats["max_ms"], duration_ns / 1_000_000)
+                if failed:
+                    stats["failures"] += 1
+                    self.metrics["failures"] += 1
+                self.metrics["dispatched"] += 1
+                self.registry.record(f"log_hook.{name}", duration_ns, failed)
+                self.queue.task_done()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait for queued jobs; returns False if they did not finish in time."""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, dispatch/drop/failure counts and per-hook timings."""
+        return {
+            **self.metrics,
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "hooks": {name: {**stats, "avg_ms": stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0}
+                      for name, stats in list(self.hook_stats.items())},
+        }
+
+
+# Process-wide dispatcher used by HookHandler and EmailErrorHandler
+hook_dispatcher = HookDispatcher(queue_size=int(os.getenv("LOG_HOOK_QUEUE_SIZE", "1000")))
 
 
 class HookHandler(logging.Handler):
     """
     Custom handler that triggers registered hooks.
+    Hooks run on the hook dispatcher's thread, never in the logging caller.
     """
 
     def __init__(self, hooks: List[Callable]):
@@ -202,15 +419,260 @@ class HookHandler(logging.Handler):
         self.hooks = hooks
 
     def emit(self, record):
-        # Prevent duplicate forwarding across multiple HookHandlers
-        if getattr(record, "_hook_forwarded", False):
+        # Prevent duplicate forwarding across multiple HookHandlers, and feedback loops
+        # from hooks that log themselves
+        if getattr(record, "_hook_forwarded", False) or not self.hooks or hook_dispatcher.in_worker():
             return
-        for hook in self.hooks:
+        setattr(record, "_hook_forwarded", True)
+        detached = _detach_record(record)
+        for hook in list(self.hooks):
+            hook_dispatcher.submit(getattr(hook, "__qualname__", repr(hook)), hook, detached)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Queue handler used in async logging mode.
+    Records are enqueued without being formatted; the listener thread formats them with the
+    logger's real handlers. When the queue is full the listener's drop policy applies:
+      - "drop_newest": discard the record being logged
+      - "drop_oldest": discard the oldest queued record to make room
+      - "block": wait up to `block_timeout` seconds for room, then discard
+    """
+
+    def __init__(self, listener: "RoutingQueueListener", route: str):
+        super().__init__(listener.queue)
+        self.listener = listener
+        self.route = route
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Make the record safe to hand to the listener thread without formatting it."""
+        record = _detach_record(record)
+        record.log_route = self.route
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        listener = self.listener
+        policy = listener.drop_policy
+        try:
+            if policy == "block":
+                self.queue.put(record, timeout=listener.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            if policy != "drop_oldest":
+                listener.record_drop()
+                return
+
+        # drop_oldest: evict queued records until this one fits
+        while True:
             try:
-                hook(record)
-                setattr(record, "_hook_forwarded", True)
-            except Exception:
-                pass  # Don't let hook failures break logging
+                self.queue.get_nowait()
+                listener.record_drop()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                continue
+
+
+class RoutingQueueListener(QueueListener):
+    """
+    Single background thread that drains the log queue and passes each record to the real
+    handlers of the logger it came from (`routes`: logger name -> handlers).
+    """
+
+    DROP_POLICIES = ("drop_newest", "drop_oldest", "block")
+
+    def __init__(self, queue_size: int = 10000, drop_policy: str = "drop_newest", block_timeout: float = 0.05):
+        if drop_policy not in self.DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{drop_policy}', expected one of {self.DROP_POLICIES}")
+        super().__init__(queue.Queue(maxsize=queue_size), respect_handler_level=True)
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+        self.routes: Dict[str, List[logging.Handler]] = {}
+        self.dropped = 0
+        self._drop_lock = threading.Lock()
+
+    def record_drop(self):
+        with self._drop_lock:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def handle(self, record: logging.LogRecord):
+        for handler in self.routes.get(getattr(record, "log_route", record.name), ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def enqueue_sentinel(self):
+        # The queue may be full; the listener is still draining, so wait for room
+        self.queue.put(self._sentinel)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, capacity, drop policy and number of dropped records."""
+        return {
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "drop_policy": self.drop_policy,
+            "dropped": self.dropped,
+            "routes": len(self.routes),
+        }
+
+
+class ConsolidatedSink(logging.Handler):
+    """
+    One buffered JSON-lines file shared by every logger in consolidated mode.
+    Formatted records are buffered and written in one call when `flush_records` are waiting,
+    when a record at ERROR or above arrives, or every `flush_interval` seconds from a
+    background thread. The logger name is the "logger" field of each line. Size-based
+    rotation goes through the log archiver like any other log file.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 50 * 1024 * 1024, backup_count: int = 10,
+                 flush_records: int = 256, flush_interval: float = 0.5):
+        super().__init__()
+        self.baseFilename = os.path.abspath(filename)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval
+        self.rotator: Optional[Callable[[str, str], None]] = None  # Set by log_archiver.attach
+        self.setFormatter(JSONFormatter())
+
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        self._stream = open(self.baseFilename, "a", encoding="utf-8")
+        self._buffer: List[str] = []
+        self.metrics = {"records": 0, "writes": 0, "rotations": 0}
+
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._run_flusher, name="log-sink-flush", daemon=True)
+        self._flusher.start()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        # Handler.handle() already holds self.lock
+        self._buffer.append(line)
+        self.metrics["records"] += 1
+        if len(self._buffer) >= self.flush_records or record.levelno >= logging.ERROR:
+            self._write_buffer()
+
+    def _write_buffer(self):
+        """Write everything buffered in one call. Caller holds self.lock."""
+        if not self._buffer or self._stream is None:
+            return
+        lines, self._buffer = self._buffer, []
+        try:
+            self._stream.write("\n".join(lines) + "\n")
+            self._stream.flush()
+            self.metrics["writes"] += 1
+            if self.max_bytes and self._stream.tell() >= self.max_bytes:
+                self._rollover()
+        except Exception:
+            self.handleError(logging.makeLogRecord({"msg": f"Failed to write {len(lines)} log record(s)"}))
+
+    def _rollover(self):
+        self._stream.close()
+        if self.rotator is not None:
+            self.rotator(self.baseFilename, self.baseFilename + ".1")
+        elif self.backup_count > 0:
+            os.replace(self.baseFilename, self.baseFilename + ".1")
+        self._stream = open(self.baseFilename, "a" if self.backup_count > 0 else "w", encoding="utf-8")
+        self.metrics["rotations"] += 1
+
+    def _run_flusher(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            self._write_buffer()
+        finally:
+            self.release()
+
+    def close(self):
+        self._stop.set()
+        self.acquire()
+        try:
+            self._write_buffer()
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+        finally:
+            self.release()
+        super().close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Records written, write calls (one per batch), rotations and records still buffered."""
+        return {**self.metrics, "buffered": len(self._buffer), "file": self.baseFilename}
+
+
+def enable_async_logging(queue_size: int = 10000, drop_policy: str = "drop_newest",
+                         block_timeout: float = 0.05) -> RoutingQueueListener:
+    """
+    Switch to non-blocking logging: loggers only enqueue records, and one listener thread
+    does all formatting, file writes, rotation and console output.
+    Applies to loggers already created and to every logger created afterwards.
+    Returns the listener, whose stats() report queue depth and dropped records.
+    """
+    manager = LoggerManager()
+    if manager.async_listener is not None:
+        return manager.async_listener
+
+    listener = RoutingQueueListener(queue_size, drop_policy, block_timeout)
+    manager.async_listener = listener
+    for logger in manager.loggers.values():
+        manager.route_logger(logger)
+    root_logger = logging.getLogger()
+    if root_logger.handlers:
+        manager.route_logger(root_logger)
+
+    listener.start()
+    atexit.register(disable_async_logging)
+    return listener
+
+
+def disable_async_logging():
+    """Flush the queue, stop the listener thread and give loggers their handlers back."""
+    manager = LoggerManager()
+    listener = manager.async_listener
+    if listener is None:
+        return
+
+    listener.stop()
+    for logger in list(manager.loggers.values()) + [logging.getLogger()]:
+        manager.unroute_logger(logger)
+    manager.async_listener = None
+    if listener.dropped:
+        print(f"Async logging dropped {listener.dropped} record(s) because the queue was full")
+
+
+def enable_consolidated_logging(filename: str, max_bytes: int = 50 * 1024 * 1024, backup_count: int = 10,
+                                flush_records: int = 256, flush_interval: float = 0.5) -> ConsolidatedSink:
+    """
+    Send every managed logger's file output to one shared ConsolidatedSink instead of a
+    file per module. Per-module file handlers of loggers already created are closed and
+    replaced; loggers created afterwards write to the sink directly. Console output and
+    other handlers are unchanged. Returns the sink.
+    """
+    manager = LoggerManager()
+    if manager.consolidated_sink is not None:
+        return manager.consolidated_sink
+
+    sink = ConsolidatedSink(filename, max_bytes, backup_count, flush_records, flush_interval)
+    log_archiver.attach(sink, backup_count)
+    manager.consolidated_sink = sink
+    for logger in manager.loggers.values():
+        manager.replace_file_handlers(logger, sink)
+    return sink
 
 
 def get_logger(
@@ -239,7 +701,7 @@ def get_logger(
         return manager.loggers[module_name]
 
     # Ensure the logs directory exists
-    if file_output:
+    if file_output and manager.consolidated_sink is None:
         os.makedirs(log_dir, exist_ok=True)
 
     # Create logger instance
@@ -254,10 +716,15 @@ def get_logger(
     logger.propagate = False
 
     # Default format
-    default_format = custom_format or "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+    default_format = custom_format or "%(asctime)s [%(levelname)s] %(name)s%(correlation_tag)s: %(message)s"
 
-    # File handler
-    if file_output:
+    # File handler: the shared sink in consolidated mode, otherwise a file per module
+    if file_output and manager.consolidated_sink is not None:
+        logger.addHandler(manager.consolidated_sink)
+        if filters:
+            # The sink is shared, so the filter goes on the logger
+            logger.addFilter(filters.filter)
+    elif file_output:
         log_file = os.path.join(log_dir, f"{module_name.replace('.', '_')}.log")
 
         if rotation_type == "time":
@@ -283,6 +750,9 @@ def get_logger(
 
         file_handler.setFormatter(file_formatter)
 
+        # Rotated files are compressed and pruned in the background
+        log_archiver.attach(file_handler, backup_count)
+
         # Add filter if provided
         if filters:
             file_handler.addFilter(filters.filter)
@@ -321,6 +791,13 @@ def get_logger(
         for global_handler in manager.global_handlers:
             logger.addHandler(global_handler)
 
+    # Repeated warnings and errors from one call site are summarized instead of flooding
+    # the files and the email notifier (LOG_RATE_LIMIT / LOG_RATE_LIMITS)
+    logger.addFilter(rate_limiter)
+
+    # In async mode the handlers run on the listener thread instead
+    manager.route_logger(logger)
+
     # Store in manager
     manager.loggers[module_name] = logger
 
@@ -329,17 +806,18 @@ def get_logger(
 
 def log_performance(operation_name: str = None):
     """
-    Decorator to log function execution time for both sync and async functions.
+    Decorator recording function execution time in the timing registry, for both sync
+    and async functions. Slow calls are logged to the function's module logger.
     """
 
     def decorator(func):
+        logger = logging.getLogger(func.__module__)
+        op_name = operation_name or f"{func.__name__}"
+
         if asyncio.iscoroutinefunction(func):
             # Handle async functions
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
-                logger = logging.getLogger(func.__module__)
-                op_name = operation_name or f"{func.__name__}"
-
                 with PerformanceLogger(logger, op_name):
                     return await func(*args, **kwargs)
 
@@ -348,9 +826,6 @@ def log_performance(operation_name: str = None):
             # Handle sync functions
             @wraps(func)
             def wrapper(*args, **kwargs):
-                logger = logging.getLogger(func.__module__)
-                op_name = operation_name or f"{func.__name__}"
-
                 with PerformanceLogger(logger, op_name):
                     return func(*args, **kwargs)
 
@@ -363,17 +838,22 @@ def log_performance(operation_name: str = None):
 def log_context(logger: logging.Logger, operation_name: str, level: int = logging.INFO):
     """
     Context manager for logging operation start and end.
+    The duration is also recorded in the timing registry.
     """
     logger.log(level, f"Starting: {operation_name}")
-    start_time = datetime.now()
+    start_ns = time.perf_counter_ns()
 
     try:
         yield
-        duration = (datetime.now() - start_time).total_seconds()
-        logger.log(level, f"Completed: {operation_name} (took {duration:.4f}s)")
+        duration_ns = time.perf_counter_ns() - start_ns
+        timing_registry.record(operation_name, duration_ns)
+        record_span(f"perf.{operation_name}", duration_ns)
+        logger.log(level, f"Completed: {operation_name} (took {duration_ns / 1e9:.4f}s)")
     except Exception as e:
-        duration = (datetime.now() - start_time).total_seconds()
-        logger.error(f"Failed: {operation_name} after {duration:.4f}s - {str(e)}")
+        duration_ns = time.perf_counter_ns() - start_ns
+        timing_registry.record(operation_name, duration_ns, failed=True)
+        record_span(f"perf.{operation_name}", duration_ns, failed=True)
+        logger.error(f"Failed: {operation_name} after {duration_ns / 1e9:.4f}s - {str(e)}")
         raise
 
 
@@ -409,19 +889,76 @@ def setup_application_logging(
 
     # Add performance logging if enabled
     if enable_performance_logging:
-        _ = get_logger(
+        performance_logger = get_logger(
             module_name=f"{app_name}.performance",
             level=logging.DEBUG,
             log_dir=log_dir,
             console_output=True,  # Performance logs go to file only
             json_format=True  # JSON format for easier parsing
         )
+        # The timing registry's aggregates go here; TIMING_SUMMARY_INTERVAL=0 turns the dump off
+        summary_interval = float(os.getenv("TIMING_SUMMARY_INTERVAL", "300"))
+        if summary_interval > 0:
+            timing_registry.start_periodic_summary(performance_logger, summary_interval)
+
+    # Compress leftovers, prune old archives and keep log dirs within LOG_DISK_BUDGET_MB;
+    # LOG_CLEANUP_INTERVAL=0 leaves only the pruning done after each rotation
+    cleanup_interval = float(os.getenv("LOG_CLEANUP_INTERVAL", "3600"))
+    if cleanup_interval > 0:
+        log_archiver.start_scheduled_cleanup(cleanup_interval)
 
     main_logger.info(f"Application logging initialized for: {app_name}")
 
     return main_logger
 
 
+class Lazy:
+    """
+    A log argument computed only if the record is actually emitted:
+        logger.debug("Member counts: %s", Lazy(lambda: [g.member_count for g in guilds]))
+    """
+    __slots__ = ("func", "args")
+
+    def __init__(self, func: Callable[..., Any], *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+    def __repr__(self):
+        return repr(self.func(*self.args))
+
+
+class LazyLogger(logging.LoggerAdapter):
+    """
+    Logger facade that does no work for disabled levels.
+    Besides %-style arguments and Lazy values, the message itself may be a zero-argument
+    callable; it is only called when the level is enabled:
+        logger.debug(lambda: f"Candidates: {expensive_summary()}")
+    """
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger, {})
+
+    def process(self, msg, kwargs):
+        return msg, kwargs
+
+    def log(self, level, msg, *args, **kwargs):
+        if not self.logger.isEnabledFor(level):
+            return
+        if callable(msg):
+            msg = msg()
+        # Report the caller's file and line, not this adapter's
+        kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 1
+        self.logger.log(level, msg, *args, **kwargs)
+
+
+def get_lazy_logger(module_name: str, **kwargs) -> LazyLogger:
+    """get_logger() wrapped in a LazyLogger; accepts the same options."""
+    return LazyLogger(get_logger(module_name, **kwargs))
+
+
 # Convenience functions for quick logging setup
 def get_simple_logger(name: str) -> logging.Logger:
     """Get a simple logger with basic configuration."""
@@ -455,13 +992,12 @@ class EmailErrorHandler(logging.Handler):
         self.setLevel(logging.ERROR)  # Only handle ERROR and CRITICAL levels
 
     def emit(self, record):
-        try:
-            # Format the log record
-            error_msg = self.format(record)
-            self.notifier.log_error(error_msg)
-        except Exception:
-            # Don't let email failures break logging
-            pass
+        # Formatting and the notifier's analysis run on the hook dispatcher's thread
+        if not hook_dispatcher.in_worker():
+            hook_dispatcher.submit("email_error", self._deliver, _detach_record(record))
+
+    def _deliver(self, record: logging.LogRecord):
+        self.notifier.log_error(self.format(record))
 
 
 def add_global_handler(handler: logging.Handler):
@@ -473,12 +1009,13 @@ def add_global_handler(handler: logging.Handler):
 
     # Add to root logger with proper level
     root_logger = logging.getLogger()
-    root_logger.addHandler(handler)
+    manager.add_handler(root_logger, handler)
+    manager.route_logger(root_logger)
     root_logger.setLevel(logging.DEBUG)  # Ensure root accepts all levels
 
     # Add to all managed loggers
     for logger_name, logger in manager.loggers.items():
-        logger.addHandler(handler)
+        manager.add_handler(logger, handler)
         print(f"Added global handler to logger: {logger_name}")
 
     # Store the handler in manager for future loggers
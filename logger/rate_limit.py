@@ -0,0 +1,191 @@
+"""
+Per-call-site log rate limiting.
+
+RateLimitFilter sits on every managed logger. Records at or above the minimum level are
+keyed by logger name, source file and line. For each key, the first `burst` records of a
+`window` are let through and the rest are dropped and counted. When the window is over, one
+summary record is logged in their place: "Suppressed K similar records". The summary is
+written lazily when the call site logs again, or by a sweeper thread if it goes quiet.
+
+Limits can be set per logger name or dotted prefix. Suppressed records (in total and per
+logger) and summaries are counted in the timing registry, under log.rate_limit.*.
+
+Environment:
+    LOG_RATE_LIMIT              default limit as burst/window-seconds, e.g. 20/60; 0 disables (default 20/60)
+    LOG_RATE_LIMITS             per-logger limits, e.g. "Forward=5/30,DatabaseManager=50/60,setup=0"
+    LOG_RATE_LIMIT_MIN_LEVEL    lowest level that is limited (default WARNING)
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from .timing import TimingRegistry, timing_registry
+
+CallSite = Tuple[str, str, int]
+
+
+def parse_limit(value: str) -> Tuple[int, float]:
+    """"20/60" -> (20, 60.0); "0" -> (0, 0.0), meaning unlimited."""
+    if value.strip() in ("", "0", "off"):
+        return 0, 0.0
+    burst, _, window = value.partition("/")
+    return int(burst), float(window or 60)
+
+
+class _SiteState:
+    __slots__ = ("window_start", "passed", "suppressed", "last_record")
+
+    def __init__(self, now: float):
+        self.window_start = now
+        self.passed = 0
+        self.suppressed = 0
+        self.last_record: Optional[logging.LogRecord] = None
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through the first `burst` records per call site per `window` seconds."""
+
+    def __init__(self, burst: int = 20, window: float = 60.0, min_level: int = logging.WARNING,
+                 registry: Optional[TimingRegistry] = None):
+        super().__init__()
+        self.default_limit = (burst, window)
+        self.min_level = min_level
+        self.registry = registry or timing_registry
+        self.limits: Dict[str, Tuple[int, float]] = {}  # Logger name or prefix -> (burst, window)
+        self._resolved: Dict[str, Tuple[int, float]] = {}
+        self._sites: Dict[CallSite, _SiteState] = {}
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+
+    def configure(self, logger_name: str, burst: int, window: float = 60.0):
+        """Set the limit of a logger and the loggers under it; burst 0 turns limiting off for them."""
+        with self._lock:
+            self.limits[logger_name] = (burst, window)
+            self._resolved.clear()
+
+    def limit_for(self, logger_name: str) -> Tuple[int, float]:
+        limit = self._resolved.get(logger_name)
+        if limit is None:
+            # The most specific configured name or dotted prefix wins
+            name = logger_name
+            while name not in self.limits and "." in name:
+                name = name.rsplit(".", 1)[0]
+            limit = self._resolved[logger_name] = self.limits.get(name, self.default_limit)
+        return limit
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level or getattr(record, "_rate_limit_summary", False):
+            return True
+        burst, window = self.limit_for(record.name)
+        if burst <= 0:
+            return True
+
+        now = time.monotonic()
+        key = (record.name, record.pathname, record.lineno)
+        summary = None
+        with self._lock:
+            state = self._sites.get(key)
+            if state is None:
+                state = self._sites[key] = _SiteState(now)
+            elif now - state.window_start >= window:
+                summary = self._take_summary(state, window)
+                state.window_start, state.passed = now, 0
+
+            if state.passed < burst:
+                state.passed += 1
+                allowed = True
+            else:
+                state.suppressed += 1
+                state.last_record = record
+                allowed = False
+
+        if summary is not None:
+            self._emit_summary(*summary)
+        if not allowed:
+            self.registry.increment("log.rate_limit.suppressed")
+            self.registry.increment(f"log.rate_limit.suppressed.{record.name}")
+            self._ensure_sweeper()
+        return allowed
+
+    def _take_summary(self, state: _SiteState, window: float):
+        """Reset a site's suppressed count, returning what its summary needs. Caller holds the lock."""
+        if not state.suppressed:
+            return None
+        summary = (state.last_record, state.suppressed, window)
+        state.suppressed, state.last_record = 0, None
+        return summary
+
+    def _emit_summary(self, last: logging.LogRecord, count: int, window: float):
+        target = logging.getLogger(last.name)
+        record = target.makeRecord(
+            last.name, last.levelno, last.pathname, last.lineno,
+            "🔇 Suppressed %d similar record(s) from %s:%d in the last %.0fs; last one: %s",
+            (count, os.path.basename(last.pathname), last.lineno, window, last.getMessage()),
+            None, last.funcName)
+        record._rate_limit_summary = True
+        self.registry.increment("log.rate_limit.summaries")
+        target.handle(record)
+
+    def sweep(self):
+        """Log summaries for call sites whose window ended without another record, and forget idle sites."""
+        now = time.monotonic()
+        summaries = []
+        with self._lock:
+            for key, state in list(self._sites.items()):
+                window = self.limit_for(key[0])[1]
+                if now - state.window_start < window:
+                    continue
+                summary = self._take_summary(state, window)
+                if summary is not None:
+                    summaries.append(summary)
+                    state.window_start, state.passed = now, 0
+                elif now - state.window_start >= 2 * window:
+                    del self._sites[key]
+        for summary in summaries:
+            self._emit_summary(*summary)
+
+    def _sweep_interval(self) -> float:
+        windows = [window for burst, window in [self.default_limit, *self.limits.values()] if burst > 0]
+        return max(1.0, min(windows) / 2) if windows else 30.0
+
+    def _ensure_sweeper(self):
+        if self._sweeper is not None:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+
+            def run():
+                while True:
+                    time.sleep(self._sweep_interval())
+                    try:
+                        self.sweep()
+                    except Exception:
+                        pass  # Never let the sweeper die
+
+            self._sweeper = threading.Thread(target=run, name="log-rate-limit", daemon=True)
+            self._sweeper.start()
+
+    def stats(self) -> Dict[str, Any]:
+        """Tracked call sites and the ones currently suppressing."""
+        with self._lock:
+            suppressing = {f"{name}:{os.path.basename(path)}:{line}": state.suppressed
+                           for (name, path, line), state in self._sites.items() if state.suppressed}
+        return {"sites": len(self._sites), "suppressing": suppressing, **{
+            name: value for name, value in self.registry.counters().items() if name.startswith("log.rate_limit.")}}
+
+
+def _from_env() -> RateLimitFilter:
+    burst, window = parse_limit(os.getenv("LOG_RATE_LIMIT", "20/60"))
+    min_level = logging.getLevelName(os.getenv("LOG_RATE_LIMIT_MIN_LEVEL", "WARNING").upper())
+    limiter = RateLimitFilter(burst, window, min_level if isinstance(min_level, int) else logging.WARNING)
+    for entry in filter(None, os.getenv("LOG_RATE_LIMITS", "").split(",")):
+        name, _, limit = entry.partition("=")
+        limiter.configure(name.strip(), *parse_limit(limit))
+    return limiter
+
+
+# Process-wide limiter added to every logger get_logger creates
+rate_limiter = _from_env()
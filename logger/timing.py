@@ -0,0 +1,203 @@
+"""
+In-memory timing registry.
+
+PerformanceLogger, log_performance and log_context record every timed operation here
+instead of logging each sample: per operation a count, sum, min, max and a fixed-bucket
+latency histogram, measured with time.perf_counter_ns. Only samples above the slow
+threshold are logged individually; everything else shows up in the periodic summary or
+through timing_registry.snapshot(). Plain event counters (increment() / counters()) are
+reported in the same summary.
+"""
+import bisect
+import logging
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+# Fixed log-scale bucket upper bounds in milliseconds: 0.25ms doubling up to ~65s.
+# Observations above the last bound land in the implicit +Inf bucket.
+LATENCY_BUCKETS_MS: Tuple[float, ...] = tuple(0.25 * (2 ** i) for i in range(19))
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram.
+    Not locked itself: owners either mutate it from a single thread (the event loop) or
+    guard it, as TimingRegistry does.
+    """
+    __slots__ = ("counts", "count", "sum_ms", "min_ms", "max_ms")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.min_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float):
+        """Record a single observation in milliseconds."""
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        if not self.count or value_ms < self.min_ms:
+            self.min_ms = value_ms
+        self.count += 1
+        self.sum_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket that contains it."""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summary of the histogram."""
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 3),
+            "avg_ms": round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+        }
+
+
+class TimingRegistry:
+    """
+    Per-operation latency histograms shared by the whole process.
+    Recording takes a lock because timed code also runs on worker threads.
+    """
+
+    def __init__(self, slow_threshold_ms: float = 1000.0):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.slow_thresholds: Dict[str, float] = {}  # Per-operation overrides of slow_threshold_ms
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._failures: Dict[str, int] = {}
+        self._slow: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {}  # Plain event counts, e.g. suppressed log records
+        self._lock = threading.Lock()
+
+        self._summary_thread: Optional[threading.Thread] = None
+        self._summary_stop = threading.Event()
+        self._summarized_counts: Dict[str, int] = {}
+
+    def set_slow_threshold(self, threshold_ms: float, operation: Optional[str] = None):
+        """Set the slow-sample threshold globally or for one operation."""
+        if operation is None:
+            self.slow_threshold_ms = threshold_ms
+        else:
+            self.slow_thresholds[operation] = threshold_ms
+
+    def threshold_for(self, operation: str) -> float:
+        return self.slow_thresholds.get(operation, self.slow_threshold_ms)
+
+    def record(self, operation: str, duration_ns: int, failed: bool = False) -> bool:
+        """Record one sample; returns whether it was above the operation's slow threshold."""
+        duration_ms = duration_ns / 1_000_000
+        slow = duration_ms >= self.threshold_for(operation)
+        with self._lock:
+            histogram = self._histograms.get(operation)
+            if histogram is None:
+                histogram = self._histograms[operation] = LatencyHistogram()
+            histogram.observe(duration_ms)
+            if failed:
+                self._failures[operation] = self._failures.get(operation, 0) + 1
+            if slow:
+                self._slow[operation] = self._slow.get(operation, 0) + 1
+        return slow
+
+    def increment(self, counter: str, amount: int = 1):
+        """Add to a named event counter."""
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def counters(self) -> Dict[str, int]:
+        """Current value of every event counter."""
+        with self._lock:
+            return dict(self._counters)
+
+    def snapshot(self, operation: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Histogram summaries plus failure and slow-sample counts, per operation."""
+        with self._lock:
+            names = [operation] if operation is not None else list(self._histograms)
+            return {
+                name: {
+                    **self._histograms[name].snapshot(),
+                    "failures": self._failures.get(name, 0),
+                    "slow": self._slow.get(name, 0),
+                }
+                for name in names if name in self._histograms
+            }
+
+    def reset(self):
+        """Forget every recorded sample."""
+        with self._lock:
+            self._histograms.clear()
+            self._failures.clear()
+            self._slow.clear()
+            self._counters.clear()
+            self._summarized_counts.clear()
+
+    def log_summary(self, logger: logging.Logger, level: int = logging.INFO, only_changed: bool = False):
+        """Log one line per operation, slowest total time first, then the event counters."""
+        snapshot = self.snapshot()
+        if only_changed:
+            snapshot = {name: stats for name, stats in snapshot.items()
+                        if stats["count"] != self._summarized_counts.get(name)}
+        self._summarized_counts.update({name: stats["count"] for name, stats in snapshot.items()})
+        counters = self.counters()
+        if only_changed:
+            counters = {name: value for name, value in counters.items()
+                        if value != self._summarized_counts.get(f"counter:{name}")}
+        self._summarized_counts.update({f"counter:{name}": value for name, value in counters.items()})
+        if not snapshot and not counters:
+            return
+
+        lines = [f"⏱️ Timing summary ({len(snapshot)} operation(s)):"]
+        for name, stats in sorted(snapshot.items(), key=lambda item: item[1]["sum_ms"], reverse=True):
+            lines.append(f"  • {name}: n={stats['count']} avg={stats['avg_ms']:.2f}ms "
+                         f"min={stats['min_ms']:.2f}ms p95={stats['p95_ms']:g}ms max={stats['max_ms']:.2f}ms "
+                         f"slow={stats['slow']} failed={stats['failures']}")
+        if counters:
+            lines.append("  Counters: " + ", ".join(f"{name}={value}" for name, value in sorted(counters.items())))
+        logger.log(level, "\n".join(lines))
+
+    def start_periodic_summary(self, logger: logging.Logger, interval: float = 300.0):
+        """Log a summary of the operations that ran every `interval` seconds, from a daemon thread."""
+        if self._summary_thread and self._summary_thread.is_alive():
+            return
+
+        self._summary_stop.clear()
+
+        def run():
+            while not self._summary_stop.wait(interval):
+                try:
+                    self.log_summary(logger, only_changed=True)
+                except Exception:
+                    pass  # Never let reporting kill the thread
+
+        self._summary_thread = threading.Thread(target=run, name="timing-summary", daemon=True)
+        self._summary_thread.start()
+
+    def stop_periodic_summary(self):
+        """Stop the periodic summary thread."""
+        self._summary_stop.set()
+        self._summary_thread = None
+
+
+# Process-wide registry; SLOW_OPERATION_MS sets the default slow threshold
+timing_registry = TimingRegistry(slow_threshold_ms=float(os.getenv("SLOW_OPERATION_MS", "1000")))
+
+
+def get_timing_registry() -> TimingRegistry:
+    """The process-wide timing registry."""
+    return timing_registry
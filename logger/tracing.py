@@ -0,0 +1,180 @@
+"""
+Correlation ids and per-message span traces.
+
+A correlation id lives in a contextvar, so it follows one message or interaction through
+every await and every task created from it. The record factory installed here copies it
+onto each LogRecord as `correlation_id` (None outside a traced context). JSON output
+includes the id as a field, and text output shows it after the logger name.
+
+With TRACE_SPANS enabled, each traced message also collects spans. Stage spans are
+explicit `with span("send"):` blocks. Database operations and PerformanceLogger samples
+in the same context are added automatically. When the message is done, one "Trace" log
+record lists where the time went. Stage durations are also aggregated in the timing
+registry as "trace.<kind>.<stage>".
+
+Environment:
+    TRACE_SPANS      record span traces (default false); correlation ids are always on
+    TRACE_SLOW_MS    only write traces at least this long (default 0: all)
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Tuple
+
+from .timing import timing_registry
+
+correlation_id: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+
+_NO_SPAN = nullcontext()
+
+
+class Trace:
+    """Spans collected for one message or interaction."""
+    __slots__ = ("correlation_id", "kind", "attrs", "start_ns", "spans", "discarded")
+
+    def __init__(self, correlation_id: str, kind: str, attrs: Dict[str, Any]):
+        self.correlation_id = correlation_id
+        self.kind = kind
+        self.attrs = attrs
+        self.start_ns = time.perf_counter_ns()
+        # (name, offset from trace start in ns, duration in ns, failed)
+        self.spans: List[Tuple[str, int, int, bool]] = []
+        self.discarded = False  # Nothing worth writing, e.g. a message no rule applies to
+
+    def add(self, name: str, start_ns: int, duration_ns: int, failed: bool = False):
+        self.spans.append((name, start_ns - self.start_ns, duration_ns, failed))
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Milliseconds per stage span, summed when a stage ran more than once (e.g. per rule)."""
+        totals: Dict[str, float] = {}
+        for name, _, duration_ns, _ in self.spans:
+            if "." not in name:
+                totals[name] = totals.get(name, 0.0) + duration_ns / 1_000_000
+        return totals
+
+
+class _Span:
+    __slots__ = ("trace", "name", "start_ns")
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.trace.add(self.name, self.start_ns, time.perf_counter_ns() - self.start_ns, exc_type is not None)
+
+
+def span(name: str):
+    """Time a stage of the current trace. A shared no-op when nothing is being traced."""
+    trace = current_trace.get()
+    return _Span(trace, name) if trace is not None else _NO_SPAN
+
+
+def discard_trace():
+    """Don't write the current trace; its stage timings are still aggregated."""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.discarded = True
+
+
+def record_span(name: str, duration_ns: int, failed: bool = False):
+    """Add an already-measured sample (a database operation, a timed block) to the current trace."""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(name, time.perf_counter_ns() - duration_ns, duration_ns, failed)
+
+
+class SpanRecorder:
+    """Writes one record per finished trace to the "Trace" logger and aggregates stage timings."""
+
+    def __init__(self, enabled: bool = False, slow_threshold_ms: float = 0.0):
+        self.enabled = enabled
+        self.slow_threshold_ms = slow_threshold_ms
+        self._logger: Optional[logging.Logger] = None
+        self.metrics = {"traces": 0, "written": 0}
+
+    @property
+    def logger(self) -> logging.Logger:
+        if self._logger is None:
+            from .logger_setup import get_logger  # logger_setup imports this module
+            self._logger = get_logger("Trace", level=logging.INFO, console_output=False, json_format=True)
+        return self._logger
+
+    def finish(self, trace: Trace, failed: bool):
+        total_ms = (time.perf_counter_ns() - trace.start_ns) / 1_000_000
+        stages = trace.stage_totals()
+        self.metrics["traces"] += 1
+        for stage, duration_ms in stages.items():
+            timing_registry.record(f"trace.{trace.kind}.{stage}", int(duration_ms * 1_000_000))
+        if trace.discarded or total_ms < self.slow_threshold_ms:
+            return
+
+        self.metrics["written"] += 1
+        breakdown = " ".join(f"{stage}={duration_ms:.1f}ms" for stage, duration_ms in stages.items())
+        self.logger.info(
+            "🧭 %s %s took %.1fms%s: %s", trace.kind, trace.correlation_id, total_ms,
+            " (failed)" if failed else "", breakdown or "no stages",
+            extra={
+                "trace_kind": trace.kind,
+                "total_ms": round(total_ms, 3),
+                "stages_ms": {stage: round(duration_ms, 3) for stage, duration_ms in stages.items()},
+                "spans": [{"name": name, "offset_ms": round(offset_ns / 1_000_000, 3),
+                           "duration_ms": round(duration_ns / 1_000_000, 3), "failed": span_failed}
+                          for name, offset_ns, duration_ns, span_failed in trace.spans],
+                **trace.attrs,
+            })
+
+
+span_recorder = SpanRecorder(
+    enabled=os.getenv("TRACE_SPANS", "false").lower() in ("1", "true", "yes"),
+    slow_threshold_ms=float(os.getenv("TRACE_SLOW_MS", "0")),
+)
+
+
+@contextmanager
+def trace_context(kind: str, trace_id: str, **attrs):
+    """
+    Run the block under correlation id `trace_id`. When span recording is enabled, the
+    block's spans are collected and written as one trace when it exits.
+    """
+    id_token = correlation_id.set(trace_id)
+    trace = Trace(trace_id, kind, attrs) if span_recorder.enabled else None
+    trace_token = current_trace.set(trace)
+    failed = False
+    try:
+        yield trace
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        current_trace.reset(trace_token)
+        if trace is not None:
+            try:
+                span_recorder.finish(trace, failed)  # Still under the correlation id
+            except Exception:
+                pass  # Tracing must never break the traced code
+        correlation_id.reset(id_token)
+
+
+def install_record_factory():
+    """Stamp the current correlation id on every LogRecord created from now on. Idempotent."""
+    factory = logging.getLogRecordFactory()
+    if getattr(factory, "adds_correlation_id", False):
+        return
+
+    def record_factory(*args, **kwargs):
+        record = factory(*args, **kwargs)
+        cid = correlation_id.get()
+        record.correlation_id = cid
+        record.correlation_tag = f" [{cid}]" if cid else ""
+        return record
+
+    record_factory.adds_correlation_id = True
+    logging.setLogRecordFactory(record_factory)
@@ -6,9 +6,12 @@ import logging
 from dotenv import load_dotenv
 from bot import get_bot, set_error_notifier
 from core.sync import load_cogs
-from logger.logger_setup import setup_application_logging, EmailErrorHandler
+from logger.logger_setup import (
+    setup_application_logging, enable_async_logging, enable_consolidated_logging, EmailErrorHandler
+)
+from logger.log_control import log_control
 from logger.log_dispacher import EnhancedErrorNotifier, Severity
-from database import db_core, guild_manager
+from database import storage, guild_manager
 
 load_dotenv()
 
@@ -17,6 +20,8 @@ DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 EMAIL_ADDRESS = os.getenv("EMAIL")
 EMAIL_PASSWORD = os.getenv("PASSWORD")
 BOT_OWNER_ID = os.getenv("BOT_OWNER_ID")
+# Optional unix socket for runtime log level changes (see logger/log_control.py)
+LOG_CONTROL_SOCKET = os.getenv("LOG_CONTROL_SOCKET")
 
 LOG_DIR = "log"
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -29,6 +34,25 @@ app_logger = setup_application_logging(
     enable_performance_logging=True
 )
 
+# One shared, buffered JSON-lines file for every module instead of a file each;
+# read it with tools/logtail.py
+if os.getenv("LOG_CONSOLIDATED", "false").lower() in ("1", "true", "yes"):
+    log_sink = enable_consolidated_logging(
+        os.getenv("LOG_CONSOLIDATED_FILE", os.path.join(LOG_DIR, "stygian.jsonl")),
+        flush_records=int(os.getenv("LOG_FLUSH_RECORDS", "256")),
+        flush_interval=int(os.getenv("LOG_FLUSH_MS", "500")) / 1000
+    )
+    app_logger.info(f"Consolidated logging enabled: {log_sink.baseFilename}")
+
+# Non-blocking logging: handlers run on a listener thread instead of the event loop.
+# LOG_DROP_POLICY is drop_newest, drop_oldest or block; drops are counted, never raised.
+if os.getenv("ASYNC_LOGGING", "false").lower() in ("1", "true", "yes"):
+    log_listener = enable_async_logging(
+        queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+        drop_policy=os.getenv("LOG_DROP_POLICY", "drop_newest")
+    )
+    app_logger.info(f"Async logging enabled: {log_listener.stats()}")
+
 bot = get_bot()
 
 error_notifier = None
@@ -59,12 +83,22 @@ async def initialize_database():
     try:
         app_logger.info("Initializing database connection...")
 
-        success = await db_core.initialize()
+        success = await storage.initialize()
         if not success:
             app_logger.error("Failed to initialize database connection")
             return False
 
         await guild_manager.initialize_default_settings()
+        await guild_manager.migrate_snowflake_ids()
+        await guild_manager.refresh_entitlements()
+        guild_manager.start_entitlement_refresh()
+
+        if guild_manager.warm_start_enabled:
+            try:
+                await guild_manager.warm_start()
+            except Exception as e:
+                # Not fatal: rule indexes are then built as each guild's first message arrives
+                app_logger.warning(f"⚠️ Warm start failed, loading guilds on demand: {e}")
 
         app_logger.info("✅ Database initialization completed successfully")
         return True
@@ -78,7 +112,8 @@ async def shutdown_database():
     """Cleanly shutdown database connections."""
     try:
         app_logger.info("Shutting down database connections...")
-        await db_core.close()
+        await guild_manager.stop_entitlement_refresh()
+        await storage.close()
         app_logger.info("✅ Database connections closed")
     except Exception as e:
         app_logger.error(f"❌ Error during database shutdown: {e}")
@@ -106,6 +141,12 @@ async def main():
         await load_cogs()
         app_logger.info("Cogs loaded successfully")
 
+        if LOG_CONTROL_SOCKET:
+            try:
+                await log_control.start_admin_socket(LOG_CONTROL_SOCKET)
+            except OSError as e:
+                app_logger.error(f"❌ Could not open log control socket {LOG_CONTROL_SOCKET}: {e}")
+
         app_logger.info("Connecting to Discord...")
         await bot.start(DISCORD_TOKEN)
 
@@ -134,6 +175,9 @@ async def shutdown_bot():
             await bot.close()
             app_logger.info("✅ Discord connection closed")
 
+        await log_control.stop_admin_socket()
+        log_control.reset()
+
         await shutdown_database()
 
         if error_notifier:
@@ -1,3 +1,4 @@
+import logging
 import random
 import re
 from collections import deque
@@ -9,7 +10,7 @@ from discord.ext import tasks
 from dotenv import load_dotenv
 
 from bot import bot
-from logger.logger_setup import get_logger, log_performance, log_context
+from logger.logger_setup import get_logger, log_performance, log_context, Lazy
 
 load_dotenv()
 
@@ -110,10 +111,10 @@ def _stream_url_ok(url: Optional[str]) -> bool:
 
     is_valid = bool(STREAM_URL_PATTERN.search(url))
     if is_valid:
-        logger.debug(f"Streaming URL validation passed: {url}")
+        logger.debug("Streaming URL validation passed: %s", url)
     else:
         logger.warning(f"Streaming URL validation failed - invalid format: {url}")
-        logger.debug(f"URL must match pattern: {STREAM_URL_PATTERN.pattern}")
+        logger.debug("URL must match pattern: %s", STREAM_URL_PATTERN.pattern)
 
     return is_valid
 
@@ -125,19 +126,18 @@ def _runtime_placeholders() -> Dict[str, str]:
 
     # Safe accessors for dynamic values
     guilds = len(getattr(bot, "guilds", []) or [])
-    logger.debug(f"Bot is connected to {guilds} guilds")
+    logger.debug("Bot is connected to %s guilds", guilds)
 
     users = 0
     try:
         if bot.guilds:
-            guild_member_counts = []
-            for guild in bot.guilds:
-                member_count = guild.member_count or 0
-                guild_member_counts.append((guild.name, guild.id, member_count))
-                users += member_count
-
-            logger.debug(f"Guild member count breakdown: {guild_member_counts}")
-            logger.info(f"Total user count across all guilds: {users}")
+            users = sum(guild.member_count or 0 for guild in bot.guilds)
+
+            # The per-guild breakdown is only built when someone is reading DEBUG output
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Guild member count breakdown: %s",
+                             [(guild.name, guild.id, guild.member_count or 0) for guild in bot.guilds])
+            logger.info("Total user count across all guilds: %s", users)
         else:
             logger.warning("Bot is not connected to any guilds")
     except Exception as e:
@@ -145,18 +145,18 @@ def _runtime_placeholders() -> Dict[str, str]:
         users = 0
 
     latency_ms = 0
-    logger.debug(f"latency reset - {latency_ms}")
+    logger.debug("latency reset - %s", latency_ms)
     try:
         raw_latency = bot.latency or 0
         latency_ms = int(raw_latency * 1000)
 
         # Log latency quality
         if latency_ms < 100:
-            logger.debug(f"Excellent latency: {latency_ms}ms (raw: {raw_latency:.4f}s)")
+            logger.debug("Excellent latency: %sms (raw: %.4fs)", latency_ms, raw_latency)
         elif latency_ms < 300:
-            logger.debug(f"Good latency: {latency_ms}ms (raw: {raw_latency:.4f}s)")
+            logger.debug("Good latency: %sms (raw: %.4fs)", latency_ms, raw_latency)
         elif latency_ms < 500:
-            logger.info(f"Fair latency: {latency_ms}ms (raw: {raw_latency:.4f}s)")
+            logger.info("Fair latency: %sms (raw: %.4fs)", latency_ms, raw_latency)
         else:
             logger.warning(f"High latency detected: {latency_ms}ms (raw: {raw_latency:.4f}s)")
 
@@ -170,13 +170,13 @@ def _runtime_placeholders() -> Dict[str, str]:
         "latency_ms": str(latency_ms),
     }
 
-    logger.info(f"Runtime placeholders generated: {placeholders}")
+    logger.info("Runtime placeholders generated: %s", placeholders)
     return placeholders
 
 
 def _format_phrase(phrase: str) -> str:
     """Format phrase with placeholders and comprehensive error handling."""
-    logger.debug(f"Formatting phrase: '{phrase}'")
+    logger.debug("Formatting phrase: '%s'", phrase)
 
     if not phrase:
         logger.warning("Empty phrase provided for formatting")
@@ -187,15 +187,15 @@ def _format_phrase(phrase: str) -> str:
         formatted = phrase.format(**placeholders)
 
         if formatted != phrase:
-            logger.debug(f"Phrase formatting successful: '{phrase}' -> '{formatted}'")
+            logger.debug("Phrase formatting successful: '%s' -> '%s'", phrase, formatted)
         else:
-            logger.debug(f"Phrase contains no placeholders: '{phrase}'")
+            logger.debug("Phrase contains no placeholders: '%s'", phrase)
 
         return formatted
 
     except KeyError as e:
         logger.error(f"Missing placeholder in phrase '{phrase}': {e}")
-        logger.debug(f"Available placeholders: {list(_runtime_placeholders().keys())}")
+        logger.debug("Available placeholders: %s", Lazy(lambda: list(_runtime_placeholders().keys())))
         return phrase
     except Exception as e:
         logger.error(f"Unexpected error formatting phrase '{phrase}': {e}", exc_info=True)
@@ -206,19 +206,19 @@ def _format_phrase(phrase: str) -> str:
 def _choose_status_type() -> str:
     """Choose a status type with detailed candidate analysis."""
     logger.debug("Starting status type selection process")
-    logger.debug(f"Recent types to avoid (last {NO_REPEAT_WINDOW}): {list(_last_types)}")
+    logger.debug("Recent types to avoid (last %s): %s", NO_REPEAT_WINDOW, Lazy(lambda: list(_last_types)))
 
     # Build a candidate pool with weights, excluding recent types and invalid streaming
     candidates = []
     excluded_reasons = {}
 
     for status_type, weight in STATUS_TYPE_WEIGHTS.items():
-        logger.debug(f"Evaluating status type: {status_type} (weight: {weight})")
+        logger.debug("Evaluating status type: %s (weight: %s)", status_type, weight)
 
         # Check if recently used
         if status_type in _last_types:
             excluded_reasons[status_type] = "recently used"
-            logger.debug(f"Excluding {status_type}: recently used")
+            logger.debug("Excluding %s: recently used", status_type)
             continue
 
         # Special handling for streaming
@@ -229,31 +229,31 @@ def _choose_status_type() -> str:
 
             if not _stream_url_ok(url):
                 excluded_reasons[status_type] = "invalid URL"
-                logger.debug(f"Excluding {status_type}: invalid streaming URL")
+                logger.debug("Excluding %s: invalid streaming URL", status_type)
                 continue
 
             if not phrases:
                 excluded_reasons[status_type] = "no phrases"
-                logger.debug(f"Excluding {status_type}: no phrases available")
+                logger.debug("Excluding %s: no phrases available", status_type)
                 continue
 
-            logger.debug(f"Streaming type validated: URL={url}, phrases_count={len(phrases)}")
+            logger.debug("Streaming type validated: URL=%s, phrases_count=%s", url, len(phrases))
         else:
             # Regular status type validation
             phrases = status_options.get(status_type, [])
             if not phrases:
                 excluded_reasons[status_type] = "no phrases"
-                logger.debug(f"Excluding {status_type}: no phrases available")
+                logger.debug("Excluding %s: no phrases available", status_type)
                 continue
 
-            logger.debug(f"Status type {status_type} validated: phrases_count={len(phrases)}")
+            logger.debug("Status type %s validated: phrases_count=%s", status_type, len(phrases))
 
         candidates.append((status_type, weight))
-        logger.debug(f"Added {status_type} to candidates pool")
+        logger.debug("Added %s to candidates pool", status_type)
 
     # Log exclusion summary
     if excluded_reasons:
-        logger.info(f"Status types excluded from selection: {excluded_reasons}")
+        logger.info("Status types excluded from selection: %s", excluded_reasons)
 
     # Fallback handling
     if not candidates:
@@ -276,14 +276,15 @@ def _choose_status_type() -> str:
     types, weights = zip(*candidates)
     total_weight = sum(weights)
 
-    logger.debug(f"Candidate pool: {dict(candidates)} (total weight: {total_weight})")
+    logger.debug("Candidate pool: %s (total weight: %s)", Lazy(lambda: dict(candidates)), total_weight)
 
     chosen = random.choices(types, weights=weights, k=1)[0]
     chosen_weight = dict(candidates)[chosen]
     selection_probability = (chosen_weight / total_weight) * 100
 
-    logger.info(f"Status type selected: {chosen} (weight: {chosen_weight}, probability: {selection_probability:.1f}%)")
-    logger.debug(f"Selection from candidates: {dict(candidates)}")
+    logger.info("Status type selected: %s (weight: %s, probability: %.1f%%)",
+                chosen, chosen_weight, selection_probability)
+    logger.debug("Selection from candidates: %s", Lazy(lambda: dict(candidates)))
 
     return chosen
 
@@ -296,7 +297,7 @@ def get_random_status() -> Dict[str, str]:
     with log_context(logger, "status_type_selection"):
         status_type = _choose_status_type()
 
-    logger.info(f"Selected status type: {status_type}")
+    logger.info("Selected status type: %s", status_type)
 
     try:
         if status_type == "streaming":
@@ -308,19 +309,19 @@ def get_random_status() -> Dict[str, str]:
             phrases: List[str] = streaming_config["phrases"]
             url: str = streaming_config["url"]
 
-            logger.debug(f"Streaming config - URL: {url}, available phrases: {len(phrases)}")
+            logger.debug("Streaming config - URL: %s, available phrases: %s", url, len(phrases))
 
             if not phrases:
                 logger.error("No streaming phrases available despite earlier validation")
                 raise ValueError("No streaming phrases available")
 
             selected_phrase = random.choice(phrases)
-            logger.debug(f"Raw streaming phrase selected: '{selected_phrase}'")
+            logger.debug("Raw streaming phrase selected: '%s'", selected_phrase)
 
             name = _format_phrase(selected_phrase)
 
             result = {"type": status_type, "name": name, "url": url}
-            logger.info(f"Generated streaming status: type={status_type}, name='{name}', url={url}")
+            logger.info("Generated streaming status: type=%s, name='%s', url=%s", status_type, name, url)
 
             return result
 
@@ -334,15 +335,15 @@ def get_random_status() -> Dict[str, str]:
             logger.error(f"Invalid phrase list type for {status_type}: {type(phrase_list)}")
             raise ValueError(f"Invalid phrase configuration for {status_type}")
 
-        logger.debug(f"Available phrases for {status_type}: {len(phrase_list)}")
+        logger.debug("Available phrases for %s: %s", status_type, len(phrase_list))
 
         selected_phrase = random.choice(phrase_list)
-        logger.debug(f"Raw phrase selected for {status_type}: '{selected_phrase}'")
+        logger.debug("Raw phrase selected for %s: '%s'", status_type, selected_phrase)
 
         formatted_phrase = _format_phrase(selected_phrase)
 
         result = {"type": status_type, "name": formatted_phrase}
-        logger.info(f"Generated {status_type} status: '{formatted_phrase}'")
+        logger.info("Generated %s status: '%s'", status_type, formatted_phrase)
 
         return result
 
@@ -352,7 +353,7 @@ def get_random_status() -> Dict[str, str]:
 
         # Emergency fallback
         fallback_status = {"type": "playing", "name": "with server stats ⚙️"}
-        logger.info(f"Emergency fallback status generated: {fallback_status}")
+        logger.info("Emergency fallback status generated: %s", fallback_status)
         return fallback_status
 
 
@@ -362,7 +363,7 @@ def _build_activity(random_status: Dict[str, str]) -> discord.BaseActivity:
     status_type = random_status.get("type", "unknown")
     name = random_status.get("name", "")
 
-    logger.debug(f"Building Discord activity: type={status_type}, name='{name}'")
+    logger.debug("Building Discord activity: type=%s, name='%s'", status_type, name)
 
     if not name:
         logger.warning(f"Empty activity name for type {status_type}")
@@ -370,19 +371,19 @@ def _build_activity(random_status: Dict[str, str]) -> discord.BaseActivity:
     try:
         if status_type == "playing":
             activity = discord.Game(name=name)
-            logger.debug(f"Created Game activity: {name}")
+            logger.debug("Created Game activity: %s", name)
 
         elif status_type == "watching":
             activity = discord.Activity(type=discord.ActivityType.watching, name=name)
-            logger.debug(f"Created watching activity: {name}")
+            logger.debug("Created watching activity: %s", name)
 
         elif status_type == "listening":
             activity = discord.Activity(type=discord.ActivityType.listening, name=name)
-            logger.debug(f"Created listening activity: {name}")
+            logger.debug("Created listening activity: %s", name)
 
         elif status_type == "competing":
             activity = discord.Activity(type=discord.ActivityType.competing, name=name)
-            logger.debug(f"Created competing activity: {name}")
+            logger.debug("Created competing activity: %s", name)
 
         elif status_type == "streaming":
             url = random_status.get("url", "")
@@ -391,13 +392,13 @@ def _build_activity(random_status: Dict[str, str]) -> discord.BaseActivity:
                 raise ValueError("Streaming activity requires URL")
 
             activity = discord.Streaming(name=name, url=url)
-            logger.debug(f"Created streaming activity: {name} -> {url}")
+            logger.debug("Created streaming activity: %s -> %s", name, url)
 
         else:
             logger.warning(f"Unknown activity type '{status_type}', defaulting to Game")
             activity = discord.Game(name=name)
 
-        logger.debug(f"Successfully built {type(activity).__name__} activity")
+        logger.debug("Successfully built %s activity", type(activity).__name__)
         return activity
 
     except Exception as e:
@@ -412,19 +413,19 @@ def _randomize_interval():
     """Randomize the next rotation interval with logging."""
     new_seconds = random.randint(ROTATE_MIN_SECONDS, ROTATE_MAX_SECONDS)
 
-    logger.debug(f"Randomizing interval: min={ROTATE_MIN_SECONDS}s, max={ROTATE_MAX_SECONDS}s")
-    logger.info(f"Next status rotation scheduled in {new_seconds}s ({new_seconds / 60:.1f} minutes)")
+    logger.debug("Randomizing interval: min=%ss, max=%ss", ROTATE_MIN_SECONDS, ROTATE_MAX_SECONDS)
+    logger.info("Next status rotation scheduled in %ss (%.1f minutes)", new_seconds, new_seconds / 60)
 
     try:
         old_interval = getattr(rotate_status, 'seconds', 'unknown')
         rotate_status.change_interval(seconds=new_seconds)
 
-        logger.debug(f"Interval changed successfully: {old_interval}s -> {new_seconds}s")
+        logger.debug("Interval changed successfully: %ss -> %ss", old_interval, new_seconds)
 
         # Log interval distribution info
         range_size = ROTATE_MAX_SECONDS - ROTATE_MIN_SECONDS
         position_pct = ((new_seconds - ROTATE_MIN_SECONDS) / range_size) * 100
-        logger.debug(f"Interval position within range: {position_pct:.1f}%")
+        logger.debug("Interval position within range: %.1f%%", position_pct)
 
     except Exception as e:
         logger.error(f"Failed to change loop interval to {new_seconds}s: {e}", exc_info=True)
@@ -452,8 +453,8 @@ async def rotate_status():
             status_type = random_status["type"]
             _last_types.append(status_type)
 
-            logger.info(f"Status rotation completed: {status_type} → '{random_status.get('name', '')}'")
-            logger.debug(f"Recent types history: {list(_last_types)}")
+            logger.info("Status rotation completed: %s → '%s'", status_type, random_status.get('name', ''))
+            logger.debug("Recent types history: %s", Lazy(lambda: list(_last_types)))
 
             # Schedule next rotation
             logger.debug("Step 4: Scheduling next rotation")
@@ -489,12 +490,12 @@ async def _rotate_status_before_loop():
         latency = int((bot.latency or 0) * 1000)
 
         logger.info("📊 Initial bot metrics:")
-        logger.info(f"   • Guilds: {guild_count}")
-        logger.info(f"   • Users: {user_count:,}")
-        logger.info(f"   • Latency: {latency}ms")
-        logger.info(f"   • Rotation interval: {ROTATE_MIN_SECONDS}-{ROTATE_MAX_SECONDS} seconds")
-        logger.info(f"   • No-repeat window: {NO_REPEAT_WINDOW} rotations")
-        logger.info(f"   • Available status types: {len(STATUS_TYPE_WEIGHTS)}")
+        logger.info("   • Guilds: %s", guild_count)
+        logger.info("   • Users: %s", format(user_count, ","))
+        logger.info("   • Latency: %sms", latency)
+        logger.info("   • Rotation interval: %s-%s seconds", ROTATE_MIN_SECONDS, ROTATE_MAX_SECONDS)
+        logger.info("   • No-repeat window: %s rotations", NO_REPEAT_WINDOW)
+        logger.info("   • Available status types: %s", len(STATUS_TYPE_WEIGHTS))
 
         # Validate configuration
         total_phrases = sum(
@@ -503,7 +504,7 @@ async def _rotate_status_before_loop():
             else 0
             for phrases in status_options.values()
         )
-        logger.info(f"   • Total status phrases available: {total_phrases}")
+        logger.info("   • Total status phrases available: %s", total_phrases)
 
     except Exception as e:
         logger.warning(f"Failed to log initial bot metrics: {e}")
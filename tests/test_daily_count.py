@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from database.guild_manager import GuildManager
+from database.storage.sqlite import SQLiteStorage
+
+GUILD_ID = 1190342658813988999
+
+
+class FakeCore:
+    def add_connection_state_listener(self, callback):
+        pass
+
+
+@pytest.fixture
+def manager(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "stygian.db"))
+    asyncio.run(storage.initialize())
+    yield GuildManager(FakeCore(), storage=storage)
+    asyncio.run(storage.close())
+
+
+def log(manager, success=True):
+    asyncio.run(manager.log_forwarded_message({"guild_id": GUILD_ID, "rule_id": "r", "success": success}))
+
+
+def test_daily_count_served_from_memory(manager):
+    log(manager)
+    assert asyncio.run(manager.get_daily_message_count(GUILD_ID)) == 1
+
+    log(manager)
+    log(manager, success=False)
+    assert asyncio.run(manager.get_daily_message_count(GUILD_ID)) == 2
+    assert manager.metrics["daily_count_misses"] == 1
+    assert manager.metrics["daily_count_hits"] == 1
+
+
+def test_daily_count_reconciles_with_storage(manager):
+    manager.daily_count_ttl = 0
+    assert asyncio.run(manager.get_daily_message_count(GUILD_ID)) == 0
+
+    # Written by another process, bypassing this manager
+    asyncio.run(manager.storage.insert_message_log(
+        {"guild_id": str(GUILD_ID), "forwarded_at": manager._daily_counts[str(GUILD_ID)][0], "success": True}))
+    assert asyncio.run(manager.get_daily_message_count(GUILD_ID)) == 1
+    assert manager.metrics["daily_count_misses"] == 2
+
+
+def test_forget_guild_drops_daily_count(manager):
+    asyncio.run(manager.get_daily_message_count(GUILD_ID))
+    manager._forget_guild(str(GUILD_ID))
+    assert str(GUILD_ID) not in manager._daily_counts
@@ -0,0 +1,76 @@
+import json
+import logging
+import sys
+
+import pytest
+
+from logger.logger_setup import JSONFormatter
+
+
+def make_record(msg="hello %s", args=("world",), exc_info=None, **extra):
+    logger = logging.getLogger("test.json")
+    return logger.makeRecord("test.json", logging.WARNING, __file__, 42, msg, args, exc_info,
+                             func="handler", extra=extra or None)
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+def formatter(request):
+    return JSONFormatter(use_orjson=request.param)
+
+
+def test_standard_fields(formatter):
+    entry = json.loads(formatter.format(make_record()))
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "WARNING"
+    assert entry["logger"] == "test.json"
+    assert entry["line"] == 42 and entry["function"] == "handler"
+    assert entry["timestamp"].endswith("Z")
+
+
+def test_logrecord_attributes_are_not_emitted(formatter):
+    entry = json.loads(formatter.format(make_record()))
+    for key in ("msg", "args", "pathname", "levelno", "created", "msecs", "exc_info", "stack_info",
+                "processName", "relativeCreated", "correlation_tag"):
+        assert key not in entry
+
+
+def test_extra_fields_are_emitted(formatter):
+    entry = json.loads(formatter.format(make_record(guild_id=1190342658813988999, stages_ms={"send": 1.5})))
+    assert entry["guild_id"] == 1190342658813988999
+    assert entry["stages_ms"] == {"send": 1.5}
+
+
+def test_private_and_routing_keys_are_skipped(formatter):
+    record = make_record(log_route="database")
+    record._rate_limit_summary = True
+    entry = json.loads(formatter.format(record))
+    assert "log_route" not in entry and "_rate_limit_summary" not in entry
+
+
+def test_correlation_id_only_when_set(formatter):
+    record = make_record()
+    record.correlation_id, record.correlation_tag = None, ""
+    assert "correlation_id" not in json.loads(formatter.format(record))
+
+    record.correlation_id, record.correlation_tag = "msg-123", " [msg-123]"
+    entry = json.loads(formatter.format(record))
+    assert entry["correlation_id"] == "msg-123" and "correlation_tag" not in entry
+
+
+def test_unserializable_values_fall_back_to_repr(formatter):
+    class Opaque:
+        def __repr__(self):
+            return "<opaque>"
+
+    entry = json.loads(formatter.format(make_record(thing=Opaque(), huge=2 ** 70)))
+    assert entry["thing"] == "<opaque>"
+    assert entry["huge"] == 2 ** 70
+
+
+def test_exception_text(formatter):
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record(exc_info=sys.exc_info())
+    entry = json.loads(formatter.format(record))
+    assert "ValueError: boom" in entry["exception"]
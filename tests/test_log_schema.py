@@ -0,0 +1,95 @@
+import uuid
+from datetime import datetime, timezone
+
+import bson
+from bson.binary import Binary, UUID_SUBTYPE
+from bson.codec_options import CodecOptions
+from bson.int64 import Int64
+
+from database import log_schema
+
+RULE_ID = str(uuid.uuid4())
+# Snowflakes above 2**53 would lose precision as doubles
+GUILD_ID = 1190342658813988999
+FORWARDED_AT = datetime(2026, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)
+
+
+def legacy_log(**overrides):
+    log = {
+        "guild_id": str(GUILD_ID),
+        "rule_id": RULE_ID,
+        "source_channel_id": "1190342658813989001",
+        "destination_channel_id": 1190342658813989002,
+        "original_message_id": "1190342658813989003",
+        "success": True,
+        "forwarded_at": FORWARDED_AT,
+    }
+    log.update(overrides)
+    return log
+
+
+def bson_round_trip(document):
+    return bson.decode(bson.encode(document), codec_options=CodecOptions(tz_aware=True))
+
+
+def test_encode_uses_compact_types():
+    document = log_schema.encode_log(legacy_log())
+    assert document["v"] == log_schema.COMPACT_VERSION
+    assert isinstance(document["g"], Int64) and document["g"] == GUILD_ID
+    assert isinstance(document["d"], Int64)
+    assert isinstance(document["r"], Binary) and document["r"].subtype == UUID_SUBTYPE
+    assert "e" not in document and "success" not in document
+
+
+def test_round_trip_through_bson():
+    log = legacy_log()
+    decoded = log_schema.decode_log(bson_round_trip(log_schema.encode_log(log)))
+    assert decoded["guild_id"] == str(GUILD_ID)
+    assert decoded["rule_id"] == RULE_ID
+    assert decoded["source_channel_id"] == log["source_channel_id"]
+    assert decoded["destination_channel_id"] == str(log["destination_channel_id"])
+    assert decoded["original_message_id"] == log["original_message_id"]
+    assert decoded["forwarded_at"] == FORWARDED_AT
+    assert decoded["success"] is True and "error" not in decoded
+
+
+def test_failure_round_trips_with_error():
+    decoded = log_schema.decode_log(bson_round_trip(log_schema.encode_log(
+        legacy_log(success=False, error="403 Forbidden"))))
+    assert decoded["success"] is False
+    assert decoded["error"] == "403 Forbidden"
+
+
+def test_failure_without_message_keeps_failure_flag():
+    document = log_schema.encode_log(legacy_log(success=False))
+    assert document["e"] == ""
+    assert log_schema.decode_log(document)["success"] is False
+
+
+def test_degraded_forward_is_a_success():
+    decoded = log_schema.decode_log(log_schema.encode_log(legacy_log(degraded="Fallback used")))
+    assert decoded["success"] is True
+    assert decoded["degraded"] == "Fallback used"
+
+
+def test_non_snowflake_and_non_uuid_ids_are_kept():
+    document = log_schema.encode_log(legacy_log(rule_id="legacy-rule", source_channel_id="<#1>"))
+    assert document["r"] == "legacy-rule"
+    assert document["s"] == "<#1>"
+    decoded = log_schema.decode_log(document)
+    assert decoded["rule_id"] == "legacy-rule" and decoded["source_channel_id"] == "<#1>"
+
+
+def test_legacy_documents_decode_unchanged():
+    log = legacy_log()
+    assert log_schema.decode_log(log) is log
+
+
+def test_guild_since_filter_matches_both_shapes():
+    query = log_schema.guild_since_filter(str(GUILD_ID), FORWARDED_AT, RULE_ID, successful_only=True)
+    legacy, compact = query["$or"]
+    assert legacy == {"guild_id": str(GUILD_ID), "forwarded_at": {"$gte": FORWARDED_AT},
+                      "rule_id": RULE_ID, "success": True}
+    assert compact["g"] == Int64(GUILD_ID)
+    assert compact["r"] == Binary.from_uuid(uuid.UUID(RULE_ID))
+    assert compact["e"] == {"$exists": False}
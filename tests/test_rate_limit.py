@@ -0,0 +1,120 @@
+import logging
+
+import pytest
+
+from logger import rate_limit
+from logger.rate_limit import RateLimitFilter, parse_limit
+from logger.timing import TimingRegistry
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def limited(request):
+    """A fresh logger with a 3-per-10s limiter and a handler collecting what gets through."""
+    registry = TimingRegistry()
+    limiter = RateLimitFilter(burst=3, window=10, registry=registry)
+    limiter._sweeper = object()  # Sweeps are driven by the tests
+    logger = logging.getLogger(f"test.rate_limit.{request.node.name}")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addFilter(limiter)
+    handler = ListHandler()
+    logger.addHandler(handler)
+    yield logger, limiter, handler, registry
+    logger.removeHandler(handler)
+    logger.removeFilter(limiter)
+
+
+def warn_from_one_site(logger, count, message="disk full"):
+    for _ in range(count):
+        logger.warning(message)
+
+
+def test_parse_limit():
+    assert parse_limit("20/60") == (20, 60.0)
+    assert parse_limit("5") == (5, 60.0)
+    assert parse_limit("0") == (0, 0.0)
+    assert parse_limit("off") == (0, 0.0)
+
+
+def test_suppresses_after_burst(limited, clock):
+    logger, limiter, handler, registry = limited
+    warn_from_one_site(logger, 10)
+    assert len(handler.records) == 3
+    assert registry.counters()["log.rate_limit.suppressed"] == 7
+    assert registry.counters()[f"log.rate_limit.suppressed.{logger.name}"] == 7
+
+
+def test_call_sites_are_limited_separately(limited, clock):
+    logger, limiter, handler, registry = limited
+    for _ in range(5):
+        logger.warning("first site")
+    for _ in range(5):
+        logger.warning("second site")
+    assert [record.getMessage() for record in handler.records] == ["first site"] * 3 + ["second site"] * 3
+
+
+def test_below_min_level_is_never_limited(limited, clock):
+    logger, limiter, handler, registry = limited
+    for _ in range(10):
+        logger.info("chatty")
+    assert len(handler.records) == 10
+
+
+def test_summary_when_site_logs_again(limited, clock):
+    logger, limiter, handler, registry = limited
+    warn_from_one_site(logger, 8)
+    clock[0] += 10
+    warn_from_one_site(logger, 1)
+
+    summary, record = handler.records[3:]
+    assert summary._rate_limit_summary
+    assert summary.levelno == logging.WARNING
+    assert "Suppressed 5 similar record(s)" in summary.getMessage()
+    assert summary.getMessage().endswith("last one: disk full")
+    assert record.getMessage() == "disk full"
+    assert registry.counters()["log.rate_limit.summaries"] == 1
+
+
+def test_sweep_summarizes_quiet_sites_and_forgets_idle_ones(limited, clock):
+    logger, limiter, handler, registry = limited
+    warn_from_one_site(logger, 4)
+    limiter.sweep()
+    assert len(handler.records) == 3  # Window still open
+
+    clock[0] += 10
+    limiter.sweep()
+    assert "Suppressed 1 similar record(s)" in handler.records[-1].getMessage()
+    assert limiter.stats()["sites"] == 1
+
+    clock[0] += 20
+    limiter.sweep()
+    assert limiter.stats()["sites"] == 0
+    assert len(handler.records) == 4
+
+
+def test_per_logger_limits(limited, clock):
+    logger, limiter, handler, registry = limited
+    limiter.configure(logger.name.rsplit(".", 1)[0], 1, 10)
+    assert limiter.limit_for(logger.name) == (1, 10)
+    warn_from_one_site(logger, 3)
+    assert len(handler.records) == 1
+
+    limiter.configure(logger.name, 0)
+    warn_from_one_site(logger, 3)
+    assert len(handler.records) == 4
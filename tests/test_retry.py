@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import pytest
+from pymongo.errors import (
+    AutoReconnect,
+    ConnectionFailure,
+    DuplicateKeyError,
+    NetworkTimeout,
+    NotPrimaryError,
+    OperationFailure,
+    ServerSelectionTimeoutError,
+    WTimeoutError,
+)
+
+from database.retry import CircuitBreaker, ErrorClass, classify_error, should_retry
+
+
+def labelled(error, *labels):
+    for label in labels:
+        error._add_error_label(label)
+    return error
+
+
+@pytest.mark.parametrize("error, expected", [
+    (DuplicateKeyError("E11000 duplicate key", 11000), ErrorClass.NON_RETRYABLE),
+    (labelled(DuplicateKeyError("E11000", 11000), "RetryableWriteError"), ErrorClass.NON_RETRYABLE),
+    (NotPrimaryError("not primary"), ErrorClass.NOT_PRIMARY),
+    (ServerSelectionTimeoutError("no servers"), ErrorClass.NOT_PRIMARY),
+    (NetworkTimeout("timed out"), ErrorClass.NETWORK),
+    (AutoReconnect("connection reset"), ErrorClass.NETWORK),
+    (ConnectionFailure("refused"), ErrorClass.NETWORK),
+    (WTimeoutError("waiting for replication", 64), ErrorClass.NETWORK),
+    (asyncio.TimeoutError(), ErrorClass.NETWORK),
+    # A labelled connection failure may still have been applied
+    (labelled(NetworkTimeout("timed out"), "RetryableWriteError"), ErrorClass.NETWORK),
+    (labelled(OperationFailure("write conflict", 112), "TransientTransactionError"), ErrorClass.TRANSIENT),
+    (labelled(OperationFailure("retry me", 262), "RetryableWriteError"), ErrorClass.TRANSIENT),
+    (OperationFailure("stepped down", 189), ErrorClass.NOT_PRIMARY),
+    (OperationFailure("not writable primary", 10107), ErrorClass.NOT_PRIMARY),
+    (OperationFailure("host unreachable", 6), ErrorClass.TRANSIENT),
+    (OperationFailure("bad query", 2), ErrorClass.NON_RETRYABLE),
+    (ValueError("programming error"), ErrorClass.NON_RETRYABLE),
+])
+def test_classify_error(error, expected):
+    assert classify_error(error) is expected
+
+
+@pytest.mark.parametrize("error_class, idempotent, expected", [
+    (ErrorClass.TRANSIENT, False, True),
+    (ErrorClass.NOT_PRIMARY, False, True),
+    (ErrorClass.NETWORK, True, True),
+    (ErrorClass.NETWORK, False, False),
+    (ErrorClass.NON_RETRYABLE, True, False),
+])
+def test_should_retry(error_class, idempotent, expected):
+    assert should_retry(error_class, idempotent) is expected
+
+
+def test_circuit_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_probe_closes_or_reopens(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    # One probe per reset window
+    now[0] += 10
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()
+
+    # A failed probe re-opens the circuit at once
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_unreported_probe_does_not_wedge_half_open(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    now[0] += 10
+    assert breaker.allow()  # Probe is cancelled and never reports back
+
+    now[0] += 10
+    assert breaker.allow()
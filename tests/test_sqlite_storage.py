@@ -0,0 +1,119 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from database.storage.sqlite import SQLiteStorage
+
+GUILD_ID = "1190342658813988999"
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "stygian.db"))
+    asyncio.run(storage.initialize())
+    yield storage
+    asyncio.run(storage.close())
+
+
+def make_rule(**overrides):
+    rule = {"rule_id": str(uuid.uuid4()), "rule_name": "news", "source_channel_id": 1,
+            "destination_channel_id": 2, "is_active": True, "settings": {}, "version": 1}
+    rule.update(overrides)
+    return rule
+
+
+def create_guild(storage, max_rules=None):
+    settings = {"_id": GUILD_ID, "guild_name": "Test", "rules": []}
+    if max_rules is not None:
+        settings["limits"] = {"max_rules": max_rules}
+    asyncio.run(storage.create_guild(settings))
+
+
+def test_update_rule_compare_and_swap(storage):
+    create_guild(storage)
+    rule = make_rule()
+    assert asyncio.run(storage.add_rule(GUILD_ID, rule, 3, 0))
+
+    assert asyncio.run(storage.update_rule(rule["rule_id"], {"rule_name": "renamed"}, 1))
+    stored = asyncio.run(storage.get_rule(rule["rule_id"]))
+    assert stored["rule_name"] == "renamed" and stored["version"] == 2
+
+    # A writer still holding version 1 loses
+    assert not asyncio.run(storage.update_rule(rule["rule_id"], {"rule_name": "stale"}, 1))
+    assert asyncio.run(storage.get_rule(rule["rule_id"]))["rule_name"] == "renamed"
+
+    # Without an expected version the update is unconditional
+    assert asyncio.run(storage.update_rule(rule["rule_id"], {"settings.formatting.prefix": "!"}, None))
+    stored = asyncio.run(storage.get_rule(rule["rule_id"]))
+    assert stored["settings"] == {"formatting": {"prefix": "!"}} and stored["version"] == 3
+
+
+def test_update_rule_bumps_guild_rules_version(storage):
+    create_guild(storage)
+    rule = make_rule()
+    asyncio.run(storage.add_rule(GUILD_ID, rule, 3, 0))
+    before = asyncio.run(storage.get_guild(GUILD_ID))["rules_version"]
+    asyncio.run(storage.update_rule(rule["rule_id"], {"is_active": False}, None))
+    assert asyncio.run(storage.get_guild(GUILD_ID))["rules_version"] == before + 1
+
+
+def test_update_missing_rule(storage):
+    assert not asyncio.run(storage.update_rule("missing", {"rule_name": "x"}, None))
+
+
+def test_add_rule_enforces_guild_limit(storage):
+    create_guild(storage, max_rules=2)
+    assert asyncio.run(storage.add_rule(GUILD_ID, make_rule(), 5, 0))
+    assert asyncio.run(storage.add_rule(GUILD_ID, make_rule(), 5, 0))
+    assert not asyncio.run(storage.add_rule(GUILD_ID, make_rule(), 5, 0))
+    assert len(asyncio.run(storage.list_rules(GUILD_ID))) == 2
+
+
+def test_add_rule_premium_minimum_overrides_guild_limit(storage):
+    create_guild(storage, max_rules=1)
+    assert asyncio.run(storage.add_rule(GUILD_ID, make_rule(), 3, 3))
+    assert asyncio.run(storage.add_rule(GUILD_ID, make_rule(), 3, 3))
+    assert asyncio.run(storage.add_rule(GUILD_ID, make_rule(), 3, 3))
+    assert not asyncio.run(storage.add_rule(GUILD_ID, make_rule(), 3, 3))
+
+
+def test_add_rule_default_limit_and_duplicates(storage):
+    create_guild(storage)
+    rule = make_rule()
+    assert asyncio.run(storage.add_rule(GUILD_ID, rule, 1, 0))
+    assert not asyncio.run(storage.add_rule(GUILD_ID, rule, 5, 0))  # Same rule_id
+    assert not asyncio.run(storage.add_rule(GUILD_ID, make_rule(), 1, 0))
+    assert not asyncio.run(storage.add_rule("404", make_rule(), 5, 0))  # Unknown guild
+
+
+def test_add_rule_concurrently_never_exceeds_limit(storage):
+    create_guild(storage, max_rules=3)
+
+    async def add_many():
+        return await asyncio.gather(*(storage.add_rule(GUILD_ID, make_rule(), 3, 0) for _ in range(10)))
+
+    assert sum(asyncio.run(add_many())) == 3
+    assert len(asyncio.run(storage.list_rules(GUILD_ID))) == 3
+
+
+def test_count_messages_counts_delivered_forwards(storage):
+    now = datetime.now(timezone.utc)
+    for success in (True, True, False):
+        asyncio.run(storage.insert_message_log({"guild_id": GUILD_ID, "success": success, "forwarded_at": now}))
+    asyncio.run(storage.insert_message_log({"guild_id": GUILD_ID, "success": True, "forwarded_at": now,
+                                            "degraded": "Fallback used"}))
+    asyncio.run(storage.insert_message_log({"guild_id": GUILD_ID, "success": True,
+                                            "forwarded_at": now - timedelta(days=2)}))
+    assert asyncio.run(storage.count_messages(GUILD_ID, now - timedelta(days=1))) == 3
+
+
+def test_reinitialize_after_close(storage):
+    create_guild(storage)
+    asyncio.run(storage.close())
+    assert not storage.is_healthy()
+
+    asyncio.run(storage.initialize())
+    assert storage.is_healthy()
+    assert asyncio.run(storage.get_guild(GUILD_ID))["guild_name"] == "Test"
@@ -0,0 +1,110 @@
+"""
+JSONFormatter benchmark.
+
+Formats the same batch of log records with the previous JSONFormatter implementation and
+with the current one (stdlib json, and orjson when it is installed), and prints the
+throughput of each. Records carry a couple of `extra` fields, like the bot's own logs.
+
+The previous formatter raises on extras json can't encode, so only the current formatter
+is also run against a batch with a non-serializable extra.
+
+Usage:
+    python -m tools.bench_json_formatter --records 100000
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logger.logger_setup import JSONFormatter, orjson  # noqa: E402
+
+
+class LegacyJSONFormatter(logging.Formatter):
+    """JSONFormatter as it was before the fast path, kept here as the baseline."""
+
+    def format(self, record):
+        log_entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat() + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'thread': record.thread,
+            'thread_name': record.threadName,
+        }
+
+        if record.exc_info:
+            log_entry['exception'] = self.formatException(record.exc_info)
+
+        for key, value in record.__dict__.items():
+            if key not in ['name', 'msg', 'args', 'levelname', 'levelno', 'pathname', 'filename',
+                           'module', 'exc_info', 'exc_text', 'stack_info', 'lineno', 'funcName',
+                           'created', 'msecs', 'relativeCreated', 'thread', 'threadName',
+                           'processName', 'process', 'message']:
+                log_entry[key] = value
+
+        return json.dumps(log_entry)
+
+
+def _records(count: int, unserializable: bool = False):
+    logger = logging.getLogger("bench.forward")
+    records = []
+    for i in range(count):
+        extra = {"guild_id": 1000000000000000000 + i % 500, "rule_id": f"rule-{i % 40}"}
+        if unserializable:
+            extra["channel"] = object()
+        records.append(logger.makeRecord(
+            logger.name, logging.INFO, __file__, 42, "✅ Forwarded message %s to %s", (i, i % 97), None,
+            func="on_message", extra=extra))
+    return records
+
+
+def _run(formatter: logging.Formatter, records) -> float:
+    start = time.perf_counter()
+    for record in records:
+        formatter.format(record)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100_000, help="records formatted per formatter")
+    parser.add_argument("--rounds", type=int, default=3, help="best of N rounds is reported")
+    args = parser.parse_args()
+
+    records = _records(args.records)
+    formatters = {
+        "legacy (json.dumps)": LegacyJSONFormatter(),
+        "current (stdlib json)": JSONFormatter(use_orjson=False),
+    }
+    if orjson is not None:
+        formatters["current (orjson)"] = JSONFormatter()
+    else:
+        print("orjson is not installed; skipping the orjson backend")
+
+    print(f"{args.records} records, best of {args.rounds} round(s):")
+    print(f"  {'formatter':<24} {'seconds':>9} {'records/s':>12} {'speedup':>8}")
+    baseline = None
+    for name, formatter in formatters.items():
+        elapsed = min(_run(formatter, records) for _ in range(args.rounds))
+        baseline = baseline or elapsed
+        print(f"  {name:<24} {elapsed:>9.3f} {args.records / elapsed:>12.0f} {baseline / elapsed:>7.2f}x")
+
+    awkward = _records(min(args.records, 10_000), unserializable=True)
+    try:
+        LegacyJSONFormatter().format(awkward[0])
+    except TypeError as e:
+        print(f"\nlegacy formatter on a non-serializable extra: {type(e).__name__}: {e}")
+    elapsed = _run(JSONFormatter(), awkward)
+    print(f"current formatter on {len(awkward)} records with a non-serializable extra: {elapsed:.3f}s, no errors")
+
+
+if __name__ == "__main__":
+    main()
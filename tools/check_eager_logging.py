@@ -0,0 +1,118 @@
+"""
+Eager logging checker.
+
+Flags DEBUG and INFO logging calls in hot modules whose message is built before the logger
+has decided whether to emit it: f-strings, str.format() calls, %-formatting or string
+concatenation. Use %-style arguments, Lazy(...) values or a LazyLogger callable instead,
+or guard expensive context with `if logger.isEnabledFor(logging.DEBUG):`.
+
+Calls inside such an isEnabledFor() guard are not flagged.
+
+Usage:
+    python -m tools.check_eager_logging            # the hot modules below
+    python -m tools.check_eager_logging path.py    # specific files
+Exits with status 1 when anything is flagged.
+"""
+import argparse
+import ast
+import os
+import sys
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules on the message, database or status rotation paths
+HOT_MODULES = [
+    "database/core.py",
+    "database/guild_manager.py",
+    "database/monitoring.py",
+    "database/pool_advisor.py",
+    "database/storage/mongo.py",
+    "database/storage/sqlite.py",
+    "extensions/forward/forward.py",
+    "extensions/forward/setup_helpers/channel_select.py",
+    "status/idle.py",
+]
+
+CHECKED_METHODS = {"debug", "info"}
+
+
+def _is_logger(node: ast.AST) -> bool:
+    """logger, self.logger, app_logger, ..."""
+    if isinstance(node, ast.Name):
+        return "log" in node.id.lower()
+    if isinstance(node, ast.Attribute):
+        return "log" in node.attr.lower()
+    return False
+
+
+def _eager_kind(message: ast.AST) -> str:
+    if isinstance(message, ast.JoinedStr) and any(isinstance(v, ast.FormattedValue) for v in message.values):
+        return "f-string"
+    if isinstance(message, ast.Call) and isinstance(message.func, ast.Attribute) and message.func.attr == "format":
+        return "str.format()"
+    if isinstance(message, ast.BinOp) and isinstance(message.op, ast.Mod):
+        return "%-formatting"
+    if isinstance(message, ast.BinOp) and isinstance(message.op, ast.Add):
+        return "concatenation"
+    return ""
+
+
+def _is_level_guard(test: ast.AST) -> bool:
+    """`if logger.isEnabledFor(...)`, possibly combined with other conditions."""
+    return any(isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+               and node.func.attr == "isEnabledFor" for node in ast.walk(test))
+
+
+class EagerLoggingVisitor(ast.NodeVisitor):
+    def __init__(self):
+        self.findings: List[Tuple[int, str, str]] = []
+        self._guards = 0
+
+    def visit_If(self, node: ast.If):
+        guarded = _is_level_guard(node.test)
+        self._guards += guarded
+        for child in node.body:
+            self.visit(child)
+        self._guards -= guarded
+        for child in node.orelse:
+            self.visit(child)
+
+    def visit_Call(self, node: ast.Call):
+        func = node.func
+        if (not self._guards and isinstance(func, ast.Attribute) and func.attr in CHECKED_METHODS
+                and _is_logger(func.value) and node.args):
+            kind = _eager_kind(node.args[0])
+            if kind:
+                self.findings.append((node.lineno, func.attr, kind))
+        self.generic_visit(node)
+
+
+def check_file(path: str) -> List[Tuple[int, str, str]]:
+    with open(path, encoding="utf-8") as handle:
+        tree = ast.parse(handle.read(), filename=path)
+    visitor = EagerLoggingVisitor()
+    visitor.visit(tree)
+    return visitor.findings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="files to check (default: the hot modules)")
+    args = parser.parse_args()
+
+    paths = args.paths or [os.path.join(ROOT, module) for module in HOT_MODULES]
+    total = 0
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        for lineno, level, kind in check_file(path):
+            print(f"{os.path.relpath(path, ROOT)}:{lineno}: eager {kind} in logger.{level}()")
+            total += 1
+
+    print(f"{total} eager logging call(s) in {len(paths)} file(s)")
+    sys.exit(1 if total else 0)
+
+
+if __name__ == "__main__":
+    main()
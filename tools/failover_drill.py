@@ -0,0 +1,89 @@
+"""
+Failover drill against a local replica set.
+
+Runs a steady mix of guild reads and writes through GuildManager, forces the primary to
+step down, and reports how long operations failed and how long the health monitor took to
+bring the connection back.
+
+Usage (MONGODB_URI must point at a throwaway replica set, e.g. a 3-node docker compose):
+    python -m tools.failover_drill --duration 60 --stepdown-after 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.core import DatabaseCore  # noqa: E402
+from database.guild_manager import GuildManager  # noqa: E402
+
+DRILL_GUILD_ID = "failover-drill"
+
+
+async def run_drill(duration: float, stepdown_after: float, stepdown_seconds: int, interval: float):
+    db = DatabaseCore(health_check_interval=2, degraded_check_interval=1.0, reconnect_after_failures=1)
+    guilds = GuildManager(db)
+    await db.initialize()
+    await guilds.setup_new_guild(DRILL_GUILD_ID, "Failover Drill")
+
+    transitions = []
+    db.add_connection_state_listener(lambda old, new: transitions.append((time.monotonic(), old, new)))
+
+    results = []  # (monotonic time, succeeded)
+    start = time.monotonic()
+    stepped_down = False
+
+    while time.monotonic() - start < duration:
+        if not stepped_down and time.monotonic() - start >= stepdown_after:
+            stepped_down = True
+            try:
+                await db.db_client.admin.command("replSetStepDown", stepdown_seconds, secondaryCatchUpPeriodSecs=5)
+            except Exception as e:
+                # The primary closes connections while stepping down, so an error here is expected
+                print(f"stepdown issued ({type(e).__name__})")
+
+        try:
+            await guilds.update_guild_settings(DRILL_GUILD_ID, {"drill_heartbeat": time.time()})
+            await guilds.get_guild_settings(DRILL_GUILD_ID)
+            results.append((time.monotonic(), True))
+        except Exception:
+            results.append((time.monotonic(), False))
+
+        await asyncio.sleep(interval)
+
+    await guilds.remove_guild_data(DRILL_GUILD_ID, "Failover Drill")
+    info = db.get_connection_info()
+    await db.close()
+
+    failures = [t for t, ok in results if not ok]
+    print(f"\noperations: {len(results)}  failed: {len(failures)}")
+    if failures:
+        print(f"client-visible outage: {failures[-1] - failures[0]:.2f}s "
+              f"(first failure at +{failures[0] - start:.2f}s)")
+
+    print("\nstate transitions:")
+    for at, old, new in transitions:
+        print(f"  +{at - start:7.2f}s  {old} -> {new}")
+
+    print("\nrecovery metrics:")
+    for key, value in info["recovery"].items():
+        print(f"  {key}: {value}")
+    print(f"  retried_operations: {info['metrics']['retried_operations']}")
+    print(f"  circuit_rejections: {info['metrics']['circuit_rejections']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=60.0, help="total drill length in seconds")
+    parser.add_argument("--stepdown-after", type=float, default=10.0, help="seconds before stepping down the primary")
+    parser.add_argument("--stepdown-seconds", type=int, default=30, help="how long the old primary stays ineligible")
+    parser.add_argument("--interval", type=float, default=0.1, help="pause between operation pairs in seconds")
+    args = parser.parse_args()
+
+    asyncio.run(run_drill(args.duration, args.stepdown_after, args.stepdown_seconds, args.interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+message_logs size report.
+
+Reports how much the compact log schema (database/log_schema.py) saves, in two parts:
+
+1. The live collection: document count per schema version, average BSON bytes per
+   document for a sample in its stored shape and re-encoded in the other shape, and the
+   collection's index sizes from collStats.
+2. With --scratch N: N synthetic logs written in each shape into two scratch collections
+   that carry both production indexes (REQUIRED_INDEXES), as message_logs does, so
+   before/after index sizes can be compared directly.
+   The scratch collections are dropped afterwards.
+
+Usage (MONGODB_URI must be set):
+    python -m tools.log_size_report --sample 2000 --scratch 100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timezone, timedelta
+
+import bson
+from motor.motor_asyncio import AsyncIOMotorClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import log_schema  # noqa: E402
+from database.constants import REQUIRED_INDEXES  # noqa: E402
+
+DATABASE_NAME = "discord_forwarding_bot"
+# The production index each shape's guild/time queries use
+SHAPE_INDEXES = {"legacy": "guild_forwarded_at", "compact": "compact_guild_time"}
+
+
+def _bson_size(document: dict) -> int:
+    return len(bson.encode(document))
+
+
+def _legacy_shape(document: dict) -> dict:
+    entry = log_schema.decode_log(document)
+    if not entry.get("success", True) and "error" not in entry:
+        entry["error"] = ""
+    return entry
+
+
+def _synthetic_log(guild_ids, rule_ids, now: datetime) -> dict:
+    guild_id = random.choice(guild_ids)
+    success = random.random() > 0.02
+    log = {
+        "guild_id": guild_id,
+        "rule_id": random.choice(rule_ids[guild_id]),
+        "source_channel_id": str(random.getrandbits(60)),
+        "destination_channel_id": str(random.getrandbits(60)),
+        "original_message_id": str(random.getrandbits(62)),
+        "success": success,
+        "forwarded_at": now - timedelta(seconds=random.randint(0, 30 * 86400)),
+    }
+    if not success:
+        log["error"] = "403 Forbidden (error code: 50013): Missing Permissions"
+    return log
+
+
+async def report_live(db, sample_size: int):
+    collection = db["message_logs"]
+    legacy_count = await collection.count_documents({"v": {"$exists": False}})
+    compact_count = await collection.count_documents({"v": log_schema.COMPACT_VERSION})
+    print(f"documents: {legacy_count + compact_count} (legacy v1: {legacy_count}, compact v2: {compact_count})")
+
+    sample = await collection.aggregate([{"$sample": {"size": sample_size}}]).to_list(length=None)
+    if sample:
+        stored = sum(_bson_size(document) for document in sample) / len(sample)
+        legacy = sum(_bson_size(_legacy_shape(document)) for document in sample) / len(sample)
+        compact = sum(_bson_size(log_schema.encode_log(_legacy_shape(document))) for document in sample) / len(sample)
+        print(f"sampled {len(sample)} documents, average bytes/document:")
+        print(f"  as stored:       {stored:8.1f}")
+        print(f"  all legacy (v1): {legacy:8.1f}")
+        print(f"  all compact (v2):{compact:8.1f}  ({(1 - compact / legacy) * 100:.1f}% smaller)")
+
+    stats = await db.command("collStats", "message_logs")
+    print(f"collection: size {stats.get('size', 0)} B, avgObjSize {stats.get('avgObjSize', 0)} B, "
+          f"storage {stats.get('storageSize', 0)} B")
+    for name, size in stats.get("indexSizes", {}).items():
+        print(f"  index {name}: {size} B")
+
+
+async def report_scratch(db, count: int, guilds: int):
+    now = datetime.now(timezone.utc)
+    guild_ids = [str(random.getrandbits(60)) for _ in range(guilds)]
+    rule_ids = {guild_id: [str(uuid.uuid4()) for _ in range(3)] for guild_id in guild_ids}
+    logs = [_synthetic_log(guild_ids, rule_ids, now) for _ in range(count)]
+
+    shapes = {
+        "legacy": logs,
+        "compact": [log_schema.encode_log(log) for log in logs],
+    }
+    print(f"\nscratch comparison ({count} synthetic logs across {guilds} guilds):")
+    print(f"  {'shape':<8} {'avgObjSize':>11} {'data B':>12} {'index B':>12} {'guild/time index B':>20}")
+    for shape, documents in shapes.items():
+        collection = db[f"message_logs_size_{shape}"]
+        await collection.drop()
+        for keys, options in REQUIRED_INDEXES["message_logs"]:
+            await collection.create_index(keys, **options)
+        for start in range(0, len(documents), 10000):
+            await collection.insert_many([dict(document) for document in documents[start:start + 10000]], ordered=False)
+
+        stats = await db.command("collStats", collection.name)
+        print(f"  {shape:<8} {stats.get('avgObjSize', 0):>11} {stats.get('size', 0):>12} "
+              f"{stats.get('totalIndexSize', 0):>12} {stats.get('indexSizes', {}).get(SHAPE_INDEXES[shape], 0):>20}")
+        await collection.drop()
+
+
+async def main_async(sample_size: int, scratch: int, guilds: int):
+    client = AsyncIOMotorClient(os.environ["MONGODB_URI"])
+    db = client[DATABASE_NAME]
+    try:
+        await report_live(db, sample_size)
+        if scratch:
+            await report_scratch(db, scratch, guilds)
+    finally:
+        client.close()
+
+    expected = [options["name"] for _, options in REQUIRED_INDEXES.get("message_logs", [])]
+    print(f"\nindexes maintained by DatabaseCore.ensure_indexes(): {', '.join(expected)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample", type=int, default=1000, help="live documents to sample")
+    parser.add_argument("--scratch", type=int, default=0, help="synthetic logs per shape for the index comparison")
+    parser.add_argument("--guilds", type=int, default=200, help="guilds spread across the synthetic logs")
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args.sample, args.scratch, args.guilds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Consolidated log viewer.
+
+Filters and tails the JSON-lines file written in consolidated logging mode
+(LOG_CONSOLIDATED=true), by logger name and level. Lines are first matched on their raw
+text, so only candidate records are parsed as JSON. The newest records are read first:
+the end of the live file, then rotated archives newest first, only as far back as needed.
+
+A module is a logger name, a dotted prefix ("StygianRelay" also matches
+"StygianRelay.performance") or a pattern with * wildcards.
+
+Usage:
+    python -m tools.logtail                                   # last 20 records
+    python -m tools.logtail -m Forward -m DatabaseManager -l WARNING -n 100
+    python -m tools.logtail -m Forward -f                     # follow
+    python -m tools.logtail -n 0 --grep "rate limit"          # everything, archives included
+"""
+import argparse
+import fnmatch
+import glob
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from typing import Iterable, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # Only needed to read zstd archives
+    zstandard = None
+
+DEFAULT_LOG = os.path.join("log", "stygian.jsonl")
+LEVEL_NAMES = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+class RecordFilter:
+    def __init__(self, modules: List[str], min_level: int, grep: Optional[str]):
+        self.modules = modules
+        self.min_level = min_level
+        self.grep = grep
+        # Raw-text prefilters; None means "can't prefilter, parse everything"
+        self.name_needles = (None if not modules or any(any(c in m for c in "*?[") for m in modules)
+                             else [f'"logger":"{m}' for m in modules])
+        self.level_needles = ([f'"level":"{name}"' for name in LEVEL_NAMES if logging.getLevelName(name) >= min_level]
+                              if min_level > logging.NOTSET else None)
+
+    def _module_matches(self, name: str) -> bool:
+        for module in self.modules:
+            if any(c in module for c in "*?["):
+                if fnmatch.fnmatchcase(name, module):
+                    return True
+            elif name == module or name.startswith(module + "."):
+                return True
+        return False
+
+    def match(self, line: str) -> Optional[dict]:
+        """The parsed record if the line passes every filter."""
+        if self.name_needles is not None and not any(needle in line for needle in self.name_needles):
+            return None
+        if self.level_needles is not None and not any(needle in line for needle in self.level_needles):
+            return None
+        if self.grep is not None and self.grep not in line:
+            return None
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        if self.modules and not self._module_matches(record.get("logger", "")):
+            return None
+        level = logging.getLevelName(record.get("level", ""))
+        if self.min_level > logging.NOTSET and (not isinstance(level, int) or level < self.min_level):
+            return None
+        if self.grep is not None and self.grep not in record.get("message", ""):
+            return None
+        return record
+
+
+def _open(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise SystemExit(f"{path} is zstd-compressed; install the zstandard package to read it")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")),
+                                encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def archives_of(path: str) -> List[str]:
+    """Rotated archives of `path`, oldest first."""
+    archives = [p for p in glob.glob(glob.escape(path) + ".*") if not p.endswith(".tmp")]
+    return sorted(archives, key=os.path.getmtime)
+
+
+def read_lines(paths: Iterable[str]) -> Iterator[str]:
+    for path in paths:
+        with _open(path) as handle:
+            yield from handle
+
+
+def reversed_lines(path: str) -> Iterator[str]:
+    """Lines of the live file from the end, then of each archive from newest to oldest."""
+    yield from tail_lines(path)
+    for archive in reversed(archives_of(path)):
+        with _open(archive) as handle:
+            yield from reversed(handle.read().splitlines())
+
+
+def tail_lines(path: str) -> Iterator[str]:
+    """Lines of `path` from the last to the first, reading fixed-size blocks from the end."""
+    with open(path, "rb") as handle:
+        handle.seek(0, os.SEEK_END)
+        position = handle.tell()
+        remainder = b""
+        while position > 0:
+            size = min(TAIL_BLOCK_SIZE, position)
+            position -= size
+            handle.seek(position)
+            block = handle.read(size) + remainder
+            lines = block.split(b"\n")
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line.decode("utf-8", errors="replace")
+        if remainder:
+            yield remainder.decode("utf-8", errors="replace")
+
+
+def render(record: dict, raw: bool) -> str:
+    if raw:
+        return json.dumps(record, ensure_ascii=False)
+    text = f"{record.get('timestamp', '')} [{record.get('level', '')}] {record.get('logger', '')}: {record.get('message', '')}"
+    if record.get("exception"):
+        text += "\n" + record["exception"]
+    return text
+
+
+def follow(path: str, record_filter: RecordFilter, raw: bool, interval: float = 0.25):
+    """Print matching records appended to `path`, reopening it after a rotation."""
+    handle = open(path, encoding="utf-8", errors="replace")
+    handle.seek(0, os.SEEK_END)
+    inode = os.fstat(handle.fileno()).st_ino
+    partial = ""
+    while True:
+        line = handle.readline()
+        if line:
+            partial += line
+            if not partial.endswith("\n"):
+                continue  # The writer hasn't finished this line yet
+            record = record_filter.match(partial)
+            partial = ""
+            if record is not None:
+                print(render(record, raw), flush=True)
+            continue
+
+        time.sleep(interval)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue  # Mid-rotation
+        if stat.st_ino != inode or stat.st_size < handle.tell():
+            handle.close()
+            handle = open(path, encoding="utf-8", errors="replace")
+            inode = os.fstat(handle.fileno()).st_ino
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", nargs="?", default=DEFAULT_LOG, help=f"consolidated log file (default {DEFAULT_LOG})")
+    parser.add_argument("-m", "--module", action="append", default=[], help="logger name, prefix or pattern; repeatable")
+    parser.add_argument("-l", "--level", default="NOTSET", help="minimum level, e.g. WARNING")
+    parser.add_argument("-n", "--lines", type=int, default=20, help="matching records to show (0: all)")
+    parser.add_argument("-f", "--follow", action="store_true", help="keep printing new records")
+    parser.add_argument("--grep", help="only records whose message contains this text")
+    parser.add_argument("--raw", action="store_true", help="print records as JSON")
+    args = parser.parse_args()
+
+    min_level = logging.getLevelName(args.level.upper())
+    if not isinstance(min_level, int):
+        parser.error(f"unknown level {args.level}")
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path} does not exist")
+    record_filter = RecordFilter(args.module, min_level, args.grep)
+
+    if args.lines == 0:
+        matches = (record_filter.match(line) for line in read_lines(archives_of(args.path) + [args.path]))
+        selected = deque(record for record in matches if record is not None)
+    else:
+        selected = deque()
+        for line in reversed_lines(args.path):
+            record = record_filter.match(line)
+            if record is not None:
+                selected.appendleft(record)
+                if len(selected) >= args.lines:
+                    break
+
+    try:
+        for record in selected:
+            print(render(record, args.raw))
+        if args.follow:
+            follow(args.path, record_filter, args.raw)
+    except (KeyboardInterrupt, BrokenPipeError):
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Storage backend benchmark.
+
+Runs the same mixed workload of settings reads, rule edits, message log writes, daily
+counts and statistics queries against each selected backend and prints per-operation
+latency percentiles, so the MongoDB and SQLite profiles can be compared side by side.
+
+Usage (the mongo backend needs MONGODB_URI pointing at a throwaway database):
+    python -m tools.storage_bench --backends sqlite mongo --operations 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.core import DatabaseCore  # noqa: E402
+from database.constants import DEFAULT_GUILD_SETTINGS_TEMPLATE  # noqa: E402
+from database.storage import MongoStorage, SQLiteStorage  # noqa: E402
+
+# Relative frequency of each operation, roughly the bot's steady-state mix
+WORKLOAD = {
+    "get_guild": 40,
+    "insert_message_log": 30,
+    "count_messages": 15,
+    "update_guild": 6,
+    "update_rule": 4,
+    "forwarding_stats": 3,
+    "list_rules": 2,
+}
+
+
+def _guild_document(guild_id: str) -> dict:
+    now = datetime.now(timezone.utc)
+    settings = DEFAULT_GUILD_SETTINGS_TEMPLATE.copy()
+    settings.update({"_id": guild_id, "guild_name": f"Bench {guild_id}", "created_at": now, "updated_at": now})
+    return settings
+
+
+def _rule_document(index: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "rule_id": str(uuid.uuid4()),
+        "rule_name": f"bench-rule-{index}",
+        "source_channel_id": 1000 + index,
+        "destination_channel_id": 2000 + index,
+        "is_active": True,
+        "settings": {},
+        "version": 1,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def _seed(storage, guild_ids, rules_per_guild: int) -> dict:
+    rules = {}
+    for guild_id in guild_ids:
+        await storage.create_guild(_guild_document(guild_id))
+        rules[guild_id] = []
+        for index in range(rules_per_guild):
+            rule = _rule_document(index)
+            await storage.add_rule(guild_id, rule, default_limit=rules_per_guild, min_limit=0)
+            rules[guild_id].append(rule["rule_id"])
+    return rules
+
+
+async def _run_operation(storage, name: str, guild_id: str, rule_ids: list):
+    now = datetime.now(timezone.utc)
+    if name == "get_guild":
+        await storage.get_guild(guild_id)
+    elif name == "insert_message_log":
+        rule_id = random.choice(rule_ids)
+        await storage.insert_message_log({
+            "guild_id": guild_id,
+            "rule_id": rule_id,
+            "original_message_id": random.getrandbits(62),
+            "source_channel_id": "1000",
+            "destination_channel_id": str(2000 + rule_ids.index(rule_id)),
+            "success": random.random() > 0.05,
+            "forwarded_at": now,
+        })
+    elif name == "count_messages":
+        await storage.count_messages(guild_id, datetime(now.year, now.month, now.day, tzinfo=timezone.utc))
+    elif name == "update_guild":
+        await storage.update_guild(guild_id, {"updated_at": now})
+    elif name == "update_rule":
+        await storage.update_rule(random.choice(rule_ids), {"updated_at": now}, None)
+    elif name == "forwarding_stats":
+        await storage.forwarding_stats(guild_id, now - timedelta(days=7), None)
+    elif name == "list_rules":
+        await storage.list_rules(guild_id)
+
+
+def _percentile(samples: list, fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+async def run_bench(backend: str, operations: int, guilds: int, rules_per_guild: int, concurrency: int):
+    if backend == "mongo":
+        storage = MongoStorage(DatabaseCore())
+    else:
+        storage = SQLiteStorage(os.path.join(tempfile.mkdtemp(prefix="storage-bench-"), "bench.db"))
+
+    await storage.initialize()
+    guild_ids = [f"bench-{uuid.uuid4().hex[:12]}" for _ in range(guilds)]
+    rules = await _seed(storage, guild_ids, rules_per_guild)
+
+    names = list(WORKLOAD)
+    weights = list(WORKLOAD.values())
+    latencies = defaultdict(list)
+    remaining = operations
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            name = random.choices(names, weights)[0]
+            guild_id = random.choice(guild_ids)
+            started = time.perf_counter()
+            await _run_operation(storage, name, guild_id, rules[guild_id])
+            latencies[name].append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    for guild_id in guild_ids:
+        await storage.purge_guild(guild_id, {"deleted": {}})
+    await storage.close()
+
+    print(f"\n{backend}: {operations} operations in {elapsed:.2f}s ({operations / elapsed:.0f} ops/s)")
+    print(f"  {'operation':<20} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name in names:
+        samples = sorted(latencies[name])
+        if not samples:
+            continue
+        print(f"  {name:<20} {len(samples):>7} {_percentile(samples, 0.5):>9.3f} {_percentile(samples, 0.95):>9.3f} "
+              f"{_percentile(samples, 0.99):>9.3f} {samples[-1]:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=["sqlite", "mongo"], default=["sqlite"])
+    parser.add_argument("--operations", type=int, default=5000, help="operations per backend")
+    parser.add_argument("--guilds", type=int, default=20, help="number of guilds to seed")
+    parser.add_argument("--rules-per-guild", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent workers")
+    args = parser.parse_args()
+
+    for backend in args.backends:
+        asyncio.run(run_bench(backend, args.operations, args.guilds, args.rules_per_guild, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()